@@ -1,13 +1,27 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import os
 import json
-import boto3
-from app.utils.es_client import get_es_client
+import time
+from contextlib import aclosing
+from app.utils.es_client import get_async_es_client, es_search
+from app.api.search import INDEX_NAME
+from app.utils.embeddings import embed_query
+from app.utils.hybrid_search import hybrid_enabled, hybrid_search
+from app.utils.llm_gateway import invoke_bedrock, stream_bedrock
+from app.utils.cache import MISSING
+from app.utils.semantic_cache import SemanticCache
 
 router = APIRouter()
 
+# 엔드포인트별 유사 질문 답변 캐시 (같은 질문이라도 /chat 과 /classic-chat 의 프롬프트가 다름)
+SEMANTIC_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", 6 * 3600))
+SEMANTIC_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", 2048))
+chat_answer_cache = SemanticCache("chat", maxsize=SEMANTIC_CACHE_SIZE, ttl=SEMANTIC_CACHE_TTL)
+classic_answer_cache = SemanticCache("classic-chat", maxsize=SEMANTIC_CACHE_SIZE, ttl=SEMANTIC_CACHE_TTL)
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -15,102 +29,108 @@ class ChatResponse(BaseModel):
     answer: str
     drinks: List[dict]
 
-def search_liquor_for_rag(text: str):
-    es = get_es_client()
-    if not es:
-        print("❌ Elasticsearch client not available")
-        return []
+# RAG 검색 필드 (가중치는 기존 drink_info 쿼리와 동일: 이름 > 안주 > 소개/종류 > 설명)
+RAG_FIELDS = ["name^3", "foods^2", "intro^1.5", "type^1.5", "description", "ingredients"]
+# 프롬프트와 응답(drinks)에 필요한 필드만 가져옴 (selling_shops, cocktails 등 큰 필드 제외)
+RAG_SOURCE = ["drink_id", "name", "image_url", "intro", "description", "alcohol", "volume", "foods"]
+RAG_MIN_SCORE = float(os.getenv("CHAT_RAG_MIN_SCORE", 5.0))
+# kNN 쪽 코사인 유사도 하한 (BM25의 min_score와 같은 역할)
+RAG_MIN_SIMILARITY = float(os.getenv("CHAT_RAG_MIN_SIMILARITY", 0.82))
+RAG_SIZE = 5
 
-    index_name = "drink_info"
-    
-    # RAG용 검색 쿼리: 설명이나 소개글에서도 검색하여 문맥에 맞는 술을 찾음
-    query = {
+def build_rag_query(text: str, size: int = RAG_SIZE) -> dict:
+    return {
         "query": {
-            "bool": {
-                "should": [
-                    { "match": { "drink_name": { "query": text, "boost": 3.0 } } },
-                    { "match": { "drink_intro": { "query": text, "boost": 1.5 } } },
-                    { "match": { "drink_desc": { "query": text, "boost": 1.0 } } },
-                    { "match": { "pairing_foods": { "query": text, "boost": 2.0 } } }, # 안주로 검색 가능하게
-                    { "match": { "drink_tag": { "query": text, "boost": 1.5 } } }
-                ],
-                "minimum_should_match": 1
+            "multi_match": {
+                "query": text,
+                "fields": RAG_FIELDS,
+                # 필드별 점수를 합산 (기존 bool.should + match 여러 개와 같은 방식)
+                "type": "most_fields"
             }
         },
-        "min_score": 5.0, # 점수 임계값 상향 (엄격한 검색)
-        "size": 5
+        "_source": RAG_SOURCE,
+        "min_score": RAG_MIN_SCORE, # 점수 임계값 (엄격한 검색)
+        "size": size
     }
 
+def format_rag_hit(hit: dict) -> dict:
+    source = hit['_source']
+    return {
+        "id": source.get('drink_id'),
+        "name": source.get('name'),
+        "image_url": source.get('image_url'),
+        "description": source.get('intro') or (source.get('description') or '')[:100],
+        "abv": source.get('alcohol'),
+        "volume": source.get('volume'),
+        "foods": source.get('foods') or []
+    }
+
+async def search_liquor_for_rag(text: str):
+    es = get_async_es_client()
+    if not es:
+        print("❌ Elasticsearch client not available")
+        return []
+
+    # 질문의 분위기/상황과 의미가 가까운 술도 찾도록 BM25 + kNN 하이브리드 (모델이 없으면 BM25만)
+    if hybrid_enabled():
+        try:
+            vector = await embed_query(text)
+            if vector is not None:
+                hits = await hybrid_search(
+                    es, INDEX_NAME, build_rag_query(text), vector, RAG_SIZE, RAG_SOURCE,
+                    similarity=RAG_MIN_SIMILARITY
+                )
+                if hits is not None:
+                    return [format_rag_hit(hit) for hit in hits]
+        except Exception as e:
+            print(f"⚠️ Hybrid RAG search error (fallback to BM25): {e}")
+
+    # 검색 API와 같은 통합 인덱스 사용 (설명, 소개글, 안주로도 문맥에 맞는 술을 찾음)
     try:
-        response = es.search(index=index_name, body=query)
-        hits = response['hits']['hits']
-        
-        results = []
-        for hit in hits:
-            source = hit['_source']
-            results.append({
-                "id": source.get('drink_id'),
-                "name": source.get('drink_name'),
-                "image_url": source.get('drink_image_url'),
-                "description": source.get('drink_intro') or source.get('drink_desc', '')[:100],
-                "abv": source.get('drink_abv'),
-                "volume": source.get('drink_volume'),
-                "foods": source.get('pairing_foods', []),
-                "full_desc": source.get('drink_desc', '')
-            })
-        return results
+        response = await es_search(es, INDEX_NAME, build_rag_query(text))
+        return [format_rag_hit(hit) for hit in response['hits']['hits']]
     except Exception as e:
         print(f"❌ ES Search error: {e}")
         return []
 
-def invoke_nova(system_prompt: str, user_message: str):
-    try:
-        # AWS Bedrock Client
-        session = boto3.Session(
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_REGION", "us-east-1")
-        )
-        bedrock = session.client(service_name='bedrock-runtime')
-
-        model_id = "amazon.nova-lite-v1:0"
-        
-        # Nova 모델 요청 바디 구성
-        body = {
-            "system": [{"text": system_prompt}],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [{"text": user_message}]
-                }
-            ],
-            "inferenceConfig": {
-                "maxTokens": 1000,
-                "temperature": 0.7,
-                "topP": 0.9
+NOVA_MODEL_ID = "amazon.nova-lite-v1:0"
+NOVA_GUARDRAIL = {"guardrailIdentifier": "6lsrxzd5pnlq", "guardrailVersion": "DRAFT"}
+
+REFUSAL_TOKEN = "[[REFUSAL]]"
+REFUSAL_KEYWORDS = ["모르겠", "죄송", "없소", "아니오", "관련 없는", "내 알 바"]
+GUARDRAIL_FALLBACK = "그 이야기는 내 잘 모르겠고, 술 이야기나 합시다! 허허."
+ERROR_FALLBACK = "아이고, 머리가 아파서 잠시 생각을 못하겠구만유. 다시 물어봐주시오."
+
+def build_nova_body(system_prompt: str, user_message: str) -> dict:
+    # Nova 모델 요청 바디 구성
+    return {
+        "system": [{"text": system_prompt}],
+        "messages": [
+            {
+                "role": "user",
+                "content": [{"text": user_message}]
             }
+        ],
+        "inferenceConfig": {
+            "maxTokens": 1000,
+            "temperature": 0.7,
+            "topP": 0.9
         }
+    }
+
+async def invoke_nova(system_prompt: str, user_message: str):
+    try:
+        body = build_nova_body(system_prompt, user_message)
 
         try:
-            response = bedrock.invoke_model(
-                modelId=model_id,
-                body=json.dumps(body),
-                guardrailIdentifier="6lsrxzd5pnlq", 
-                guardrailVersion="DRAFT" 
-            )
+            # 공유 bedrock-runtime 클라이언트 + 전용 스레드 풀 (app/utils/llm_gateway.py)
+            response_body = await invoke_bedrock(NOVA_MODEL_ID, body, label="Bedrock Nova", **NOVA_GUARDRAIL)
+        except TimeoutError:
+            raise
         except Exception as e:
             # 가드레일에 걸리면 예외가 발생할 수 있음 (또는 응답에 포함)
             print(f"⚠️ Guardrail or Bedrock Error: {e}")
-            return "그 이야기는 내 잘 모르겠고, 술 이야기나 합시다! 허허."
-
-        response_body = json.loads(response.get('body').read())
-        
-        # Token Usage Logging
-        usage = response_body.get('usage', {})
-        input_tokens = usage.get('inputTokens', 0)
-        output_tokens = usage.get('outputTokens', 0)
-        total_tokens = usage.get('totalTokens', 0)
-        print(f"💰 Bedrock Nova Token Usage: Input={input_tokens}, Output={output_tokens}, Total={total_tokens}")
+            return GUARDRAIL_FALLBACK
 
         # Guardrail에 의해 차단되었는지 확인 (amazon-bedrock-guardrailAction 필드 등 확인 필요하지만 심플하게 텍스트로 판단)
         output_text = response_body['output']['message']['content'][0]['text']
@@ -119,26 +139,22 @@ def invoke_nova(system_prompt: str, user_message: str):
 
     except Exception as e:
         print(f"❌ Bedrock Nova Error: {e}")
-        return "아이고, 머리가 아파서 잠시 생각을 못하겠구만유. 다시 물어봐주시오."
+        return ERROR_FALLBACK
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    # 1. ES에서 관련 술 검색
-    drinks = search_liquor_for_rag(request.message)
-    
-    # 2. 프롬프트 구성
-    context_text = ""
+def build_context_text(drinks: list) -> str:
     # 검색된 술이 없거나 점수가 너무 낮으면 컨텍스트에 포함하지 않음
-    if drinks:
-        context_text = "다음은 자네가 추천할 수 있는 우리 술 목록일세:\n"
-        for i, d in enumerate(drinks):
-            context_text += f"{i+1}. {d['name']} (도수: {d['abv']}%, 용량: {d['volume']})\n"
-            context_text += f"   특징: {d['description']}\n"
-            context_text += f"   어울리는 안주: {', '.join(d['foods'])}\n\n"
-    else:
-        context_text = "관련된 술 정보를 찾지 못했네. 일반적인 지식으로 대답하게."
-
-    system_prompt = f"""
+    if not drinks:
+        return "관련된 술 정보를 찾지 못했네. 일반적인 지식으로 대답하게."
+    context_text = "다음은 자네가 추천할 수 있는 우리 술 목록일세:\n"
+    for i, d in enumerate(drinks):
+        context_text += f"{i+1}. {d['name']} (도수: {d['abv']}%, 용량: {d['volume']})\n"
+        context_text += f"   특징: {d['description']}\n"
+        context_text += f"   어울리는 안주: {', '.join(d['foods'])}\n\n"
+    return context_text
+
+def build_chat_prompt(drinks: list) -> str:
+    context_text = build_context_text(drinks)
+    return f"""
 너는 '주모'라는 캐릭터다. 한국의 전통 주막 주인이지.
 말투는 구수하고 친근한 사극체를 써라. (예: "어서오시오!", "이 술은 참말로 기가 막히지!", "한 잔 받으시오~")
 사용자의 질문에 대해 제공된 [술 목록]을 바탕으로 추천해줘라.
@@ -153,46 +169,52 @@ async def chat(request: ChatRequest):
 {context_text}
 """
 
+def filter_answer(answer: str, drinks: list):
+    """
+    [[REFUSAL]] 토큰이 있으면 술 정보(drinks)를 비우고, 토큰은 사용자에게 보이지 않게 제거함.
+    기존 키워드 필터링도 보조적으로 유지 (혹시 모델이 토큰을 빼먹을 경우 대비)
+    """
+    if REFUSAL_TOKEN in answer:
+        return answer.replace(REFUSAL_TOKEN, "").strip(), []
+    if any(k in answer for k in REFUSAL_KEYWORDS):
+        return answer, []
+    return answer, drinks
+
+def cache_answer(cache: SemanticCache, message: str, answer: str, drinks: list, started_at: float):
+    """Bedrock 오류/가드레일 예외로 대신 내보낸 문구는 캐시하지 않음"""
+    if answer in (ERROR_FALLBACK, GUARDRAIL_FALLBACK):
+        return
+    cache.set(message, {"answer": answer, "drinks": drinks[:3]}, cost=time.perf_counter() - started_at)
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    # 0. 유사한 질문의 답변이 캐시에 있으면 검색/모델 호출 없이 반환
+    cached = chat_answer_cache.get(request.message)
+    if cached is not MISSING:
+        return cached
+    started_at = time.perf_counter()
+
+    # 1. ES에서 관련 술 검색
+    drinks = await search_liquor_for_rag(request.message)
+    
+    # 2. 프롬프트 구성
+    system_prompt = build_chat_prompt(drinks)
+
     # 3. Nova 호출
-    answer = invoke_nova(system_prompt, request.message)
+    answer = await invoke_nova(system_prompt, request.message)
     
     # 4. 답변 분석 및 필터링
-    # [[REFUSAL]] 토큰이 있으면 술 정보(drinks)를 비우고, 토큰은 사용자에게 보이지 않게 제거함
-    if "[[REFUSAL]]" in answer:
-        drinks = []
-        answer = answer.replace("[[REFUSAL]]", "").strip()
-    
-    # 기존 키워드 필터링도 보조적으로 유지 (혹시 모델이 토큰을 빼먹을 경우 대비)
-    elif any(k in answer for k in ["모르겠", "죄송", "없소", "아니오", "관련 없는", "내 알 바"]):
-        drinks = []
+    answer, drinks = filter_answer(answer, drinks)
+    cache_answer(chat_answer_cache, request.message, answer, drinks, started_at)
 
     return {
         "answer": answer,
         "drinks": drinks[:3]
     }
 
-@router.post("/classic-chat", response_model=ChatResponse)
-async def classic_chat(request: ChatRequest):
-    """
-    고전문학 문구에 맞는 전통주를 추천하는 전용 챗봇.
-    기본 구조(ES 검색 + Nova 호출)는 기존 /chat 과 같고,
-    system_prompt만 고전문학/분위기 설명에 맞게 바꾼 버전.
-    """
-    # 1. ES에서 관련 술 검색 (그대로 재사용)
-    drinks = search_liquor_for_rag(request.message)
-    
-    # 2. 컨텍스트 텍스트 구성
-    if drinks:
-        context_text = "다음은 자네가 추천할 수 있는 우리 술 목록일세:\n"
-        for i, d in enumerate(drinks):
-            context_text += f"{i+1}. {d['name']} (도수: {d['abv']}%, 용량: {d['volume']})\n"
-            context_text += f"   특징: {d['description']}\n"
-            context_text += f"   어울리는 안주: {', '.join(d['foods'])}\n\n"
-    else:
-        context_text = "관련된 술 정보를 찾지 못했네. 일반적인 지식으로 대답하게."
-
-    # 3. 고전문학 전용 시스템 프롬프트
-    system_prompt = f"""
+def build_classic_prompt(drinks: list) -> str:
+    context_text = build_context_text(drinks)
+    return f"""
 너는 '주모'라는 캐릭터다.  
 한국의 전통 주막 주인의 말투를 사용하며 구수하고 친근한 사극체로만 대답하라.  
 예: "허허, 어서오시오.", "이 술은 참말로 기가 막히지요.", "한 잔 들이키고 마음을 풀어보시오~"
@@ -246,17 +268,159 @@ async def classic_chat(request: ChatRequest):
 {context_text}
 """
 
+@router.post("/classic-chat", response_model=ChatResponse)
+async def classic_chat(request: ChatRequest):
+    """
+    고전문학 문구에 맞는 전통주를 추천하는 전용 챗봇.
+    기본 구조(ES 검색 + Nova 호출)는 기존 /chat 과 같고,
+    system_prompt만 고전문학/분위기 설명에 맞게 바꾼 버전.
+    """
+    cached = classic_answer_cache.get(request.message)
+    if cached is not MISSING:
+        return cached
+    started_at = time.perf_counter()
+
+    # 1. ES에서 관련 술 검색 (그대로 재사용)
+    drinks = await search_liquor_for_rag(request.message)
+    
+    # 2~3. 컨텍스트 + 고전문학 전용 시스템 프롬프트
+    system_prompt = build_classic_prompt(drinks)
+
     # 4. Nova 호출
-    answer = invoke_nova(system_prompt, request.message)
+    answer = await invoke_nova(system_prompt, request.message)
     
     # 5. REFUSAL 처리 로직은 기존과 동일하게 재사용
-    if "[[REFUSAL]]" in answer:
-        drinks = []
-        answer = answer.replace("[[REFUSAL]]", "").strip()
-    elif any(k in answer for k in ["모르겠", "죄송", "없소", "아니오", "관련 없는", "내 알 바"]):
-        drinks = []
+    answer, drinks = filter_answer(answer, drinks)
+    cache_answer(classic_answer_cache, request.message, answer, drinks, started_at)
 
     return {
         "answer": answer,
         "drinks": drinks[:3]
     }
+
+
+# ---------------------------------------------------------------------------
+# 스트리밍 (Server-Sent Events)
+# 이벤트 순서: drinks(검색된 술 후보) → delta(토큰 조각, 여러 번) → done(최종 답변/술 목록)
+# 거절([[REFUSAL]]/키워드)이면 done의 drinks가 비어 있으므로 클라이언트는 먼저 보여준 후보를 숨기면 됨
+# ---------------------------------------------------------------------------
+
+class RefusalFilter:
+    """
+    스트림 조각에서 [[REFUSAL]] 토큰을 지우면서 그대로 흘려보냅니다.
+    토큰이 조각 경계에 걸칠 수 있으므로 토큰의 접두어일 수 있는 끝부분만 잠시 붙잡아 둡니다.
+    """
+
+    def __init__(self, token: str = REFUSAL_TOKEN):
+        self.token = token
+        self.pending = ""
+        self.answer = ""
+        self.refused = False
+
+    def _hold_length(self, text: str) -> int:
+        for size in range(min(len(text), len(self.token) - 1), 0, -1):
+            if self.token.startswith(text[-size:]):
+                return size
+        return 0
+
+    def _emit(self, text: str) -> str:
+        if not self.answer:
+            # filter_answer의 strip()과 같게 답변 앞 공백은 버림
+            text = text.lstrip()
+        self.answer += text
+        return text
+
+    def feed(self, text: str) -> str:
+        buffer = self.pending + text
+        if self.token in buffer:
+            self.refused = True
+            buffer = buffer.replace(self.token, "")
+        hold = self._hold_length(buffer)
+        self.pending = buffer[len(buffer) - hold:] if hold else ""
+        return self._emit(buffer[:len(buffer) - hold])
+
+    def finish(self) -> str:
+        text, self.pending = self.pending, ""
+        return self._emit(text)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def replay_cached(cached: dict):
+    """캐시된 답변을 스트리밍 이벤트 형식 그대로 한 번에 보냄"""
+    yield _sse("drinks", {"drinks": cached["drinks"]})
+    yield _sse("delta", {"text": cached["answer"]})
+    yield _sse("done", cached)
+
+async def stream_nova(system_prompt: str, user_message: str, drinks: list, cache: SemanticCache = None, started_at: float = None):
+    """
+    Nova 응답을 SSE 이벤트 문자열로 흘려보냅니다. (invoke_nova + filter_answer의 스트리밍 버전)
+    cache가 주어지면 스트림을 끝까지 보낸 답변을 저장합니다.
+    """
+    started_at = started_at or time.perf_counter()
+    yield _sse("drinks", {"drinks": drinks[:3]})
+
+    refusal = RefusalFilter()
+    try:
+        # 클라이언트가 연결을 끊으면 aclosing이 stream_bedrock을 즉시 닫아 Bedrock 스레드를 돌려받음
+        async with aclosing(stream_bedrock(
+            NOVA_MODEL_ID, build_nova_body(system_prompt, user_message), label="Bedrock Nova Stream", **NOVA_GUARDRAIL
+        )) as chunks:
+            async for chunk in chunks:
+                text = chunk.get("contentBlockDelta", {}).get("delta", {}).get("text")
+                if text:
+                    piece = refusal.feed(text)
+                    if piece:
+                        yield _sse("delta", {"text": piece})
+    except TimeoutError as e:
+        print(f"❌ Bedrock Nova Error: {e}")
+        cache = None
+        if not refusal.answer:
+            yield _sse("delta", {"text": refusal.feed(ERROR_FALLBACK)})
+    except Exception as e:
+        # 가드레일에 걸리면 예외가 발생할 수 있음 (또는 응답에 포함)
+        print(f"⚠️ Guardrail or Bedrock Error: {e}")
+        cache = None
+        if not refusal.answer:
+            yield _sse("delta", {"text": refusal.feed(GUARDRAIL_FALLBACK)})
+
+    piece = refusal.finish()
+    if piece:
+        yield _sse("delta", {"text": piece})
+
+    answer = refusal.answer.strip()
+    if refusal.refused:
+        drinks = []
+    else:
+        answer, drinks = filter_answer(answer, drinks)
+    if cache is not None:
+        cache_answer(cache, user_message, answer, drinks, started_at)
+    yield _sse("done", {"answer": answer, "drinks": drinks[:3]})
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # 프록시(nginx) 버퍼링을 끄지 않으면 조각이 모였다가 한 번에 전달됨
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """/chat 의 SSE 버전 (첫 바이트는 술 후보, 이후 모델 토큰이 도착하는 대로 전송)"""
+    cached = chat_answer_cache.get(request.message)
+    if cached is not MISSING:
+        return _sse_response(replay_cached(cached))
+    started_at = time.perf_counter()
+    drinks = await search_liquor_for_rag(request.message)
+    return _sse_response(stream_nova(build_chat_prompt(drinks), request.message, drinks, chat_answer_cache, started_at))
+
+@router.post("/classic-chat/stream")
+async def classic_chat_stream(request: ChatRequest):
+    """/classic-chat 의 SSE 버전"""
+    cached = classic_answer_cache.get(request.message)
+    if cached is not MISSING:
+        return _sse_response(replay_cached(cached))
+    started_at = time.perf_counter()
+    drinks = await search_liquor_for_rag(request.message)
+    return _sse_response(stream_nova(build_classic_prompt(drinks), request.message, drinks, classic_answer_cache, started_at))
@@ -1,26 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import google.generativeai as genai
 import os
-import pymysql
 from typing import List, Optional
 from googleapiclient.discovery import build
-
-DB_HOST = os.getenv("MARIADB_HOST", "192.168.0.36")
-DB_PORT = int(os.getenv("MARIADB_PORT", 3306))
-DB_USER = os.getenv("MARIADB_USER", "root")
-DB_PASS = os.getenv("MARIADB_ROOT_PASSWORD", "pass123#")
-DB_NAME = os.getenv("MARIADB_DATABASE", "drink")
-
-def get_db_connection():
-    return pymysql.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        user=DB_USER,
-        password=DB_PASS,
-        database=DB_NAME,
-        cursorclass=pymysql.cursors.DictCursor
-    )
+from app.db.mariadb import fetch_all
+from app.utils.llm_gateway import generate_gemini
+from app.utils.cocktail_sampler import cocktail_state, get_cocktail_sampler
 
 router = APIRouter()
 
@@ -78,10 +63,6 @@ async def generate_cocktail(request: CocktailRequest):
         raise HTTPException(status_code=500, detail="Gemini API Key is missing")
 
     try:
-        genai.configure(api_key=api_key)
-        # User requested "2.6flash", likely meaning the latest Flash model. Using 1.5-flash as stable default.
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         prompt = f"""
         '{request.drink_name}'를 기주(베이스)로 사용하는 창의적이고 맛있는 칵테일 레시피 1개와, 
         칵테일이 아닌 '{request.drink_name}' 원주(Original Liquor) 그 자체와 가장 잘 어울리는 안주 1개를 추천해줘.
@@ -101,17 +82,8 @@ async def generate_cocktail(request: CocktailRequest):
         JSON 외에 다른 말은 하지 마.
         """
         
-        import time
-        start_time = time.time()
-        response = model.generate_content(prompt)
-        end_time = time.time()
-        
-        elapsed_time = end_time - start_time
-        print(f"⏱️ Gemini API Time: {elapsed_time:.2f}s")
-        
-        if response.usage_metadata:
-            print(f"💰 Gemini Token Usage: Input={response.usage_metadata.prompt_token_count}, Output={response.usage_metadata.candidates_token_count}, Total={response.usage_metadata.total_token_count}")
-            
+        # User requested "2.6flash", likely meaning the latest Flash model.
+        response = await generate_gemini('gemini-2.5-flash', prompt, label="Gemini API")
         text = response.text
         
         # Clean up code blocks if present
@@ -146,16 +118,20 @@ async def generate_cocktail(request: CocktailRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate recipe: {str(e)}")
 
 @router.get("/random", response_model=List[CocktailInfo])
-def get_random_cocktails(limit: int = 10):
+async def get_random_cocktails(limit: int = 10, seed: Optional[int] = None):
+    """
+    무작위 칵테일 목록. 메모리 샘플러에서 뽑고, 샘플러가 없을 때만 DB에서 ORDER BY RAND()로 조회합니다.
+    seed를 지정하면 같은 결과를 재현할 수 있습니다. (샘플러 사용 시)
+    """
+    sampler = get_cocktail_sampler()
+    if sampler:
+        cocktail_state.served += 1
+        return sampler.sample(limit, seed)
+
+    cocktail_state.fallbacks += 1
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         query = "SELECT cocktail_id, cocktail_title, cocktail_image_url, cocktail_homepage_url FROM cocktail_info ORDER BY RAND() LIMIT %s"
-        cursor.execute(query, (limit,))
-        rows = cursor.fetchall()
-        
-        conn.close()
+        rows = await fetch_all(query, (limit,))
         return rows
     except Exception as e:
         print(f"DB Error: {e}")
@@ -1,45 +1,22 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import pymysql
-import os
 from typing import List
+from app.db.mariadb import fetch_all
 
 router = APIRouter()
 
-DB_HOST = "192.168.0.36"
-DB_PORT = 3306
-DB_USER = "root"
-DB_PASS = os.environ.get("MARIADB_ROOT_PASSWORD", "pass123#")
-DB_NAME = "drink"
-
 class FairInfo(BaseModel):
     fair_id: int
     fair_year: int
     fair_image_url: str
     fair_homepage_url: str
 
-def get_db_connection():
-    return pymysql.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        user=DB_USER,
-        password=DB_PASS,
-        database=DB_NAME,
-        cursorclass=pymysql.cursors.DictCursor
-    )
-
 @router.get("/", response_model=List[FairInfo])
-def get_fairs():
+async def get_fairs():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         query = "SELECT * FROM fair_info ORDER BY fair_year DESC"
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        
-        conn.close()
+        rows = await fetch_all(query)
         return rows
     except Exception as e:
         print(f"DB Error: {e}")
@@ -1,26 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import google.generativeai as genai
+import hashlib
 import os
-import pymysql
 import json
 from typing import List, Optional
-
-DB_HOST = os.getenv("MARIADB_HOST", "192.168.0.36")
-DB_PORT = int(os.getenv("MARIADB_PORT", 3306))
-DB_USER = os.getenv("MARIADB_USER", "root")
-DB_PASS = os.getenv("MARIADB_ROOT_PASSWORD", "pass123#")
-DB_NAME = os.getenv("MARIADB_DATABASE", "drink")
-
-def get_db_connection():
-    return pymysql.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        user=DB_USER,
-        password=DB_PASS,
-        database=DB_NAME,
-        cursorclass=pymysql.cursors.DictCursor
-    )
+from app.db.mariadb import fetch_all
+from app.utils.specialty_index import get_specialty_index
+from app.utils.cache import TieredCache
+from app.utils.llm_gateway import generate_gemini
 
 router = APIRouter()
 
@@ -49,14 +36,15 @@ class HansangResponse(BaseModel):
     items: List[HansangItem]
 
 @router.get("/specialties", response_model=List[SpecialtyProduct])
-def get_regional_specialties(province: str, city: Optional[str] = None, limit: int = 20):
+async def get_regional_specialties(province: str, city: Optional[str] = None, limit: int = 20):
     """
     Get regional specialty products by province and city
     """
+    index = get_specialty_index()
+    if index:
+        return index.by_region(province, city, limit)
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         if city:
             query = """
                 SELECT local_id, province, city_county, contents_name, imgurl, linkurl 
@@ -64,7 +52,7 @@ def get_regional_specialties(province: str, city: Optional[str] = None, limit: i
                 WHERE province = %s AND city_county = %s 
                 LIMIT %s
             """
-            cursor.execute(query, (province, city, limit))
+            rows = await fetch_all(query, (province, city, limit))
         else:
             query = """
                 SELECT local_id, province, city_county, contents_name, imgurl, linkurl 
@@ -72,10 +60,7 @@ def get_regional_specialties(province: str, city: Optional[str] = None, limit: i
                 WHERE province = %s 
                 LIMIT %s
             """
-            cursor.execute(query, (province, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
+            rows = await fetch_all(query, (province, limit))
         
         return rows
     except Exception as e:
@@ -83,14 +68,15 @@ def get_regional_specialties(province: str, city: Optional[str] = None, limit: i
         raise HTTPException(status_code=500, detail=f"Failed to fetch specialty products: {str(e)}")
 
 @router.get("/specialties/by-drink/{drink_id}", response_model=List[SpecialtyProduct])
-def get_specialties_by_drink(drink_id: int, limit: int = 20):
+async def get_specialties_by_drink(drink_id: int, limit: int = 20):
     """
     Get specialty products linked to a specific drink via the bridge table
     """
+    index = get_specialty_index()
+    if index:
+        return index.for_drink(drink_id, limit)
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         query = """
             SELECT ls.local_id, ls.province, ls.city_county, ls.contents_name, ls.imgurl, ls.linkurl
             FROM local_specialties ls
@@ -98,15 +84,55 @@ def get_specialties_by_drink(drink_id: int, limit: int = 20):
             WHERE dlsb.drink_id = %s
             LIMIT %s
         """
-        cursor.execute(query, (drink_id, limit))
-        rows = cursor.fetchall()
-        conn.close()
+        rows = await fetch_all(query, (drink_id, limit))
         
         return rows
     except Exception as e:
         print(f"DB Error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch specialty products for drink: {str(e)}")
 
+HANSANG_MODEL = 'gemini-2.0-flash-exp'
+
+# 한상차림 추천 LLM 응답 캐시 (L1: 프로세스 LRU, L2: Redis)
+hansang_cache = TieredCache(
+    "llm:hansang",
+    maxsize=int(os.getenv("HANSANG_CACHE_SIZE", 512)),
+    ttl=float(os.getenv("HANSANG_CACHE_TTL", 7 * 24 * 3600))
+)
+
+def hansang_cache_key(drink_name: str, location: Optional[str], specialty_names: List[str], description: Optional[str]):
+    """
+    프롬프트를 결정하는 입력의 content hash.
+    특산물 모드(specialties) / 설명 모드(description) / 일반 모드(generic) 중 하나가 입력에 따라 정해집니다.
+    """
+    mode = "specialties" if specialty_names else ("description" if description else "generic")
+    payload = {
+        "mode": mode,
+        "model": HANSANG_MODEL,
+        "drink_name": drink_name.strip(),
+        "location": location,
+        "specialties": sorted(specialty_names),
+        "description": description
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+async def _generate_hansang_items(prompt: str) -> dict:
+    """Gemini 호출 + JSON 파싱"""
+    response = await generate_gemini(HANSANG_MODEL, prompt, label="Gemini API")
+    text = response.text
+    
+    # Clean up code blocks if present
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.endswith("```"):
+        text = text[:-3]
+    
+    try:
+        return json.loads(text.strip())
+    except json.JSONDecodeError:
+        print(f"Response text: {text}")
+        raise
+
 @router.post("/recommend", response_model=HansangResponse)
 async def generate_hansang_recommendations(request: HansangRequest):
     """
@@ -118,11 +144,12 @@ async def generate_hansang_recommendations(request: HansangRequest):
         raise HTTPException(status_code=500, detail="Gemini API Key is missing")
 
     try:
-        # First, fetch regional specialty products
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if request.city:
+        # First, fetch regional specialty products (memory index, DB fallback)
+        index = get_specialty_index()
+        if index:
+            # Handle both "여주" and "여주시" matching (city prefix)
+            specialties = index.by_region(request.province, request.city, limit=20, prefix=True)
+        elif request.city:
             # Handle both "여주" and "여주시" matching
             query = """
                 SELECT contents_name, imgurl, linkurl 
@@ -131,7 +158,7 @@ async def generate_hansang_recommendations(request: HansangRequest):
                 LIMIT 20
             """
             print(f"🔎 Querying: province='{request.province}', city='{request.city}'")
-            cursor.execute(query, (request.province, request.city, request.city))
+            specialties = await fetch_all(query, (request.province, request.city, request.city))
         else:
             query = """
                 SELECT contents_name, imgurl, linkurl 
@@ -139,10 +166,7 @@ async def generate_hansang_recommendations(request: HansangRequest):
                 WHERE province = %s 
                 LIMIT 20
             """
-            cursor.execute(query, (request.province,))
-        
-        specialties = cursor.fetchall()
-        conn.close()
+            specialties = await fetch_all(query, (request.province,))
         
         # DEBUG: Log retrieved specialties
         print(f"🔍 Retrieved {len(specialties)} specialties for {request.province} {request.city or ''}")
@@ -165,9 +189,6 @@ async def generate_hansang_recommendations(request: HansangRequest):
             use_generic = False
         
         # Generate AI recommendations using Gemini with SMART prompt
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        
         location_str = f"{request.province} {request.city}" if request.city else request.province
         
         if use_specialties:
@@ -283,26 +304,18 @@ async def generate_hansang_recommendations(request: HansangRequest):
 - JSON 형식만 출력하고 다른 말은 하지 말 것
 """
         
-        import time
-        start_time = time.time()
-        response = model.generate_content(prompt)
-        end_time = time.time()
-        
-        elapsed_time = end_time - start_time
-        print(f"⏱️ Gemini API Time: {elapsed_time:.2f}s")
-        
-        if response.usage_metadata:
-            print(f"💰 Gemini Token Usage: Input={response.usage_metadata.prompt_token_count}, Output={response.usage_metadata.candidates_token_count}, Total={response.usage_metadata.total_token_count}")
-        
-        text = response.text
-        
-        # Clean up code blocks if present
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.endswith("```"):
-            text = text[:-3]
-        
-        result = json.loads(text.strip())
+        # 같은 입력(모드/모델/술/지역/특산물/설명)의 추천은 캐시에서 재사용하고,
+        # 동시에 들어온 동일 요청은 Gemini 호출 하나를 공유 (single-flight)
+        cache_key = hansang_cache_key(
+            request.drink_name,
+            location_str if use_specialties else None,
+            [s['contents_name'] for s in specialties] if use_specialties else [],
+            description if (not use_specialties and has_description) else None
+        )
+        result = await hansang_cache.get_or_set(
+            cache_key,
+            lambda: _generate_hansang_items(prompt)
+        )
         
         # Enrich items with image URLs and link URLs from database
         enriched_items = []
@@ -352,7 +365,6 @@ async def generate_hansang_recommendations(request: HansangRequest):
         
     except json.JSONDecodeError as e:
         print(f"JSON Parse Error: {e}")
-        print(f"Response text: {text}")
         raise HTTPException(status_code=500, detail=f"Failed to parse AI response: {str(e)}")
     except Exception as e:
         print(f"Gemini Error: {e}")
@@ -1,5 +1,19 @@
 from fastapi import APIRouter
-from app.utils.es_client import get_es_client, get_connected_node_info
+from app.utils.es_client import get_async_es_client, get_connected_node_info_async, es_client_metrics
+from app.api.search import fuzzy_cache
+from app.utils.catalog import catalog_metrics
+from app.utils.search_stats import search_stats_metrics
+from app.db.mariadb import mariadb_pool_metrics
+from app.utils.cocktail_sampler import cocktail_sampler_metrics
+from app.utils.specialty_index import specialty_index_metrics
+from app.api.hansang import hansang_cache
+from app.api.chatbot import chat_answer_cache, classic_answer_cache
+from app.utils.llm_gateway import llm_metrics
+from app.utils.embeddings import embedding_metrics
+from app.utils.hybrid_search import hybrid_search_metrics
+from app.utils.weather import weather_metrics
+from app.utils.weather_prefetcher import weather_prefetch_metrics
+from app.utils.weather_matrix import weather_matrix_metrics
 
 router = APIRouter()
 
@@ -8,6 +22,49 @@ async def health_check():
     """기본 헬스 체크 엔드포인트"""
     return {"status": "ok", "service": "backend"}
 
+@router.get("/metrics")
+async def get_metrics():
+    """
+    백엔드 내부 메트릭을 반환합니다.
+    
+    Returns:
+        - elasticsearch: 공유 ES 클라이언트 헬스 상태 및 warm 클라이언트 사용 횟수
+        - search_cache: 퍼지 검색 결과 캐시 hit/miss/eviction 카운터
+        - catalog: 메모리 카탈로그 스냅샷 크기/세대 및 로컬 응답/ES fallback 횟수
+        - search_stats: 검색 통계 버퍼 대기 건수, flush 횟수, 버려진(dropped) 증가분
+        - mariadb: 커넥션 풀 크기/여유 커넥션 및 checkout 대기 시간
+        - cocktail_sampler: 랜덤 칵테일 메모리 샘플러 크기 및 DB fallback 횟수
+        - specialty_index: 지역 특산물 메모리 색인 크기/버전 및 hit/miss
+        - hansang_cache: 한상차림 LLM 응답 캐시 hit/miss 및 single-flight 공유 횟수
+        - chat_cache: 챗봇 유사 질문 답변 캐시(chat / classic-chat) hit/miss 및 절약한 LLM 호출 수/시간
+        - llm: provider별 동시 호출/대기 수, 지연 시간 및 토큰 수 히스토그램
+        - embeddings: 임베딩 모델 로드 상태, 인코딩 시간 및 질의 벡터 캐시
+        - hybrid_search: BM25 + kNN(RRF) 호출 수와 결과 출처(both / lexical_only / knn_only)
+        - weather: 날씨 캐시 fresh/stale hit, OWM을 기다린 miss 수 및 OWM 호출 수/평균 지연
+        - weather_prefetch: 날씨 prefetch 주기 수, 마지막 주기 갱신/실패 건수와 소요 시간
+        - weather_matrix: 날씨 × 지역 추천 행렬 재계산 건수, 추천 행렬 hit/miss, 행렬 캐시 상태
+    """
+    return {
+        "elasticsearch": es_client_metrics(),
+        "search_cache": fuzzy_cache.metrics(),
+        "catalog": catalog_metrics(),
+        "search_stats": search_stats_metrics(),
+        "mariadb": mariadb_pool_metrics(),
+        "cocktail_sampler": cocktail_sampler_metrics(),
+        "specialty_index": specialty_index_metrics(),
+        "hansang_cache": hansang_cache.metrics(),
+        "chat_cache": {
+            "chat": chat_answer_cache.metrics(),
+            "classic_chat": classic_answer_cache.metrics()
+        },
+        "llm": llm_metrics(),
+        "embeddings": embedding_metrics(),
+        "hybrid_search": hybrid_search_metrics(),
+        "weather": weather_metrics(),
+        "weather_prefetch": weather_prefetch_metrics(),
+        "weather_matrix": weather_matrix_metrics()
+    }
+
 @router.get("/es-info")
 async def get_elasticsearch_info():
     """
@@ -20,14 +77,14 @@ async def get_elasticsearch_info():
         - all_nodes: 클러스터의 모든 노드 정보 리스트
     """
     try:
-        es = get_es_client()
+        es = get_async_es_client()
         if not es:
             return {
                 "status": "error",
                 "message": "Elasticsearch 연결 실패"
             }
         
-        node_info = get_connected_node_info(es)
+        node_info = await get_connected_node_info_async(es)
         
         if node_info:
             return {
@@ -58,11 +115,11 @@ async def get_cluster_health():
         클러스터 헬스 정보 (green/yellow/red)
     """
     try:
-        es = get_es_client()
+        es = get_async_es_client()
         if not es:
             return {"status": "error", "message": "Elasticsearch 연결 실패"}
         
-        health = es.cluster.health()
+        health = await es.cluster.health()
         
         return {
             "status": "ok",
@@ -5,7 +5,7 @@ import json
 import uuid
 import time
 import base64
-import google.generativeai as genai
+import re
 
 router = APIRouter()
 
@@ -13,6 +13,7 @@ CLOVA_OCR_API_URL = os.getenv("CLOVA_OCR_API_URL")
 CLOVA_OCR_SECRET_KEY = os.getenv("CLOVA_OCR_SECRET_KEY")
 
 from app.utils.search_stats import save_search_query
+from app.utils.llm_gateway import generate_gemini
 
 async def process_clova_ocr(content: bytes, filename: str):
     if not CLOVA_OCR_API_URL or not CLOVA_OCR_SECRET_KEY:
@@ -74,15 +75,12 @@ async def process_clova_ocr(content: bytes, filename: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Clova OCR Error: {str(e)}")
 
-def process_gemini_ocr(content: bytes):
+async def process_gemini_ocr(content: bytes):
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise HTTPException(status_code=500, detail="Gemini API Key is missing")
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         # Convert bytes to a format Gemini accepts (e.g., PIL Image or direct bytes part)
         # Gemini Python SDK supports passing a dict with 'mime_type' and 'data'
         
@@ -93,16 +91,7 @@ def process_gemini_ocr(content: bytes):
         
         prompt = "Extract all text from this image. Output only the extracted text."
         
-        start_time = time.time()
-        response = model.generate_content([prompt, image_part])
-        end_time = time.time()
-        
-        elapsed_time = end_time - start_time
-        print(f"⏱️ Gemini OCR Time: {elapsed_time:.2f}s")
-        
-        if response.usage_metadata:
-            print(f"💰 Gemini OCR Token Usage: Input={response.usage_metadata.prompt_token_count}, Output={response.usage_metadata.candidates_token_count}, Total={response.usage_metadata.total_token_count}")
-            
+        response = await generate_gemini('gemini-2.5-flash', [prompt, image_part], label="Gemini OCR")
         text = response.text
         
         return {
@@ -114,6 +103,61 @@ def process_gemini_ocr(content: bytes):
         print(f"Gemini OCR Error: {e}")
         raise HTTPException(status_code=500, detail=f"Gemini OCR Error: {str(e)}")
 
+# Custom mapping for common traditional liquor names
+CUSTOM_ROMANIZATION = {
+    "geisha": "게이샤",
+    "baekseju": "백세주",
+    "makgeolli": "막걸리",
+    "hwayo": "화요",
+    "andong": "안동",
+    "gyeongju": "경주",
+    "chamisul": "참이슬",
+    "jinro": "진로",
+    "bokbunja": "복분자",
+    "soju": "소주",
+    "yakju": "약주",
+    "cheongju": "청주",
+}
+
+# Hangulize language profiles: Japanese, English, Italian
+HANGULIZE_LANGUAGES = ['jpn', 'eng', 'ita']
+
+# 한 번의 _msearch에 담을 최대 검색어 수
+MAX_SEARCH_QUERIES = 12
+
+def expand_search_candidates(candidates: list):
+    """
+    OCR 후보 문구 목록을 우선순위를 유지한 검색어 목록으로 확장합니다.
+    영문 문구는 원문 뒤에 커스텀 매핑 → Hangulize(jpn/eng/ita) 음역 결과를 덧붙입니다.
+    """
+    queries = []
+    for candidate in candidates:
+        queries.append(candidate)
+        if not re.match(r'^[a-zA-Z0-9\s\.,]+$', candidate):
+            continue
+
+        query_lower = candidate.lower().strip()
+        if query_lower in CUSTOM_ROMANIZATION:
+            print(f"🗺️ Custom Mapping: '{candidate}' -> '{CUSTOM_ROMANIZATION[query_lower]}'")
+            queries.append(CUSTOM_ROMANIZATION[query_lower])
+
+        try:
+            from hangulize import hangulize
+        except Exception as e:
+            print(f"⚠️ Hangulize Error: {e}")
+            continue
+
+        for lang in HANGULIZE_LANGUAGES:
+            try:
+                hangul_query = hangulize(candidate, lang)
+                print(f"🔤 Hangulize ({lang}): '{candidate}' -> '{hangul_query}'")
+                queries.append(hangul_query)
+            except Exception as lang_err:
+                print(f"⚠️ Hangulize {lang} failed: {lang_err}")
+
+    unique = list(dict.fromkeys(query for query in queries if query and query.strip()))
+    return unique[:MAX_SEARCH_QUERIES]
+
 @router.post("/analyze")
 async def analyze_image(
     file: UploadFile = File(...),
@@ -125,7 +169,7 @@ async def analyze_image(
         
         result = {}
         if provider == "gemini":
-            result = process_gemini_ocr(content)
+            result = await process_gemini_ocr(content)
         elif provider == "clova":
             result = await process_clova_ocr(content, file.filename)
         else:
@@ -134,11 +178,9 @@ async def analyze_image(
         print(f"[{provider.upper()}] Detected Text: {result.get('text', 'No text detected')}")
         
         # [NEW] Fuzzy Search Integration
-        from app.api.search import search_liquor_fuzzy
+        from app.api.search import search_liquor_fuzzy_batch
         detected_text = result.get('text', '')
         if detected_text:
-            import re
-            
             # Blocklist to filter out instructional/warning text (keep this)
             blocklist = [
                 "개봉", "보관", "반품", "유통기한", "경고", "지나친", "음주", "청소년", "임신", 
@@ -200,71 +242,19 @@ async def analyze_image(
                                 product_name_candidates.append(korean_only)
                                 break
             
-            # Choose the best candidate
-            if product_name_candidates:
-                search_query = product_name_candidates[0]
-            elif lines:
-                # Last resort: use first non-blocklisted line
-                valid_lines = [line for line in lines if not any(keyword in line for keyword in blocklist)]
-                search_query = valid_lines[0] if valid_lines else lines[0]
-            else:
-                search_query = detected_text[:20]
+            # Choose the candidates (all extracted phrases, in priority order)
+            if not product_name_candidates:
+                if lines:
+                    # Last resort: use first non-blocklisted line
+                    valid_lines = [line for line in lines if not any(keyword in line for keyword in blocklist)]
+                    product_name_candidates = [valid_lines[0] if valid_lines else lines[0]]
+                else:
+                    product_name_candidates = [detected_text[:20]]
 
-            print(f"🔍 Search Query: '{search_query}'")
-            search_result = search_liquor_fuzzy(search_query)
-            
-            # [NEW] Romanization Support (Hangulize + Custom Mapping)
-            # If no result found AND query is English, try converting to Hangul
-            if not search_result and re.match(r'^[a-zA-Z0-9\s\.,]+$', search_query):
-                # Custom mapping for common traditional liquor names
-                custom_romanization = {
-                    "geisha": "게이샤",
-                    "baekseju": "백세주",
-                    "makgeolli": "막걸리",
-                    "hwayo": "화요",
-                    "andong": "안동",
-                    "gyeongju": "경주",
-                    "chamisul": "참이슬",
-                    "jinro": "진로",
-                    "bokbunja": "복분자",
-                    "soju": "소주",
-                    "yakju": "약주",
-                    "cheongju": "청주",
-                }
-                
-                # Try custom mapping first
-                query_lower = search_query.lower().strip()
-                if query_lower in custom_romanization:
-                    hangul_query = custom_romanization[query_lower]
-                    print(f"🗺️ Custom Mapping: '{search_query}' -> '{hangul_query}'")
-                    search_result = search_liquor_fuzzy(hangul_query)
-                    if search_result:
-                        print(f"✅ Custom Match Found: '{search_result['name']}'")
-                
-                # If custom mapping didn't work, try Hangulize with multiple languages
-                if not search_result:
-                    try:
-                        from hangulize import hangulize
-                        # Try multiple language profiles
-                        language_profiles = ['jpn', 'eng', 'ita']  # Japanese, English, Italian
-                        
-                        for lang in language_profiles:
-                            try:
-                                hangul_query = hangulize(search_query, lang)
-                                print(f"🔤 Hangulize ({lang}): '{search_query}' -> '{hangul_query}'")
-                                
-                                # Search with hangulized query
-                                hangul_search_result = search_liquor_fuzzy(hangul_query)
-                                if hangul_search_result:
-                                    search_result = hangul_search_result
-                                    print(f"✅ Hangulize Match Found ({lang}): '{search_result['name']}'")
-                                    break
-                            except Exception as lang_err:
-                                print(f"⚠️ Hangulize {lang} failed: {lang_err}")
-                                continue
-                                
-                    except Exception as e:
-                        print(f"⚠️ Hangulize Error: {e}")
+            # 모든 후보 문구 + 음역 결과를 _msearch 한 번으로 검색 후 점수/우선순위로 재정렬
+            search_queries = expand_search_candidates(product_name_candidates)
+            print(f"🔍 Search Queries ({len(search_queries)}): {search_queries}")
+            search_result = await search_liquor_fuzzy_batch(search_queries)
 
             if search_result:
                 result['search_result'] = search_result
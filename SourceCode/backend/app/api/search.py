@@ -1,25 +1,207 @@
 
+import asyncio
+import json
+import os
+import unicodedata
 from fastapi import APIRouter, HTTPException
-from app.utils.es_client import get_es_client
+from fastapi.responses import StreamingResponse
+from app.utils.es_client import get_async_es_client, es_search, es_msearch
+from app.utils.cache import MISSING, TieredCache, get_index_generation
+from app.utils.catalog import get_catalog, name_dice, name_match_score, record_local_result
+from app.utils.embeddings import document_embedding_text, embed_query
+from app.utils.hybrid_search import hybrid_enabled, hybrid_search
 from app.db.mariadb import get_liquor_details
-from app.utils.search_stats import save_search_query, get_top_searches
+from app.utils.search_stats import (
+    LEADERBOARD_WINDOWS, TRENDING_WINDOWS, get_top_searches, get_trending_searches, save_search_query
+)
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class SearchRequest(BaseModel):
     query: str
 
 router = APIRouter()
 
-def search_liquor_fuzzy(text: str):
-    es = get_es_client()
+INDEX_NAME = "liquor_integrated"
+
+# search_liquor_fuzzy 결과 캐시 (OCR/날씨 추천/수동 검색 공용)
+# 키: 인덱스 세대 + ES에 보내는 검색어(NFC/공백 정리, 대소문자 유지) → ETL 실행 시 세대가 바뀌어 일괄 무효화
+# (v2: score가 0~100 이름 유사도로 바뀌어 이전 형식 항목과 섞이지 않도록 네임스페이스 변경)
+fuzzy_cache = TieredCache(
+    "search:fuzzy:v2",
+    maxsize=int(os.getenv("SEARCH_CACHE_SIZE", 2048)),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", 3600))
+)
+
+# search_liquor_fuzzy_batch에서 후보 문구 우선순위 1단계마다 곱하는 점수 가중치
+BATCH_PRIORITY_DECAY = 0.9
+
+def _format_fuzzy_result(source: dict, score: float, candidates: list, es_score: Optional[float] = None):
+    """
+    Transform an index document to the Frontend 'SearchResult' interface
+    score는 출처(로컬 스냅샷 / ES)와 무관하게 0~100 이름 유사도(name_match_score),
+    ES 관련도(BM25 × boost)는 es_score에 따로 담습니다. (로컬 결과는 None)
+    candidates: [(source, score, es_score)]
+    """
+    return {
+        "id": source.get('drink_id'),
+        "name": source.get('name'),
+        "description": source.get('description') or source.get('intro'),
+        "intro": source.get('intro'), 
+        "image_url": source.get('image_url'),
+        "url": source.get('url', ''),
+        "tags": [], 
+        "score": score,
+        "es_score": es_score,
+        "province": source.get('region', {}).get('province'),
+        "city": source.get('region', {}).get('city'),
+        "detail": {
+            "알콜도수": f"{source.get('alcohol', 0) * 100:.1f}%",
+            "용량": source.get('volume'),
+            "종류": source.get('type'),
+            "원재료": source.get('ingredients'),
+            "수상내역": ", ".join(source.get('awards', [])) if isinstance(source.get('awards'), list) else str(source.get('awards', ''))
+        },
+        "brewery": {
+            "name": None, 
+            "address": source.get('region', {}).get('city'),
+            "homepage": None,
+            "contact": None
+        },
+        "pairing_food": source.get('foods', []), 
+        "cocktails": source.get('cocktails', []), 
+        "selling_shops": source.get('selling_shops', []), 
+        "encyclopedia": source.get('description', ''), # Mapping description here too or separate?
+        "candidates": [
+            {
+                "name": candidate['name'],
+                "score": candidate_score,
+                "es_score": candidate_es_score,
+                "image_url": candidate.get('image_url', ''),
+                "id": candidate.get('drink_id')
+            }
+            for candidate, candidate_score, candidate_es_score in candidates
+        ]
+    }
+
+def _search_liquor_fuzzy_local(text: str):
+    """메모리 스냅샷의 확실한 매칭 결과 (없거나 애매하면 None)"""
+    catalog = get_catalog()
+    if not catalog:
+        return None
+    matches = catalog.best_match(text)
+    record_local_result(matches is not None)
+    if not matches:
+        return None
+    row, score = matches[0]
+    candidates = [(catalog.sources[r], round(s * 100, 2), None) for r, s in matches]
+    return _format_fuzzy_result(catalog.sources[row], round(score * 100, 2), candidates)
+
+def _es_query_text(text: str) -> str:
+    """ES 검색어이자 결과 캐시 키: NFC/공백만 정리 (대소문자는 name.keyword 정확 일치에 영향을 주므로 유지)"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+async def search_liquor_fuzzy(text: str):
+    query_text = _es_query_text(text)
+    if not query_text:
+        return None
+
+    # 1. 메모리 스냅샷에서 확실한 매칭이면 네트워크 없이 응답
+    local_result = _search_liquor_fuzzy_local(text)
+    if local_result:
+        return local_result
+
+    # 2. 결과 캐시 → 3. Elasticsearch
+    generation = await get_index_generation(INDEX_NAME)
+    cache_key = f"{generation}:{query_text}"
+    cached = await fuzzy_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    es = get_async_es_client()
     if not es:
         print("❌ Elasticsearch client not available")
         return None
 
+    try:
+        result = await _search_liquor_fuzzy_es(es, query_text)
+    except Exception:
+        return None
+
+    # 일치 결과가 없는 경우(None)도 캐시하여 반복되는 OCR 잡음 검색을 흡수
+    await fuzzy_cache.set(cache_key, result)
+    return result
+
+async def search_liquor_fuzzy_batch(texts: list):
+    """
+    여러 후보 문구(OCR 추출 문구 + 음역 결과)를 한 번에 검색해 가장 좋은 1건을 반환합니다.
+    texts는 우선순위 순서이며, 로컬 스냅샷/캐시로 해결되지 않은 문구만 _msearch 한 번으로 조회합니다.
+    결과는 (점수 × 우선순위 가중치)로 다시 정렬하고, candidates는 전체 문구의 후보를 합쳐 채웁니다.
+    """
+    queries = []
+    seen = set()
+    for text in texts:
+        query_text = _es_query_text(text)
+        if query_text and query_text not in seen:
+            seen.add(query_text)
+            queries.append(query_text)
+    if not queries:
+        return None
+
+    results = [_search_liquor_fuzzy_local(text) for text in queries]
+    is_local = [result is not None for result in results]
+
+    generation = await get_index_generation(INDEX_NAME)
+    pending = [i for i, result in enumerate(results) if result is None]
+    cached = await asyncio.gather(*(fuzzy_cache.get(f"{generation}:{queries[i]}") for i in pending))
+
+    misses = []
+    for i, value in zip(pending, cached):
+        if value is MISSING:
+            misses.append(i)
+        else:
+            results[i] = value
+
+    es = get_async_es_client() if misses else None
+    if es:
+        try:
+            response = await es_msearch(es, INDEX_NAME, [_build_fuzzy_query(queries[i]) for i in misses])
+            for i, item in zip(misses, response['responses']):
+                if "error" in item:
+                    print(f"⚠️ msearch item error for '{queries[i]}': {item['error']}")
+                    continue
+                results[i] = _format_fuzzy_hits(item['hits']['hits'], queries[i])
+                await fuzzy_cache.set(f"{generation}:{queries[i]}", results[i])
+        except Exception as e:
+            print(f"❌ Batch search error: {e}")
+
+    # 로컬 스냅샷의 확실한 매칭은 신뢰 기준(MATCH_THRESHOLD/MARGIN)을 통과한 결과이므로 별도 등급으로 우선하고,
+    # 같은 등급 안에서는 우선순위가 낮은 문구일수록 점수를 할인해 비슷한 점수면 앞선 문구가 이기도록 함
+    ranked_results = [
+        (is_local[i], result['score'] * BATCH_PRIORITY_DECAY ** i, i, result)
+        for i, result in enumerate(results) if result
+    ]
+    if not ranked_results:
+        return None
+
+    ranked_results.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    best_tier = ranked_results[0][0]
+    merged = {}
+    for tier, _, priority, result in ranked_results:
+        if tier != best_tier:
+            continue
+        for candidate in result['candidates']:
+            weighted = candidate['score'] * BATCH_PRIORITY_DECAY ** priority
+            key = candidate.get('id') or candidate['name']
+            if key not in merged or merged[key][0] < weighted:
+                merged[key] = (weighted, candidate)
+
+    candidates = sorted(merged.values(), key=lambda item: item[0], reverse=True)
+    return {**ranked_results[0][3], "candidates": [candidate for _, candidate in candidates[:5]]}
+
+def _build_fuzzy_query(text: str):
+    """이름 유사도 5단계 bool 쿼리 본문 (단건 검색과 _msearch 배치 검색 공용)"""
     # Search query: Multi-level scoring for better accuracy
-    index_name = "liquor_integrated"
-    
     query = {
         "query": {
             "bool": {
@@ -80,94 +262,42 @@ def search_liquor_fuzzy(text: str):
         "min_score": 3.0,  # Increased threshold
         "size": 10
     }
+    return query
 
+def _format_fuzzy_hits(hits: list, text: str):
+    """ES 순위는 유지하고 score는 로컬 스냅샷과 같은 0~100 이름 유사도로 계산"""
+    if not hits:
+        return None
+    candidates = [
+        (hit['_source'], round(name_match_score(text, hit['_source'].get('name')) * 100, 2), hit['_score'])
+        for hit in hits[:5]
+    ]
+    source, score, es_score = candidates[0]
+    return _format_fuzzy_result(source, score, candidates, es_score)
+
+async def _search_liquor_fuzzy_es(es, text: str):
+    """5단계 bool 쿼리로 가장 유사한 술 1건을 찾습니다. (검색 오류는 호출자에게 전달)"""
     try:
-        response = es.search(index=index_name, body=query)
-        hits = response['hits']['hits']
-        
-        if hits:
-            best_match = hits[0]['_source']
-            score = hits[0]['_score']
-            
-            print(f"✅ ES Match Found: '{best_match.get('name')}' (Score: {score})")
-            
-            # Transform ES data to Frontend 'SearchResult' interface
-            source = best_match
-            
-            # Type mapping (approximate based on common IDs)
-            type_map = {
-                1: "과실주", 2: "리큐르/기타주류", 3: "약주,청주", 4: "증류주", 
-                5: "탁주(고도0)", 6: "탁주(저도)", 7: "기타"
-            }
-            type_id = source.get('type_id')
-            drink_type = type_map.get(type_id, "전통주") if type_id else "전통주"
-
-            # Format ABV
-            abv = source.get('drink_abv')
-            if abv:
-                try:
-                    abv_float = float(abv)
-                    if abv_float < 1.0:
-                        abv = f"{int(abv_float * 100)}%"
-                    else:
-                        abv = f"{abv}%"
-                except ValueError:
-                    abv = f"{abv}%"
-
-            result = {
-                "id": source.get('drink_id'),
-                "name": source.get('name'),
-                "description": source.get('description') or source.get('intro'),
-                "intro": source.get('intro'), 
-                "image_url": source.get('image_url'),
-                "url": source.get('url', ''),
-                "tags": [], 
-                "score": score,
-                "province": source.get('region', {}).get('province'),
-                "city": source.get('region', {}).get('city'),
-                "detail": {
-                    "알콜도수": f"{source.get('alcohol', 0) * 100:.1f}%",
-                    "용량": source.get('volume'),
-                    "종류": source.get('type'),
-                    "원재료": source.get('ingredients'),
-                    "수상내역": ", ".join(source.get('awards', [])) if isinstance(source.get('awards'), list) else str(source.get('awards', ''))
-                },
-                "brewery": {
-                    "name": None, 
-                    "address": source.get('region', {}).get('city'),
-                    "homepage": None,
-                    "contact": None
-                },
-                "pairing_food": source.get('foods', []), 
-                "cocktails": source.get('cocktails', []), 
-                "selling_shops": source.get('selling_shops', []), 
-                "encyclopedia": source.get('description', ''), # Mapping description here too or separate?
-                "candidates": [
-                    {
-                        "name": hit['_source']['name'],
-                        "score": hit['_score'],
-                        "image_url": hit['_source'].get('image_url', ''),
-                        "id": hit['_source'].get('drink_id')
-                    }
-                    for hit in response['hits']['hits'][:5]
-                ]
-            }
-            
+        response = await es_search(es, INDEX_NAME, _build_fuzzy_query(text))
+        result = _format_fuzzy_hits(response['hits']['hits'], text)
+
+        if result:
+            print(f"✅ ES Match Found: '{result['name']}' (Score: {result['score']})")
             return result
-        
+
         print(f"❌ No ES match found for '{text}'")
         return None
 
     except Exception as e:
         print(f"❌ Search error: {e}")
-        return None
+        raise
 
 class SearchRequest(BaseModel):
     query: str
 
 @router.post("")
 async def search_endpoint(request: SearchRequest):
-    result = search_liquor_fuzzy(request.query)
+    result = await search_liquor_fuzzy(request.query)
     if not result:
         raise HTTPException(status_code=404, detail="Liquor not found")
     return result
@@ -175,12 +305,133 @@ async def search_endpoint(request: SearchRequest):
 # Weather-based recommendation weights
 WEATHER_WEIGHTS = {
     "rain": {"탁주": 3, "탁주(고도0)": 3, "탁주(저도)": 3, "약주": 2, "약주,청주": 2},
+    "sleet": {"증류주": 3, "약주": 2, "약주,청주": 2},
     "snow": {"증류주": 3, "약주": 2, "약주,청주": 2},
     "cold": {"증류주": 3, "약주": 2, "약주,청주": 2},
     "hot": {"과실주": 3, "탁주": 2, "탁주(저도)": 2, "리큐르/기타주류": 2},
+    "cloudy": {"약주": 3, "약주,청주": 3, "탁주": 2},
     "clear": {"약주": 2, "약주,청주": 2, "과실주": 2}
 }
 
+# Map Korean season to English for ES
+SEASON_MAP = {
+    "봄": "Spring",
+    "여름": "Summer",
+    "가을": "Autumn",
+    "겨울": "Winter"
+}
+
+# /region/stream에서 search_after 한 번에 가져오는 문서 수 (응답 메모리 상한)
+REGION_STREAM_PAGE_SIZE = int(os.getenv("REGION_STREAM_PAGE_SIZE", 200))
+REGION_PIT_KEEP_ALIVE = "1m"
+
+# size > 0 인 /region 응답도 샤드 요청 캐시에 저장 (request_cache=true)
+REGION_REQUEST_CACHE = os.getenv("REGION_REQUEST_CACHE", "true").lower() == "true"
+
+def _build_region_query(
+    province: str,
+    city: Optional[str] = None,
+    season: Optional[str] = None,
+    weather_condition: Optional[str] = None,
+    weather_sort: bool = False,
+    types: Optional[List[str]] = None
+):
+    """
+    지역 검색 쿼리 본문 (query + sort).
+    가격 우선순위는 ETL에서 계산한 price_tier 필드로 정렬하고,
+    날씨 정렬은 function_score로 엔진에서 점수화합니다.
+      score = 가격 있음(100) + 날씨 가중치(주종별, 기본 1)
+    """
+    # Note: 'province' and 'city' are nested in 'region' in ETL: "region": { "province": ..., "city": ... }
+    # region/season/type은 모두 keyword 필드이므로 점수 계산 없는 filter 절(term/terms)로 조회해
+    # 노드 쿼리 캐시(filter cache)를 타도록 함
+    filters = [
+        {"term": {"region.province": province}}
+    ]
+
+    if city:
+        filters.append({"term": {"region.city": city}})
+
+    if season:
+        english_season = SEASON_MAP.get(season, season) # Default to original if no match (e.g. already English)
+        filters.append({"term": {"season": english_season}})
+
+    if types:
+        filters.append({"terms": {"type": types}})
+
+    query = {"bool": {"filter": filters}}
+    # price_tier: 0 = 온라인 최저가, 1 = 백과사전 참고가, 2 = 가격 없음 (재적재 전 문서는 맨 뒤)
+    sort = [
+        {"price_tier": {"order": "asc", "missing": "_last", "unmapped_type": "byte"}},
+        {"lowest_price": {"order": "asc", "missing": "_last"}}
+    ]
+
+    if weather_sort and weather_condition:
+        weights = WEATHER_WEIGHTS.get(weather_condition, {})
+        functions = [
+            {"filter": {"term": {"has_price": True}}, "weight": 100},
+            {"weight": 1}
+        ]
+        functions += [
+            {"filter": {"term": {"type": type_name}}, "weight": weight - 1}
+            for type_name, weight in weights.items() if weight > 1
+        ]
+        query = {
+            "function_score": {
+                "query": query,
+                "functions": functions,
+                "score_mode": "sum",
+                "boost_mode": "replace"
+            }
+        }
+        # Sort by: 1) has_price + weather_score (desc), 2) price (asc)
+        sort = [{"_score": {"order": "desc"}}, {"lowest_price": {"order": "asc", "missing": "_last"}}]
+
+    return {"query": query, "sort": sort}
+
+def _split_types(value: Optional[str]):
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()] or None
+
+def _format_region_hit(hit: dict, weights: Optional[dict] = None):
+    source = hit['_source']
+    item = {
+        "id": source.get('drink_id'),
+        "name": source.get('name'),
+        "image_url": source.get('image_url'),
+        "type": source.get('type') or "전통주",
+        "alcohol": f"{source.get('alcohol', 0) * 100:.1f}%",
+        "price": source.get('lowest_price', 0), # Direct from unified index
+        "volume": source.get('volume'),
+        "province": source.get('region', {}).get('province'),
+        "city": source.get('region', {}).get('city')
+    }
+    if weights is not None:
+        item["weather_score"] = weights.get(item["type"], 1)
+        item["has_price"] = 1 if (item.get("price") and item.get("price") > 0) else 0
+    return item
+
+# 날씨 정렬 /region 결과 행렬: (인덱스 세대, 도, 날씨 조건) → 정렬된 전체 목록
+# 날씨 갱신 주기마다 weather_matrix가 사용 중인 날씨 조건만 미리 채우고, 없으면 첫 요청이 채움
+REGION_MATRIX_SIZE = int(os.getenv("REGION_MATRIX_SIZE", 1000))
+region_matrix_cache = TieredCache(
+    "search:region_weather",
+    maxsize=int(os.getenv("REGION_MATRIX_CACHE_SIZE", 256)),
+    ttl=float(os.getenv("WEATHER_MATRIX_TTL", 6 * 3600))
+)
+
+def region_matrix_key(generation: str, province: str, condition: str) -> str:
+    return f"{generation}:{province}:{condition}"
+
+async def build_region_weather_list(es, province: str, condition: str):
+    """도 전체를 날씨 조건으로 정렬한 목록 (도시/계절/주종 필터 없음, 최대 REGION_MATRIX_SIZE개)"""
+    query = _build_region_query(province, weather_condition=condition, weather_sort=True)
+    query["size"] = REGION_MATRIX_SIZE
+    response = await es_search(es, INDEX_NAME, query, request_cache=REGION_REQUEST_CACHE)
+    weights = WEATHER_WEIGHTS.get(condition, {})
+    return [_format_region_hit(hit, weights) for hit in response['hits']['hits']]
+
 @router.get("/region")
 async def search_by_region(
     province: str, 
@@ -188,114 +439,123 @@ async def search_by_region(
     season: Optional[str] = None, 
     weather_condition: Optional[str] = None,
     weather_sort: bool = False,
-    size: int = 1000
+    size: int = 1000,
+    type: Optional[str] = None
 ):
     """
     Search drinks by region using Elasticsearch for high performance.
     Supports filtering by season (Spring, Summer, Autumn, Winter).
     Supports weather-based sorting when weather_sort=true.
+    Supports filtering by drink type (comma-separated, e.g. type=탁주,약주).
+    For large result sets prefer /region/stream (cursor-based NDJSON).
     """
-    es = get_es_client()
+    es = get_async_es_client()
     if not es:
         # Fallback to DB if ES is down (optional, but good for reliability)
         print("⚠️ ES unavailable, falling back to DB...")
         # ... (We could keep the DB logic here as fallback, but for now let's rely on ES as requested)
         raise HTTPException(status_code=500, detail="Search Engine Error")
 
-    # Build ES Query
-    # Note: 'province' and 'city' are nested in 'region' in ETL, but mapped flat?
-    # Checked ETL: "region": { "province": ..., "city": ... }
-    # So we need nested query or use dot notation if mapped as object?
-    # Default dynamic mapping for dict is object. So 'region.province'.
-    
-    must_conditions = [
-        {"match": {"region.province": province}}
-    ]
-    
-    if city:
-        must_conditions.append({"match": {"region.city": city}})
-
-    if city:
-        must_conditions.append({"match": {"region.city": city}})
-
-    if season:
-        # Map Korean season to English for ES
-        season_map = {
-            "봄": "Spring",
-            "여름": "Summer",
-            "가을": "Autumn",
-            "겨울": "Winter"
-        }
-        english_season = season_map.get(season, season) # Default to original if no match (e.g. already English)
-        must_conditions.append({"match": {"season": english_season}})
-
-    query = {
-        "query": {
-            "bool": {
-                "must": must_conditions
-            }
-        },
-        "sort": [
-            # 1. Prioritize items with lowest_price (online shops)
-            {"_script": {
-                "type": "number",
-                "script": {
-                    "source": "doc['lowest_price'].size() > 0 ? 0 : (doc['encyclopedia_price_text.keyword'].size() > 0 ? 1 : 2)",
-                    "lang": "painless"
-                },
-                "order": "asc"
-            }},
-            # 2. Then sort by actual price (ascending)
-            {"lowest_price": {"order": "asc", "missing": "_last"}}
-        ],
-        "size": size
-    }
+    # 필터 없는 날씨 정렬은 미리 계산된 행렬에서 키 조회 한 번으로 응답
+    if weather_sort and weather_condition in WEATHER_WEIGHTS and not (city or season or type):
+        key = region_matrix_key(await get_index_generation(INDEX_NAME), province, weather_condition)
+        try:
+            items = await region_matrix_cache.get_or_set(
+                key, lambda: build_region_weather_list(es, province, weather_condition)
+            )
+        except Exception as e:
+            print(f"❌ ES Region Search Error: {e}")
+            return []
+        # 행렬 목록이 잘렸고 더 많이 요청한 경우에만 아래에서 직접 검색
+        if size <= REGION_MATRIX_SIZE or len(items) < REGION_MATRIX_SIZE:
+            return items[:size]
+
+    query = _build_region_query(province, city, season, weather_condition, weather_sort, _split_types(type))
+    query["size"] = size
+    weights = WEATHER_WEIGHTS.get(weather_condition, {}) if weather_sort and weather_condition else None
     
     try:
-        response = es.search(index="liquor_integrated", body=query)
-        hits = response['hits']['hits']
-        
-        results = []
-        for hit in hits:
-            source = hit['_source']
-            name = source.get('name')
-            
-            results.append({
-                "id": source.get('drink_id'),
-                "name": name,
-                "image_url": source.get('image_url'),
-                "type": source.get('type') or "전통주",
-                "alcohol": f"{source.get('alcohol', 0) * 100:.1f}%",
-                "price": source.get('lowest_price', 0), # Direct from unified index
-                "volume": source.get('volume'),
-                "province": source.get('region', {}).get('province'),
-                "city": source.get('region', {}).get('city')
-            })
-        
-        # Apply weather-based sorting
-        if weather_sort and weather_condition:
-            weights = WEATHER_WEIGHTS.get(weather_condition, {})
-            for item in results:
-                type_name = item.get("type", "")
-                item["weather_score"] = weights.get(type_name, 1)
-                # Add has_price flag for sorting priority
-                item["has_price"] = 1 if (item.get("price") and item.get("price") > 0) else 0
-            # Sort by: 1) has_price (desc), 2) weather_score (desc), 3) price (asc)
-            results.sort(key=lambda x: (-x.get("has_price", 0), -x.get("weather_score", 1), x.get("price", 999999)))
-            
-        return results
+        # 지도 페이지의 반복되는 도(province) 조회는 샤드 요청 캐시로 응답 (인덱스 refresh 시 자동 무효화)
+        response = await es_search(es, INDEX_NAME, query, request_cache=REGION_REQUEST_CACHE)
+        return [_format_region_hit(hit, weights) for hit in response['hits']['hits']]
 
     except Exception as e:
         print(f"❌ ES Region Search Error: {e}")
         return []
 
-
-@router.get("/detail/{drink_id}")
-async def get_drink_detail(drink_id: int):
+@router.get("/region/stream")
+async def stream_by_region(
+    province: str,
+    city: Optional[str] = None,
+    season: Optional[str] = None,
+    weather_condition: Optional[str] = None,
+    weather_sort: bool = False,
+    size: Optional[int] = None,
+    type: Optional[str] = None
+):
     """
-    Get detailed information for a specific drink by ID.
+    /region과 같은 결과를 point-in-time + search_after 커서로 페이지 단위 조회하여
+    NDJSON(한 줄에 술 1건)으로 스트리밍합니다. 지역 크기와 무관하게 서버 메모리는 한 페이지로 고정됩니다.
     """
-    es = get_es_client()
+    es = get_async_es_client()
+    if not es:
+        raise HTTPException(status_code=500, detail="Search Engine Error")
+
+    query = _build_region_query(province, city, season, weather_condition, weather_sort, _split_types(type))
+    # PIT 내 동일 정렬값 문서의 순서를 고정하기 위한 tiebreaker
+    query["sort"].append({"_shard_doc": "asc"})
+    weights = WEATHER_WEIGHTS.get(weather_condition, {}) if weather_sort and weather_condition else None
+
+    try:
+        pit = await es.open_point_in_time(index=INDEX_NAME, keep_alive=REGION_PIT_KEEP_ALIVE)
+    except Exception as e:
+        print(f"❌ ES Region PIT Error: {e}")
+        raise HTTPException(status_code=500, detail="Search Engine Error")
+
+    async def generate():
+        pit_id = pit["id"]
+        remaining = size
+        search_after = None
+        try:
+            while remaining is None or remaining > 0:
+                page_size = REGION_STREAM_PAGE_SIZE if remaining is None else min(REGION_STREAM_PAGE_SIZE, remaining)
+                body = {
+                    **query,
+                    "size": page_size,
+                    "pit": {"id": pit_id, "keep_alive": REGION_PIT_KEEP_ALIVE},
+                    "track_total_hits": False
+                }
+                if search_after:
+                    body["search_after"] = search_after
+
+                response = await es_search(es, None, body)
+                pit_id = response.get("pit_id", pit_id)
+                hits = response['hits']['hits']
+                if not hits:
+                    break
+
+                yield "".join(json.dumps(_format_region_hit(hit, weights), ensure_ascii=False) + "\n" for hit in hits)
+
+                search_after = hits[-1]["sort"]
+                if remaining is not None:
+                    remaining -= len(hits)
+                if len(hits) < page_size:
+                    break
+        except Exception as e:
+            # 이미 응답이 시작되었으므로 오류는 마지막 줄로 알림
+            print(f"❌ ES Region Stream Error: {e}")
+            yield json.dumps({"error": "Search Engine Error"}) + "\n"
+        finally:
+            try:
+                await es.close_point_in_time(id=pit_id)
+            except Exception as e:
+                print(f"⚠️ ES Region PIT close error: {e}")
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def _fetch_drink_source(drink_id: int):
+    es = get_async_es_client()
     if not es:
         raise HTTPException(status_code=500, detail="Search Engine Error")
 
@@ -309,70 +569,88 @@ async def get_drink_detail(drink_id: int):
             }
         }
         
-        response = es.search(index="liquor_integrated", body=query)
+        response = await es_search(es, INDEX_NAME, query)
         hits = response['hits']['hits']
         
         if not hits:
             raise HTTPException(status_code=404, detail="Drink not found")
             
-        source = hits[0]['_source']
-        
-        # 술 상세 정보 조회 통계 저장
-        drink_name = source.get('name')
-        drink_id_value = source.get('drink_id')
-        if drink_name:
-            await save_search_query(drink_name, drink_id=drink_id_value)
-        
-        return {
-            "id": source.get('drink_id'),
-            "name": source.get('name'),
-            "description": source.get('description') or source.get('intro', ''),
-            "intro": source.get('intro'),
-            "image_url": source.get('image_url'),
-            "abv": f"{source.get('alcohol', 0) * 100:.1f}%",
-            "volume": source.get('volume'),
-            "type": source.get('type'),
-            "foods": source.get('foods', []),
-            "cocktails": source.get('cocktails', []),
-            "encyclopedia": source.get('encyclopedia', []), # Encyclopedia content (sections list)
-            "selling_shops": source.get('selling_shops', []),
-            "brewery": {
-                "name": None,
-                "address": source.get('region', {}).get('city'),
-                 "homepage": None,
-                "contact": None
-            },
-            "province": source.get('region', {}).get('province'),
-            "city": source.get('region', {}).get('city'),
-            "detail": {
-                "알콜도수": f"{source.get('alcohol', 0) * 100:.1f}%",
-                "용량": source.get('volume'),
-                "종류": source.get('type'),
-                "원재료": source.get('ingredients', ''),
-                "수상내역": ", ".join(source.get('awards', [])) if isinstance(source.get('awards'), list) else str(source.get('awards', ''))
-            },
-            # NEW: Encyclopedia price fields
-            "price_is_reference": source.get('price_is_reference', False),
-            "encyclopedia_price_text": source.get('encyclopedia_price_text'),
-            "encyclopedia_url": source.get('encyclopedia_url')
-        }
+        return hits[0]['_source']
 
     except HTTPException as he:
         raise he
+    except asyncio.TimeoutError:
+        print(f"❌ Detail Search Timeout: drink_id={drink_id}")
+        raise HTTPException(status_code=504, detail="Search Engine Timeout")
     except Exception as e:
         print(f"❌ Detail Search Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/detail/{drink_id}")
+async def get_drink_detail(drink_id: int):
+    """
+    Get detailed information for a specific drink by ID.
+    Served from the in-memory catalog snapshot, falling back to Elasticsearch.
+    """
+    catalog = get_catalog()
+    source = catalog.get(drink_id) if catalog else None
+    if catalog:
+        record_local_result(source is not None)
+
+    if source is None:
+        source = await _fetch_drink_source(drink_id)
+        
+    # 술 상세 정보 조회 통계 저장
+    drink_name = source.get('name')
+    drink_id_value = source.get('drink_id')
+    if drink_name:
+        await save_search_query(drink_name, drink_id=drink_id_value)
+    
+    return {
+        "id": source.get('drink_id'),
+        "name": source.get('name'),
+        "description": source.get('description') or source.get('intro', ''),
+        "intro": source.get('intro'),
+        "image_url": source.get('image_url'),
+        "abv": f"{source.get('alcohol', 0) * 100:.1f}%",
+        "volume": source.get('volume'),
+        "type": source.get('type'),
+        "foods": source.get('foods', []),
+        "cocktails": source.get('cocktails', []),
+        "encyclopedia": source.get('encyclopedia', []), # Encyclopedia content (sections list)
+        "selling_shops": source.get('selling_shops', []),
+        "brewery": {
+            "name": None,
+            "address": source.get('region', {}).get('city'),
+             "homepage": None,
+            "contact": None
+        },
+        "province": source.get('region', {}).get('province'),
+        "city": source.get('region', {}).get('city'),
+        "detail": {
+            "알콜도수": f"{source.get('alcohol', 0) * 100:.1f}%",
+            "용량": source.get('volume'),
+            "종류": source.get('type'),
+            "원재료": source.get('ingredients', ''),
+            "수상내역": ", ".join(source.get('awards', [])) if isinstance(source.get('awards'), list) else str(source.get('awards', ''))
+        },
+        # NEW: Encyclopedia price fields
+        "price_is_reference": source.get('price_is_reference', False),
+        "encyclopedia_price_text": source.get('encyclopedia_price_text'),
+        "encyclopedia_url": source.get('encyclopedia_url')
+    }
+
 class SimilarSearchRequest(BaseModel):
     name: str
     exclude_id: Optional[int] = None
+    mode: Optional[str] = None # lexical | hybrid (기본: SEARCH_HYBRID 설정)
 
-def search_similar_drinks(name: str, exclude_id: Optional[int] = None):
-    es = get_es_client()
-    if not es:
-        return []
+SIMILAR_SIZE = 6
+SIMILAR_SOURCE = ["drink_id", "name", "image_url"]
+# 문서 ↔ 문서 코사인 유사도 하한 (e5 계열은 무관한 문장도 0.7 안팎이 나옴)
+SIMILAR_MIN_SIMILARITY = float(os.getenv("SIMILAR_MIN_SIMILARITY", 0.8))
 
-    index_name = "liquor_integrated"  # Fixed: was drink_info
-    
+def _build_similar_query(name: str, exclude_id: Optional[int] = None):
     # Fuzzy search query
     query = {
         "query": {
@@ -391,29 +669,81 @@ def search_similar_drinks(name: str, exclude_id: Optional[int] = None):
                 "must_not": []
             }
         },
-        "size": 6 # Fetch a few to filter
+        "size": SIMILAR_SIZE # Fetch a few to filter
     }
     
     if exclude_id is not None:
         query["query"]["bool"]["must_not"].append({
             "term": {"drink_id": exclude_id}  # Use drink_id consistently
         })
+    return query
+
+def _format_similar_hit(hit, name: str):
+    """score: 로컬 스냅샷과 같은 0~100 이름 bigram Dice, es_score: ES 관련도(BM25)"""
+    source = hit['_source']
+    return {
+        "id": source.get('drink_id'),  # Use drink_id from ES
+        "name": source.get('name'),
+        "image_url": source.get('image_url'),
+        "score": round(name_dice(name, source.get('name')) * 100, 2),
+        "es_score": hit['_score']
+    }
+
+async def _search_similar_hybrid(es, name: str, exclude_id: Optional[int] = None):
+    """
+    이름 철자(BM25 fuzzy) + 문서 의미(kNN) 하이브리드. 기준 술의 소개/설명/안주로 벡터를 만들어
+    철자는 달라도 성격이 비슷한 술을 찾습니다. 벡터를 만들 수 없으면 None (호출자가 BM25로 대체)
+    """
+    catalog = get_catalog()
+    seed = catalog.get(exclude_id) if catalog and exclude_id is not None else None
+    vector = await embed_query(document_embedding_text(seed) if seed else name, passage=seed is not None)
+    if vector is None:
+        return None
+
+    knn_filter = {"bool": {"must_not": [{"term": {"drink_id": exclude_id}}]}} if exclude_id is not None else None
+    hits = await hybrid_search(
+        es, INDEX_NAME, _build_similar_query(name, exclude_id), vector, SIMILAR_SIZE, SIMILAR_SOURCE,
+        filter=knn_filter, similarity=SIMILAR_MIN_SIMILARITY
+    )
+    if hits is None:
+        return None
+    # score는 다른 경로와 같은 이름 Dice 그대로, 융합 점수는 rrf_score로 따로 (BM25 점수가 아니므로 es_score는 None)
+    return [{**_format_similar_hit(hit, name), "es_score": None, "rrf_score": round(hit['_score'], 4)} for hit in hits]
+
+async def search_similar_drinks(name: str, exclude_id: Optional[int] = None, mode: Optional[str] = None):
+    use_hybrid = hybrid_enabled(mode)
+    catalog = get_catalog()
+    # 로컬 카탈로그는 이름 철자 유사도만 계산하므로 hybrid 모드에서는 건너뜀
+    if catalog and not use_hybrid:
+        matches = catalog.similar(name, exclude_id)
+        record_local_result(bool(matches))
+        if matches:
+            return [
+                {
+                    "id": catalog.sources[row].get('drink_id'),
+                    "name": catalog.sources[row].get('name'),
+                    "image_url": catalog.sources[row].get('image_url'),
+                    "score": round(score * 100, 2),
+                    "es_score": None
+                }
+                for row, score in matches
+            ]
+
+    es = get_async_es_client()
+    if not es:
+        return []
+
+    if use_hybrid:
+        try:
+            results = await _search_similar_hybrid(es, name, exclude_id)
+            if results is not None:
+                return results
+        except Exception as e:
+            print(f"⚠️ Hybrid Similar Search Error (fallback to BM25): {e}")
 
     try:
-        response = es.search(index=index_name, body=query)
-        hits = response['hits']['hits']
-        
-        results = []
-        for hit in hits:
-            source = hit['_source']
-            results.append({
-                "id": source.get('drink_id'),  # Use drink_id from ES
-                "name": source.get('name'),
-                "image_url": source.get('image_url'),
-                "score": hit['_score']
-           })
-            
-        return results
+        response = await es_search(es, INDEX_NAME, {**_build_similar_query(name, exclude_id), "_source": SIMILAR_SOURCE})
+        return [_format_similar_hit(hit, name) for hit in response['hits']['hits']]
 
     except Exception as e:
         print(f"❌ Similar Search Error: {e}")
@@ -421,7 +751,7 @@ def search_similar_drinks(name: str, exclude_id: Optional[int] = None):
 
 @router.post("/similar")
 async def search_similar_endpoint(request: SimilarSearchRequest):
-    return search_similar_drinks(request.name, request.exclude_id)
+    return await search_similar_drinks(request.name, request.exclude_id, request.mode)
 
 @router.get("/list")
 async def get_drink_list(page: int = 1, size: int = 10, query: Optional[str] = None):
@@ -429,7 +759,7 @@ async def get_drink_list(page: int = 1, size: int = 10, query: Optional[str] = N
     Get paginated list of all drinks from Elasticsearch.
     Supports optional search query.
     """
-    es = get_es_client()
+    es = get_async_es_client()
     if not es:
         raise HTTPException(status_code=500, detail="Search Engine Error")
 
@@ -535,18 +865,26 @@ async def get_drink_list(page: int = 1, size: int = 10, query: Optional[str] = N
                     }
                 },
                 "from": from_index,
-                "size": size
-                # No sort specified - use relevance score
+                "size": size,
+                # Relevance first; ties go to drinks with a price
+                "sort": [
+                    {"_score": {"order": "desc"}},
+                    {"has_price": {"order": "desc", "missing": "_last", "unmapped_type": "boolean"}}
+                ]
             }
         else:
             es_query = {
                 "query": {"match_all": {}},
                 "from": from_index,
                 "size": size,
-                "sort": [{"drink_id": {"order": "asc"}}]
+                # 가격 정보가 있는 술을 먼저 보여주고, 같은 그룹 안에서는 drink_id 순
+                "sort": [
+                    {"has_price": {"order": "desc", "missing": "_last", "unmapped_type": "boolean"}},
+                    {"drink_id": {"order": "asc"}}
+                ]
             }
         
-        response = es.search(index="liquor_integrated", body=es_query)
+        response = await es_search(es, "liquor_integrated", es_query)
         hits = response['hits']['hits']
         total = response['hits']['total']['value'] if isinstance(response['hits']['total'], dict) else response['hits']['total']
         
@@ -575,16 +913,29 @@ async def get_drink_list(page: int = 1, size: int = 10, query: Optional[str] = N
             "total_pages": (total + size - 1) // size
         }
 
+    except asyncio.TimeoutError:
+        print(f"❌ List Search Timeout: page={page}, query={query}")
+        raise HTTPException(status_code=504, detail="Search Engine Timeout")
     except Exception as e:
         print(f"❌ List Search Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/top-searches")
-async def get_top_searches_endpoint(limit: int = 10):
-    """오늘 하루 동안 가장 많이 검색된 검색어 Top N 반환"""
-    results = await get_top_searches(limit)
-    return {"top_searches": results}
+async def get_top_searches_endpoint(limit: int = 10, window: str = "today"):
+    """기간별(today | 1h | 24h | 7d) 가장 많이 검색된 검색어 Top N 반환 (기본: 오늘 하루)"""
+    if window not in LEADERBOARD_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Invalid window: {window}")
+    results = await get_top_searches(limit, window)
+    return {"top_searches": results, "window": window}
+
+@router.get("/trending")
+async def get_trending_searches_endpoint(limit: int = 10, window: str = "hour"):
+    """급상승 검색어 Top N (hour: 최근 1시간 vs 24시간 평균, week: 오늘 vs 7일 평균)"""
+    if window not in TRENDING_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Invalid window: {window}")
+    results = await get_trending_searches(limit, window)
+    return {"trending": results, "window": window}
 
 @router.get("/products/{drink_name}")
 async def get_products_by_drink(drink_name: str):
@@ -597,7 +948,7 @@ async def get_products_by_drink(drink_name: str):
     Returns:
         가격순 정렬된 판매 상품 목록
     """
-    es = get_es_client()
+    es = get_async_es_client()
     if not es:
         return {"drink_name": drink_name, "products": [], "count": 0}
     
@@ -614,7 +965,7 @@ async def get_products_by_drink(drink_name: str):
             "size": 10  # 최대 10개 판매처
         }
         
-        response = es.search(index="products_liquor", body=query)
+        response = await es_search(es, "products_liquor", query)
         
         products = []
         for hit in response['hits']['hits']:
@@ -1,6 +1,9 @@
+import asyncio
 import os
+import time
+import aiomysql
 import pymysql
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 def get_mariadb_conn():
     """
@@ -32,27 +35,174 @@ def get_mariadb_conn():
         print(f"❌ MariaDB Connection Error: {e}")
         return None
 
-def get_liquor_details(drink_name: str) -> Optional[Dict[str, Any]]:
+# ---------------------------------------------------------------------------
+# API용 공유 비동기 커넥션 풀 (lifespan에서 생성)
+# 스크립트는 위의 동기 get_mariadb_conn()을 그대로 사용합니다.
+# ---------------------------------------------------------------------------
+MARIADB_POOL_MIN = int(os.getenv("MARIADB_POOL_MIN", 2))
+MARIADB_POOL_MAX = int(os.getenv("MARIADB_POOL_MAX", 10))
+MARIADB_POOL_RECYCLE = int(os.getenv("MARIADB_POOL_RECYCLE", 3600))
+MARIADB_ACQUIRE_TIMEOUT = float(os.getenv("MARIADB_ACQUIRE_TIMEOUT", 3))
+MARIADB_STATEMENT_TIMEOUT = float(os.getenv("MARIADB_STATEMENT_TIMEOUT", 5))
+# 마지막 사용 후 이 시간(초)이 지난 커넥션만 checkout 시 ping으로 확인
+MARIADB_PING_IDLE = float(os.getenv("MARIADB_PING_IDLE", 30))
+# 풀이 없을 때(기동 시 DB 다운 등) 요청 경로에서 다시 만들기를 시도하는 최소 간격(초)
+MARIADB_RECONNECT_BACKOFF = float(os.getenv("MARIADB_RECONNECT_BACKOFF", 5))
+
+class MariaDB:
+    pool: aiomysql.Pool = None
+    checkouts: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    acquire_timeouts: int = 0
+    ping_failures: int = 0
+    statement_timeouts: int = 0
+    errors: int = 0
+    reconnects: int = 0
+    last_connect_attempt: float = None
+    last_error: str = None
+
+mariadb = MariaDB()
+_pool_lock = asyncio.Lock()
+
+async def connect_to_mariadb():
+    """
+    MariaDB 커넥션 풀을 생성합니다. (hansang/cocktail/fair 라우터와 같은 접속 정보)
+    연결에 실패해도 앱 기동은 계속되며, 이후 요청이 _checkout에서 (backoff 간격으로) 풀을 다시 만듭니다.
+    """
+    host = os.getenv("MARIADB_HOST", "192.168.0.36")
+    port = int(os.getenv("MARIADB_PORT", 3306))
+
+    mariadb.last_connect_attempt = time.monotonic()
+    try:
+        mariadb.pool = await aiomysql.create_pool(
+            host=host,
+            port=port,
+            user=os.getenv("MARIADB_USER", "root"),
+            password=os.getenv("MARIADB_ROOT_PASSWORD", "pass123#"),
+            db=os.getenv("MARIADB_DATABASE", "drink"),
+            minsize=MARIADB_POOL_MIN,
+            maxsize=MARIADB_POOL_MAX,
+            pool_recycle=MARIADB_POOL_RECYCLE,
+            connect_timeout=5,
+            autocommit=True,
+            charset="utf8mb4",
+            cursorclass=aiomysql.DictCursor,
+            # 서버 측 statement timeout (MariaDB max_statement_time, 초 단위)
+            init_command=f"SET SESSION max_statement_time={MARIADB_STATEMENT_TIMEOUT}"
+        )
+        mariadb.last_error = None
+        print(f"✅ MariaDB 커넥션 풀 생성: {host}:{port} (min={MARIADB_POOL_MIN}, max={MARIADB_POOL_MAX})")
+    except Exception as e:
+        print(f"⚠️  MariaDB 커넥션 풀 생성 실패: {e}")
+        mariadb.last_error = str(e)
+        mariadb.pool = None
+
+async def close_mariadb_connection():
+    if mariadb.pool:
+        mariadb.pool.close()
+        await mariadb.pool.wait_closed()
+        mariadb.pool = None
+        print("Closed MariaDB pool")
+
+async def _ensure_pool():
+    """
+    풀이 없으면 다시 만듭니다. (기동 시 DB가 내려가 있었어도 재시작 없이 복구)
+    동시에 들어온 요청은 lock으로 한 번만 시도하고, 실패 후 MARIADB_RECONNECT_BACKOFF 동안은 바로 실패
+    """
+    if mariadb.pool is not None:
+        return mariadb.pool
+    async with _pool_lock:
+        if mariadb.pool is None:
+            last_attempt = mariadb.last_connect_attempt
+            if last_attempt is not None and time.monotonic() - last_attempt < MARIADB_RECONNECT_BACKOFF:
+                raise RuntimeError(f"MariaDB pool is not initialized (last error: {mariadb.last_error})")
+            await connect_to_mariadb()
+            if mariadb.pool is None:
+                raise RuntimeError(f"MariaDB pool is not initialized (last error: {mariadb.last_error})")
+            mariadb.reconnects += 1
+    return mariadb.pool
+
+async def _checkout():
+    pool = await _ensure_pool()
+
+    start_time = time.perf_counter()
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), timeout=MARIADB_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        mariadb.acquire_timeouts += 1
+        raise
+    wait_ms = (time.perf_counter() - start_time) * 1000
+    mariadb.checkouts += 1
+    mariadb.wait_ms_total += wait_ms
+    mariadb.wait_ms_max = max(mariadb.wait_ms_max, wait_ms)
+
+    # checkout 시 헬스 체크: 오래 쉬었던 커넥션은 ping (끊겼으면 재연결)
+    if asyncio.get_running_loop().time() - conn.last_usage > MARIADB_PING_IDLE:
+        try:
+            await conn.ping(reconnect=True)
+        except Exception:
+            mariadb.ping_failures += 1
+            conn.close()
+            pool.release(conn)
+            raise
+    return conn
+
+async def _execute(sql: str, args=None, fetch: str = "all"):
+    conn = await _checkout()
+    try:
+        async with conn.cursor() as cursor:
+            await asyncio.wait_for(cursor.execute(sql, args), timeout=MARIADB_STATEMENT_TIMEOUT + 1)
+            return await (cursor.fetchall() if fetch == "all" else cursor.fetchone())
+    except BaseException as e:
+        if isinstance(e, asyncio.TimeoutError):
+            mariadb.statement_timeouts += 1
+        else:
+            mariadb.errors += 1
+        # 실행 도중 취소/오류가 난 커넥션은 상태를 알 수 없으므로 풀에 돌려주지 않고 닫음
+        conn.close()
+        raise
+    finally:
+        mariadb.pool.release(conn)
+
+async def fetch_all(sql: str, args=None) -> List[Dict[str, Any]]:
+    """풀에서 커넥션을 빌려 쿼리를 실행하고 모든 행을 dict 목록으로 반환합니다."""
+    return list(await _execute(sql, args, fetch="all"))
+
+async def fetch_one(sql: str, args=None) -> Optional[Dict[str, Any]]:
+    return await _execute(sql, args, fetch="one")
+
+def mariadb_pool_metrics():
+    pool = mariadb.pool
+    return {
+        "enabled": pool is not None,
+        "size": pool.size if pool else 0,
+        "free": pool.freesize if pool else 0,
+        "minsize": MARIADB_POOL_MIN,
+        "maxsize": MARIADB_POOL_MAX,
+        "checkouts": mariadb.checkouts,
+        "wait_ms_avg": round(mariadb.wait_ms_total / mariadb.checkouts, 3) if mariadb.checkouts else 0.0,
+        "wait_ms_max": round(mariadb.wait_ms_max, 3),
+        "acquire_timeouts": mariadb.acquire_timeouts,
+        "ping_failures": mariadb.ping_failures,
+        "statement_timeouts": mariadb.statement_timeouts,
+        "errors": mariadb.errors,
+        "reconnects": mariadb.reconnects,
+        "last_error": mariadb.last_error
+    }
+
+async def get_liquor_details(drink_name: str) -> Optional[Dict[str, Any]]:
     """
     Fetches liquor details from MariaDB by drink_name.
     """
-    conn = get_mariadb_conn()
-    if not conn:
-        return None
-    
     try:
-        with conn.cursor() as cursor:
-            # Query to fetch details from drink_info table
-            # We match by drink_name
-            sql = """
-                SELECT * FROM drink_info 
-                WHERE drink_name = %s
-            """
-            cursor.execute(sql, (drink_name,))
-            result = cursor.fetchone()
-            return result
+        # Query to fetch details from drink_info table
+        # We match by drink_name
+        sql = """
+            SELECT * FROM drink_info 
+            WHERE drink_name = %s
+        """
+        return await fetch_one(sql, (drink_name,))
     except Exception as e:
         print(f"❌ Error fetching details for {drink_name}: {e}")
         return None
-    finally:
-        conn.close()
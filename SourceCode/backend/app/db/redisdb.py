@@ -0,0 +1,44 @@
+import os
+import redis.asyncio as aioredis
+
+class RedisDB:
+    client: aioredis.Redis = None
+
+redis_db = RedisDB()
+
+def get_redis():
+    """공유 비동기 Redis 클라이언트 (연결 실패 시 None)"""
+    return redis_db.client
+
+async def connect_to_redis():
+    """
+    캐시용 Redis에 연결합니다. (app/utils/weather.py와 같은 인스턴스)
+    연결에 실패해도 앱 기동은 계속되며, 캐시는 in-process 계층만 사용합니다.
+    """
+    host = os.getenv("REDIS_HOST", "localhost")
+    port = int(os.getenv("REDIS_PORT", 6379))
+
+    client = aioredis.Redis(
+        host=host,
+        port=port,
+        password=os.getenv("REDIS_PASSWORD", None),
+        decode_responses=True,
+        socket_timeout=2,
+        socket_connect_timeout=2,
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+    )
+
+    try:
+        await client.ping()
+        redis_db.client = client
+        print(f"✅ Redis 연결 성공: {host}:{port}")
+    except Exception as e:
+        print(f"⚠️  Redis 연결 실패 (in-process 캐시만 사용): {e}")
+        await client.aclose()
+        redis_db.client = None
+
+async def close_redis_connection():
+    if redis_db.client:
+        await redis_db.client.aclose()
+        redis_db.client = None
+        print("Closed Redis connection")
@@ -2,6 +2,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.db.mongodb import close_mongo_connection, connect_to_mongo
+from app.db.redisdb import close_redis_connection, connect_to_redis
+from app.db.mariadb import close_mariadb_connection, connect_to_mariadb
+from app.utils.es_client import close_es_connection, connect_to_es
+from app.utils.catalog import start_catalog_refresher, stop_catalog_refresher
+from app.utils.search_stats import start_search_stats_writer, stop_search_stats_writer
+from app.utils.cocktail_sampler import start_cocktail_sampler, stop_cocktail_sampler
+from app.utils.specialty_index import start_specialty_index, stop_specialty_index
+from app.utils.llm_gateway import close_bedrock_executor
+from app.utils.embeddings import start_embedding_model, stop_embedding_model
+from app.utils.weather import close_weather_client, start_weather_client
+from app.utils.weather_prefetcher import start_weather_prefetcher, stop_weather_prefetcher
 from app.api.board import router as board_router
 from app.api.ocr import router as ocr_router
 from app.api.search import router as search_router
@@ -15,7 +26,28 @@ from app.api.health import router as health_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_to_mongo()
+    await connect_to_es()
+    await connect_to_redis()
+    await connect_to_mariadb()
+    await start_catalog_refresher()
+    await start_search_stats_writer()
+    await start_cocktail_sampler()
+    await start_specialty_index()
+    await start_embedding_model()
+    await start_weather_client()
+    await start_weather_prefetcher()
     yield
+    await stop_weather_prefetcher()
+    await close_weather_client()
+    await stop_embedding_model()
+    close_bedrock_executor()
+    await stop_specialty_index()
+    await stop_cocktail_sampler()
+    await stop_search_stats_writer()
+    await stop_catalog_refresher()
+    await close_mariadb_connection()
+    await close_redis_connection()
+    await close_es_connection()
     await close_mongo_connection()
 
 app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,208 @@
+# In-process LRU(TTL) + Redis 2단 캐시
+import asyncio
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+
+from app.db.redisdb import get_redis
+
+# 캐시에 값이 없음을 나타내는 표식 (None도 유효한 캐시 값이므로 구분)
+MISSING = object()
+
+# ETL이 인덱스를 다시 적재할 때마다 증가시키는 세대(generation) 번호 키
+INDEX_GENERATION_KEY = "search:generation:{index}"
+GENERATION_CHECK_INTERVAL = float(os.getenv("INDEX_GENERATION_CHECK_INTERVAL", 5))
+
+_generation_cache = {}
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 검색어 정규화: NFC, 공백 축약, 소문자"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split()).lower()
+
+async def get_index_generation(index: str) -> str:
+    """
+    인덱스 세대 번호를 반환합니다.
+    매 요청마다 Redis를 조회하지 않도록 GENERATION_CHECK_INTERVAL 동안 로컬에 보관합니다.
+    """
+    now = time.monotonic()
+    cached = _generation_cache.get(index)
+    if cached and now - cached[1] < GENERATION_CHECK_INTERVAL:
+        return cached[0]
+
+    generation = cached[0] if cached else "0"
+    redis = get_redis()
+    if redis:
+        try:
+            generation = await redis.get(INDEX_GENERATION_KEY.format(index=index)) or "0"
+        except Exception as e:
+            print(f"⚠️ Index generation read error: {e}")
+
+    _generation_cache[index] = (generation, now)
+    return generation
+
+class LRUTTLCache:
+    """크기 제한(LRU)과 만료 시간(TTL)을 가진 in-process 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출이 하나의 실행(Task) 결과를 공유하도록 합니다."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # 먼저 온 요청이 취소되어도 실행 중인 Task는 다른 대기자를 위해 계속 진행
+        return await asyncio.shield(task)
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    def metrics(self):
+        return {"inflight": len(self._inflight), "calls": self.calls, "shared": self.shared}
+
+class TieredCache:
+    """
+    L1: in-process LRUTTLCache, L2: Redis (JSON 직렬화)
+    Redis가 없거나 오류가 나면 L1만으로 동작합니다.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 3600):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+        self.flight = SingleFlight()
+
+    def _redis_key(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"cache:{self.namespace}:{digest}"
+
+    async def get(self, key: str):
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+
+        redis = get_redis()
+        if not redis:
+            return MISSING
+
+        try:
+            cached = await redis.get(self._redis_key(key))
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"⚠️ Cache L2 read error ({self.namespace}): {e}")
+            return MISSING
+
+        if cached is None:
+            self.l2_misses += 1
+            return MISSING
+
+        self.l2_hits += 1
+        value = json.loads(cached)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value):
+        self.local.set(key, value)
+
+        redis = get_redis()
+        if not redis:
+            return
+        try:
+            await redis.set(self._redis_key(key), json.dumps(value, ensure_ascii=False, default=str), ex=int(self.ttl))
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"⚠️ Cache L2 write error ({self.namespace}): {e}")
+
+    async def get_or_set(self, key: str, factory):
+        """
+        캐시에 없으면 factory()를 한 번만 실행해 저장합니다. (read-through + single-flight)
+        factory에서 발생한 예외는 캐시하지 않고 대기 중인 모든 호출자에게 전달됩니다.
+        """
+        value = await self.get(key)
+        if value is not MISSING:
+            return value
+
+        async def compute():
+            value = await factory()
+            await self.set(key, value)
+            return value
+
+        return await self.flight.do(key, compute)
+
+    def metrics(self):
+        return {
+            "single_flight": self.flight.metrics(),
+            "l1": self.local.metrics(),
+            "l2": {
+                "enabled": get_redis() is not None,
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "errors": self.l2_errors
+            }
+        }
@@ -0,0 +1,239 @@
+# liquor_integrated 인덱스 전체(약 1,200건)를 메모리에 올려두는 스냅샷 + 로컬 퍼지 매처
+# 확실한 매칭은 네트워크 없이 응답하고, 애매한 경우에만 Elasticsearch로 넘깁니다.
+import asyncio
+import os
+import time
+from array import array
+
+from elasticsearch.helpers import async_scan
+
+from app.utils.cache import get_index_generation
+from app.utils.es_client import get_async_es_client
+from app.utils.hangul import (
+    char_ngrams, decompose_jamo, is_latin_query, normalize_name, romanize, similarity
+)
+
+INDEX_NAME = "liquor_integrated"
+
+CATALOG_LOCAL_SEARCH = os.getenv("CATALOG_LOCAL_SEARCH", "true").lower() == "true"
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", 30))
+CATALOG_MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", 3600))
+
+# 로컬 매칭을 신뢰하는 기준 (verify_catalog_parity.py로 ES 결과와 비교해 조정)
+MATCH_THRESHOLD = 0.85
+MATCH_MARGIN = 0.1
+# 유사 술 목록: 가장 비슷한 이름의 bigram Dice가 이 값 미만이면 ES fuzzy 검색으로 넘김
+SIMILAR_THRESHOLD = float(os.getenv("CATALOG_SIMILAR_THRESHOLD", 0.5))
+CANDIDATE_LIMIT = 12
+
+def _hangul_score(query: str, jamo_query: str, name: str, name_jamo: str) -> float:
+    score = similarity(jamo_query, name_jamo)
+    if query in name:
+        # 부분 일치: 이름에서 차지하는 비율이 클수록 높은 점수
+        score = max(score, 0.7 + 0.3 * len(query) / len(name))
+    return score
+
+def name_match_score(text: str, name: str) -> float:
+    """CatalogSnapshot.match()와 같은 기준의 이름 유사도 (0.0 ~ 1.0, ES 결과에도 같은 척도로 사용)"""
+    query, name = normalize_name(text), normalize_name(name or "")
+    if not query or not name:
+        return 0.0
+    if query == name:
+        return 1.0
+    if is_latin_query(query):
+        return similarity(romanize(query), romanize(name))
+    return _hangul_score(query, decompose_jamo(query), name, decompose_jamo(name))
+
+def name_dice(text: str, name: str) -> float:
+    """CatalogSnapshot.similar()와 같은 기준의 이름 bigram Dice 계수 (0.0 ~ 1.0)"""
+    grams = char_ngrams(normalize_name(text), 2)
+    name_grams = char_ngrams(normalize_name(name or ""), 2)
+    if not grams or not name_grams:
+        return 0.0
+    return 2 * len(grams & name_grams) / (len(grams) + len(name_grams))
+
+class CatalogSnapshot:
+    """
+    인덱스 문서를 행(row) 번호로 정렬한 배열 기반 스냅샷.
+    이름 정규화/자모/로마자 표현과 n-gram 역색인을 미리 계산해 둡니다.
+    """
+
+    def __init__(self, sources: list, generation: str):
+        self.generation = generation
+        self.loaded_at = time.time()
+        self.sources = sources
+        self.drink_ids = array("l", (int(s.get("drink_id") or 0) for s in sources))
+        self.names = [normalize_name(s.get("name", "")) for s in sources]
+        self.jamo = [decompose_jamo(name) for name in self.names]
+        self.roman = [romanize(name) for name in self.names]
+
+        self.id_to_row = {}
+        self.exact = {}
+        self.name_grams = {}
+        self.roman_grams = {}
+        for row, drink_id in enumerate(self.drink_ids):
+            self.id_to_row.setdefault(drink_id, row)
+            self.exact.setdefault(self.names[row], row)
+            for gram in char_ngrams(self.names[row], 2):
+                self.name_grams.setdefault(gram, array("I")).append(row)
+            for gram in char_ngrams(self.roman[row], 3):
+                self.roman_grams.setdefault(gram, array("I")).append(row)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def get(self, drink_id: int):
+        row = self.id_to_row.get(drink_id)
+        return self.sources[row] if row is not None else None
+
+    def _candidates(self, grams: set, index: dict, exclude_row: int = None):
+        counts = {}
+        for gram in grams:
+            for row in index.get(gram, ()):
+                counts[row] = counts.get(row, 0) + 1
+        counts.pop(exclude_row, None)
+        return sorted(counts, key=counts.get, reverse=True)[:CANDIDATE_LIMIT]
+
+    def match(self, text: str, limit: int = 10):
+        """
+        정확 일치 → 자모 편집 거리 / 부분 일치 → 로마자(영문 입력) 순으로 점수를 매겨
+        (row, score) 목록을 점수 내림차순으로 반환합니다. score는 0.0 ~ 1.0.
+        """
+        query = normalize_name(text)
+        if not query:
+            return []
+
+        scores = {}
+        exact_row = self.exact.get(query)
+        if exact_row is not None:
+            scores[exact_row] = 1.0
+
+        if is_latin_query(query):
+            roman_query = romanize(query)
+            for row in self._candidates(char_ngrams(roman_query, 3), self.roman_grams):
+                scores[row] = max(scores.get(row, 0.0), similarity(roman_query, self.roman[row]))
+        else:
+            jamo_query = decompose_jamo(query)
+            for row in self._candidates(char_ngrams(query, 2), self.name_grams):
+                score = _hangul_score(query, jamo_query, self.names[row], self.jamo[row])
+                scores[row] = max(scores.get(row, 0.0), score)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    def best_match(self, text: str):
+        """확실한 매칭일 때만 match() 결과를 반환하고, 애매하면 None (ES로 fallback)"""
+        matches = self.match(text, limit=5)
+        if not matches:
+            return None
+        best = matches[0][1]
+        second = matches[1][1] if len(matches) > 1 else 0.0
+        if best >= 1.0 or (best >= MATCH_THRESHOLD and best - second >= MATCH_MARGIN):
+            return matches
+        return None
+
+    def similar(self, name: str, exclude_id: int = None, limit: int = 6):
+        """
+        이름 bigram Dice 계수 기반 유사 술 목록 [(row, score)].
+        Dice가 SIMILAR_THRESHOLD 이상인 항목만 반환하므로 빈 목록이면 ES로 fallback.
+        """
+        query = normalize_name(name)
+        grams = char_ngrams(query, 2)
+        if not grams:
+            return []
+
+        exclude_row = self.id_to_row.get(exclude_id) if exclude_id is not None else None
+        results = []
+        for row in self._candidates(grams, self.name_grams, exclude_row):
+            row_grams = char_ngrams(self.names[row], 2)
+            dice = 2 * len(grams & row_grams) / (len(grams) + len(row_grams))
+            if dice >= SIMILAR_THRESHOLD:
+                results.append((row, dice))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:limit]
+
+class CatalogState:
+    snapshot: CatalogSnapshot = None
+    local_hits: int = 0
+    fallbacks: int = 0
+    reloads: int = 0
+    last_error: str = None
+
+catalog_state = CatalogState()
+_refresh_task: asyncio.Task = None
+
+def get_catalog():
+    """로컬 검색이 활성화되어 있고 스냅샷이 로드된 경우 스냅샷 반환"""
+    if not CATALOG_LOCAL_SEARCH:
+        return None
+    return catalog_state.snapshot
+
+def record_local_result(hit: bool):
+    if hit:
+        catalog_state.local_hits += 1
+    else:
+        catalog_state.fallbacks += 1
+
+async def load_catalog_snapshot():
+    """ES에서 전체 문서를 읽어 새 스냅샷으로 교체합니다. (교체는 참조 대입 한 번으로 원자적)"""
+    es = get_async_es_client()
+    if not es:
+        return False
+
+    try:
+        generation = await get_index_generation(INDEX_NAME)
+        start_time = time.time()
+        sources = [
+            hit["_source"]
+            async for hit in async_scan(es, index=INDEX_NAME, query={"query": {"match_all": {}}}, size=500)
+        ]
+        snapshot = await asyncio.to_thread(CatalogSnapshot, sources, generation)
+    except Exception as e:
+        catalog_state.last_error = str(e)
+        print(f"❌ Catalog snapshot load failed: {e}")
+        return False
+
+    catalog_state.snapshot = snapshot
+    catalog_state.reloads += 1
+    catalog_state.last_error = None
+    print(f"📦 Catalog snapshot loaded: {len(snapshot)} drinks (generation {generation}, {time.time() - start_time:.2f}s)")
+    return True
+
+async def _catalog_refresh_loop():
+    while True:
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+        snapshot = catalog_state.snapshot
+        generation = await get_index_generation(INDEX_NAME)
+        if (
+            snapshot is None
+            or snapshot.generation != generation
+            or time.time() - snapshot.loaded_at > CATALOG_MAX_AGE
+        ):
+            await load_catalog_snapshot()
+
+async def start_catalog_refresher():
+    global _refresh_task
+    if not CATALOG_LOCAL_SEARCH:
+        return
+    await load_catalog_snapshot()
+    _refresh_task = asyncio.create_task(_catalog_refresh_loop())
+
+async def stop_catalog_refresher():
+    global _refresh_task
+    if _refresh_task:
+        _refresh_task.cancel()
+        _refresh_task = None
+    catalog_state.snapshot = None
+
+def catalog_metrics():
+    snapshot = catalog_state.snapshot
+    return {
+        "enabled": CATALOG_LOCAL_SEARCH,
+        "size": len(snapshot) if snapshot else 0,
+        "generation": snapshot.generation if snapshot else None,
+        "loaded_at": snapshot.loaded_at if snapshot else None,
+        "local_hits": catalog_state.local_hits,
+        "fallbacks": catalog_state.fallbacks,
+        "reloads": catalog_state.reloads,
+        "last_error": catalog_state.last_error
+    }
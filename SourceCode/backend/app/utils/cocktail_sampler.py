@@ -0,0 +1,118 @@
+# /cocktail/random 용 메모리 샘플러
+# cocktail_info 전체를 시작 시 배열로 올려두고 부분 Fisher–Yates로 k개를 뽑습니다.
+# (ORDER BY RAND()는 호출마다 테이블 전체를 스캔/정렬하므로 행 수에 비례해 느려짐)
+import asyncio
+import os
+import random
+import time
+from typing import Optional
+
+from app.db.mariadb import fetch_all, fetch_one
+
+COCKTAIL_REFRESH_INTERVAL = float(os.getenv("COCKTAIL_REFRESH_INTERVAL", 60))
+# 스탬프로 못 잡는 변경(행 UPDATE, 같은 수/같은 최대 id로 삭제+추가)도 이 시간(초) 안에는 반영되도록 강제 재적재
+COCKTAIL_MAX_AGE = float(os.getenv("COCKTAIL_MAX_AGE", 600))
+
+COCKTAIL_SELECT = "SELECT cocktail_id, cocktail_title, cocktail_image_url, cocktail_homepage_url FROM cocktail_info"
+# 테이블 변경 감지용 (행 수 + 최대 id가 바뀌면 바로 다시 적재, 그 밖의 변경은 COCKTAIL_MAX_AGE로 반영)
+COCKTAIL_VERSION = "SELECT COUNT(*) AS row_count, MAX(cocktail_id) AS max_id FROM cocktail_info"
+
+def sample_indices(n: int, k: int, rng: random.Random):
+    """
+    0..n-1 중 중복 없이 k개를 뽑는 부분 Fisher–Yates 셔플.
+    교환한 위치만 dict에 기록하므로 n과 무관하게 O(k) 시간/메모리로 동작합니다.
+    """
+    k = min(k, n)
+    swapped = {}
+    picked = []
+    for i in range(k):
+        j = rng.randrange(i, n)
+        picked.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return picked
+
+class CocktailSampler:
+    def __init__(self, rows: list, version: tuple):
+        self.rows = rows
+        self.version = version
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def sample(self, k: int, seed: Optional[int] = None):
+        """seed를 주면 같은 스냅샷에서 항상 같은 결과를 반환합니다."""
+        rng = random.Random(seed) if seed is not None else random
+        return [self.rows[i] for i in sample_indices(len(self.rows), k, rng)]
+
+class CocktailSamplerState:
+    sampler: CocktailSampler = None
+    reloads: int = 0
+    served: int = 0
+    fallbacks: int = 0
+    last_error: str = None
+
+cocktail_state = CocktailSamplerState()
+_refresh_task: asyncio.Task = None
+
+async def _fetch_version():
+    row = await fetch_one(COCKTAIL_VERSION)
+    return (row["row_count"], row["max_id"]) if row else (0, None)
+
+async def load_cocktail_sampler():
+    try:
+        version = await _fetch_version()
+        rows = await fetch_all(COCKTAIL_SELECT)
+    except Exception as e:
+        cocktail_state.last_error = str(e)
+        print(f"⚠️ Cocktail sampler load failed: {e}")
+        return False
+
+    cocktail_state.sampler = CocktailSampler(rows, version)
+    cocktail_state.reloads += 1
+    cocktail_state.last_error = None
+    print(f"🍸 Cocktail sampler loaded: {len(rows)} cocktails")
+    return True
+
+async def _cocktail_refresh_loop():
+    while True:
+        await asyncio.sleep(COCKTAIL_REFRESH_INTERVAL)
+        sampler = cocktail_state.sampler
+        try:
+            version = await _fetch_version()
+        except Exception as e:
+            cocktail_state.last_error = str(e)
+            continue
+        if (
+            sampler is None
+            or sampler.version != version
+            or time.time() - sampler.loaded_at > COCKTAIL_MAX_AGE
+        ):
+            await load_cocktail_sampler()
+
+def get_cocktail_sampler():
+    return cocktail_state.sampler
+
+async def start_cocktail_sampler():
+    global _refresh_task
+    await load_cocktail_sampler()
+    _refresh_task = asyncio.create_task(_cocktail_refresh_loop())
+
+async def stop_cocktail_sampler():
+    global _refresh_task
+    if _refresh_task:
+        _refresh_task.cancel()
+        _refresh_task = None
+    cocktail_state.sampler = None
+
+def cocktail_sampler_metrics():
+    sampler = cocktail_state.sampler
+    return {
+        "size": len(sampler) if sampler else 0,
+        "loaded_at": sampler.loaded_at if sampler else None,
+        "max_age": COCKTAIL_MAX_AGE,
+        "reloads": cocktail_state.reloads,
+        "served": cocktail_state.served,
+        "fallbacks": cocktail_state.fallbacks,
+        "last_error": cocktail_state.last_error
+    }
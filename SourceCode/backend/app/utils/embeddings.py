@@ -0,0 +1,146 @@
+# 로컬 CPU 임베딩 모델 (하이브리드 검색용, 선택 의존성)
+# - sentence-transformers가 설치되어 있지 않으면 embeddings_available()이 False이고 검색은 BM25만 사용
+# - ETL(etl_integrated.py)은 embed_passages로 문서 벡터를 배치 생성해 dense_vector 필드에 저장
+# - API는 embed_query로 질의 벡터를 만들며, 모델 로드/인코딩은 전용 스레드 하나에서 실행
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.cache import MISSING, LRUTTLCache, normalize_query
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# multilingual-e5-small: 한국어 지원, 384차원, CPU에서 문장당 수 ms
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-small")
+EMBEDDING_DIMS = int(os.getenv("EMBEDDING_DIMS", 384))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+# e5 계열은 질의/문서 앞에 접두어를 붙여 학습됨 (다른 모델이면 빈 문자열로 지정)
+EMBEDDING_QUERY_PREFIX = os.getenv("EMBEDDING_QUERY_PREFIX", "query: ")
+EMBEDDING_PASSAGE_PREFIX = os.getenv("EMBEDDING_PASSAGE_PREFIX", "passage: ")
+EMBEDDING_FIELD = "embedding"
+
+class EmbeddingState:
+    model = None
+    load_error: str = None
+    loaded_at: float = None
+    encodes: int = 0
+    encode_seconds: float = 0.0
+
+embedding_state = EmbeddingState()
+query_vector_cache = LRUTTLCache(maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", 4096)), ttl=24 * 3600)
+_load_lock = threading.Lock()
+_executor: ThreadPoolExecutor = None
+_load_task: asyncio.Task = None
+
+def embeddings_available() -> bool:
+    return SentenceTransformer is not None and embedding_state.load_error is None
+
+def get_embedding_model():
+    """모델을 프로세스당 한 번 로드합니다. (설치되어 있지 않거나 로드에 실패하면 None)"""
+    if embedding_state.model is not None or not embeddings_available():
+        return embedding_state.model
+    with _load_lock:
+        if embedding_state.model is None and embedding_state.load_error is None:
+            try:
+                start_time = time.perf_counter()
+                embedding_state.model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+                embedding_state.loaded_at = time.time()
+                print(f"🧠 Embedding model loaded: {EMBEDDING_MODEL} ({time.perf_counter() - start_time:.1f}s)")
+            except Exception as e:
+                embedding_state.load_error = str(e)
+                print(f"⚠️ Embedding model load failed (BM25 only): {e}")
+    return embedding_state.model
+
+def document_embedding_text(source: dict) -> str:
+    """문서 벡터 입력: 이름, 종류, 소개, 설명 앞부분, 어울리는 안주"""
+    foods = source.get("foods") or []
+    parts = [
+        source.get("name") or "",
+        source.get("type") or "",
+        source.get("intro") or "",
+        (source.get("description") or "")[:300],
+        f"어울리는 안주: {', '.join(foods)}" if foods else ""
+    ]
+    return " ".join(part for part in parts if part)
+
+def _encode(texts: list, batch_size: int = None) -> list:
+    model = get_embedding_model()
+    if model is None:
+        return None
+    start_time = time.perf_counter()
+    vectors = model.encode(
+        texts,
+        batch_size=batch_size or EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    embedding_state.encodes += len(texts)
+    embedding_state.encode_seconds += time.perf_counter() - start_time
+    return [vector.tolist() for vector in vectors]
+
+def embed_passages(texts: list, batch_size: int = None) -> list:
+    """문서 벡터 배치 생성 (동기, ETL용). 모델을 쓸 수 없으면 None"""
+    return _encode([EMBEDDING_PASSAGE_PREFIX + text for text in texts], batch_size)
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 모델 추론은 CPU를 여러 코어로 쓰므로 요청 간에는 직렬화
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+    return _executor
+
+async def embed_query(text: str, passage: bool = False):
+    """
+    질의 벡터 (정규화된 질의별로 캐시). 모델이 없거나 아직 로드 중이면 None을 반환하므로
+    호출자는 BM25 검색으로 대체합니다.
+    passage=True면 문서 접두어를 사용 (문서 ↔ 문서 유사도, /search/similar)
+    """
+    if embedding_state.model is None:
+        return None
+    prefix = EMBEDDING_PASSAGE_PREFIX if passage else EMBEDDING_QUERY_PREFIX
+    key = prefix + normalize_query(text)
+    vector = query_vector_cache.get(key)
+    if vector is not MISSING:
+        return vector
+
+    loop = asyncio.get_running_loop()
+    vectors = await loop.run_in_executor(_get_executor(), _encode, [prefix + text])
+    vector = vectors[0] if vectors else None
+    if vector is not None:
+        query_vector_cache.set(key, vector)
+    return vector
+
+async def start_embedding_model():
+    """모델 로드는 수 초 걸리므로 백그라운드에서 진행 (그동안은 BM25만 사용)"""
+    global _load_task
+    if not embeddings_available():
+        print("ℹ️ sentence-transformers not installed: hybrid search disabled (BM25 only)")
+        return
+    loop = asyncio.get_running_loop()
+    _load_task = asyncio.ensure_future(loop.run_in_executor(_get_executor(), get_embedding_model))
+
+async def stop_embedding_model():
+    global _executor, _load_task
+    if _load_task:
+        _load_task.cancel()
+        _load_task = None
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def embedding_metrics():
+    return {
+        "available": embeddings_available(),
+        "model": EMBEDDING_MODEL,
+        "loaded": embedding_state.model is not None,
+        "load_error": embedding_state.load_error,
+        "encodes": embedding_state.encodes,
+        "avg_encode_ms": round(embedding_state.encode_seconds / embedding_state.encodes * 1000, 2) if embedding_state.encodes else 0.0,
+        "query_cache": query_vector_cache.metrics()
+    }
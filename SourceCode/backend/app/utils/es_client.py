@@ -1,48 +1,80 @@
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+import asyncio
 import os
 
 import time
 
+# 검색 요청 1건당 기본 deadline (초)
+ES_SEARCH_TIMEOUT = float(os.getenv("ELASTICSEARCH_SEARCH_TIMEOUT", 5))
+
+class ElasticsearchState:
+    """프로세스 전역에서 공유하는 Elasticsearch 클라이언트와 헬스 상태"""
+    client: Elasticsearch = None  # 단독 스크립트(ETL 등)용 동기 클라이언트
+    async_client: AsyncElasticsearch = None  # API 라우터용 비동기 클라이언트 (lifespan에서 생성)
+    healthy: bool = False
+    last_checked: float = 0.0
+    last_error: str = None
+    warm_requests: int = 0
+    cold_connects: int = 0
+    unhealthy_rejections: int = 0
+
+es_state = ElasticsearchState()
+_health_task: asyncio.Task = None
+
 def get_connected_node_info(es):
     """현재 연결된 Elasticsearch 노드 정보를 반환하고 로그 출력"""
     try:
         # 클러스터 정보 가져오기
         info = es.info()
-        node_name = info.get('name', 'Unknown')
-        cluster_name = info.get('cluster_name', 'Unknown')
-        version = info.get('version', {}).get('number', 'Unknown')
         
         # 클러스터의 모든 노드 정보
         nodes_info = es.cat.nodes(format='json')
         
-        print("=" * 60)
-        print("✅ Elasticsearch 연결 성공!")
-        print(f"📍 현재 연결된 노드: {node_name}")
-        print(f"🔗 클러스터 이름: {cluster_name}")
-        print(f"📦 Elasticsearch 버전: {version}")
-        print(f"🖥️  클러스터 전체 노드 수: {len(nodes_info)}")
-        
-        # 모든 노드 정보 출력
-        if nodes_info:
-            print("\n📋 클러스터 노드 목록:")
-            for node in nodes_info:
-                role = node.get('node.role', 'unknown')
-                master = '⭐ (master)' if node.get('master') == '*' else ''
-                print(f"  - {node.get('name', 'unknown')} | IP: {node.get('ip', 'N/A')} | Role: {role} {master}")
-        
-        print("=" * 60)
-        
-        return {
-            'node_name': node_name,
-            'cluster_name': cluster_name,
-            'version': version,
-            'all_nodes': nodes_info
-        }
+        return _summarize_node_info(info, nodes_info)
     except Exception as e:
         print(f"❌ 노드 정보 확인 실패: {e}")
         return None
 
-def get_es_client(max_retries=5, retry_delay=2):
+async def get_connected_node_info_async(es):
+    """get_connected_node_info의 AsyncElasticsearch 버전"""
+    try:
+        info, nodes_info = await asyncio.gather(es.info(), es.cat.nodes(format='json'))
+        return _summarize_node_info(info, nodes_info)
+    except Exception as e:
+        print(f"❌ 노드 정보 확인 실패: {e}")
+        return None
+
+def _summarize_node_info(info, nodes_info):
+    node_name = info.get('name', 'Unknown')
+    cluster_name = info.get('cluster_name', 'Unknown')
+    version = info.get('version', {}).get('number', 'Unknown')
+    nodes_info = list(nodes_info)
+
+    print("=" * 60)
+    print("✅ Elasticsearch 연결 성공!")
+    print(f"📍 현재 연결된 노드: {node_name}")
+    print(f"🔗 클러스터 이름: {cluster_name}")
+    print(f"📦 Elasticsearch 버전: {version}")
+    print(f"🖥️  클러스터 전체 노드 수: {len(nodes_info)}")
+    
+    # 모든 노드 정보 출력
+    if nodes_info:
+        print("\n📋 클러스터 노드 목록:")
+        for node in nodes_info:
+            role = node.get('node.role', 'unknown')
+            master = '⭐ (master)' if node.get('master') == '*' else ''
+            print(f"  - {node.get('name', 'unknown')} | IP: {node.get('ip', 'N/A')} | Role: {role} {master}")
+    
+    print("=" * 60)
+    
+    return {
+        'node_name': node_name,
+        'cluster_name': cluster_name,
+        'version': version,
+        'all_nodes': nodes_info
+    }
+
+def _load_es_config():
     # Load env variables inside function to ensure dotenv has loaded
     ES_HOSTS = os.getenv("ELASTICSEARCH_HOSTS")
     ES_PORT = os.getenv("ELASTICSEARCH_PORT", "9200")
@@ -57,6 +89,44 @@ def get_es_client(max_retries=5, retry_delay=2):
     
     # Parse multiple hosts from comma-separated string
     hosts = [f"http://{host.strip()}:{ES_PORT}" for host in ES_HOSTS.split(",")]
+    return hosts, (ES_USERNAME, ES_PASSWORD)
+
+def _es_client_options():
+    """
+    커넥션 풀/스니핑/재시도 설정 (동기/비동기 클라이언트 공통).
+    클라이언트 생성 자체는 네트워크 호출을 하지 않으므로 클러스터가 내려가 있어도 블로킹되지 않습니다.
+    """
+    hosts, basic_auth = _load_es_config()
+    sniff = os.getenv("ELASTICSEARCH_SNIFF", "true").lower() == "true"
+
+    return dict(
+        hosts=hosts,
+        basic_auth=basic_auth,
+        # HTTP connection pool per node (uvicorn worker 동시 요청 수에 맞춤)
+        connections_per_node=int(os.getenv("ELASTICSEARCH_CONNECTIONS_PER_NODE", 20)),
+        request_timeout=float(os.getenv("ELASTICSEARCH_REQUEST_TIMEOUT", 10)),
+        # Node-level retry: 실패한 노드는 backoff 후 재시도, 요청은 다른 노드로 재전송
+        max_retries=int(os.getenv("ELASTICSEARCH_MAX_RETRIES", 3)),
+        retry_on_timeout=True,
+        retry_on_status=(502, 503, 504),
+        dead_node_backoff_factor=1.0,
+        max_dead_node_backoff=30.0,
+        # Sniffing: 클러스터 노드 목록을 주기적으로/노드 장애 시 갱신
+        sniff_on_node_failure=sniff,
+        min_delay_between_sniffing=60 if sniff else None,
+        sniff_timeout=2.0,
+    )
+
+def build_es_client() -> Elasticsearch:
+    """튜닝된 동기 Elasticsearch 클라이언트 (스크립트/ETL용)"""
+    return Elasticsearch(**_es_client_options())
+
+def build_async_es_client() -> AsyncElasticsearch:
+    """튜닝된 AsyncElasticsearch 클라이언트 (API 라우터용)"""
+    return AsyncElasticsearch(**_es_client_options())
+
+def _connect_with_retries(max_retries=5, retry_delay=2):
+    hosts, (ES_USERNAME, _) = _load_es_config()
     
     print(f"🔍 Attempting to connect to Elasticsearch cluster at: {hosts}")
     print(f"🔍 Username: {ES_USERNAME}")
@@ -64,8 +134,7 @@ def get_es_client(max_retries=5, retry_delay=2):
     retries = 0
     while retries < max_retries:
         try:
-            # Use basic_auth
-            es = Elasticsearch(hosts, basic_auth=(ES_USERNAME, ES_PASSWORD))
+            es = build_es_client()
                 
             if es.ping():
                 # 연결 성공 시 노드 정보 출력
@@ -86,6 +155,119 @@ def get_es_client(max_retries=5, retry_delay=2):
     print("Could not connect to Elasticsearch after multiple attempts.")
     return None
 
+def get_es_client(max_retries=5, retry_delay=2):
+    """
+    동기 Elasticsearch 클라이언트를 반환합니다 (ETL 등 단독 스크립트용).
+    처음 호출 시 재시도하며 연결하고, 이후에는 같은 클라이언트를 재사용합니다.
+    API 라우터에서는 get_async_es_client()를 사용하세요.
+    """
+    if es_state.client is not None:
+        return es_state.client
+
+    es = _connect_with_retries(max_retries, retry_delay)
+    if es:
+        es_state.cold_connects += 1
+        es_state.client = es
+    return es
+
+def get_async_es_client():
+    """
+    lifespan에서 생성된 공유(warm) AsyncElasticsearch 클라이언트를 반환합니다.
+    헬스 상태만 확인하므로 블로킹되지 않으며, 클러스터가 unhealthy면 즉시 None을 반환합니다.
+    """
+    if es_state.async_client is None or not es_state.healthy:
+        es_state.unhealthy_rejections += 1
+        return None
+    es_state.warm_requests += 1
+    return es_state.async_client
+
+async def es_search(es: AsyncElasticsearch, index: str, body: dict, timeout: float = None, **kwargs):
+    """
+    요청별 deadline이 적용된 검색.
+    timeout 초과 시 HTTP 요청을 취소하고 asyncio.TimeoutError를 발생시킵니다.
+    """
+    timeout = timeout or ES_SEARCH_TIMEOUT
+    return await asyncio.wait_for(
+        es.options(request_timeout=timeout).search(index=index, body=body, **kwargs),
+        timeout=timeout + 1
+    )
+
+async def es_msearch(es: AsyncElasticsearch, index: str, bodies: list, timeout: float = None):
+    """
+    여러 검색 본문을 _msearch 한 번으로 실행합니다. (es_search와 같은 deadline 적용)
+    응답의 responses 목록은 bodies 순서와 같으며, 개별 실패 항목은 "error" 키를 가집니다.
+    """
+    timeout = timeout or ES_SEARCH_TIMEOUT
+    searches = []
+    for body in bodies:
+        searches.append({})
+        searches.append(body)
+    return await asyncio.wait_for(
+        es.options(request_timeout=timeout).msearch(index=index, searches=searches),
+        timeout=timeout + 1
+    )
+
+async def _check_es_health():
+    try:
+        healthy = await es_state.async_client.options(request_timeout=2).ping()
+        es_state.last_error = None if healthy else "ping failed"
+    except Exception as e:
+        healthy = False
+        es_state.last_error = str(e)
+
+    if healthy != es_state.healthy:
+        print(f"{'✅' if healthy else '❌'} Elasticsearch health changed: {'healthy' if healthy else 'unhealthy'}")
+    es_state.healthy = healthy
+    es_state.last_checked = time.time()
+    return healthy
+
+async def _es_health_loop(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        await _check_es_health()
+
+async def connect_to_es():
+    """
+    lifespan 시작 시 공유 AsyncElasticsearch 클라이언트를 생성하고 헬스 체크 루프를 시작합니다.
+    클러스터가 내려가 있어도 앱 기동을 막지 않으며, 헬스 루프가 복구를 감지합니다.
+    """
+    global _health_task
+    try:
+        es_state.async_client = build_async_es_client()
+    except ValueError as e:
+        print(f"❌ Elasticsearch 설정 오류: {e}")
+        return
+
+    if await _check_es_health():
+        await get_connected_node_info_async(es_state.async_client)
+    else:
+        print(f"⚠️  Elasticsearch 초기 연결 실패 (백그라운드에서 재확인): {es_state.last_error}")
+
+    interval = float(os.getenv("ELASTICSEARCH_HEALTH_INTERVAL", 10))
+    _health_task = asyncio.create_task(_es_health_loop(interval))
+
+async def close_es_connection():
+    global _health_task
+    if _health_task:
+        _health_task.cancel()
+        _health_task = None
+    if es_state.async_client:
+        await es_state.async_client.close()
+        es_state.async_client = None
+        es_state.healthy = False
+        print("Closed Elasticsearch connection")
+
+def es_client_metrics():
+    """공유 클라이언트 상태 및 사용량 메트릭"""
+    return {
+        "healthy": es_state.healthy,
+        "last_checked": es_state.last_checked,
+        "last_error": es_state.last_error,
+        "warm_requests": es_state.warm_requests,
+        "cold_connects": es_state.cold_connects,
+        "unhealthy_rejections": es_state.unhealthy_rejections
+    }
+
 def create_index_if_not_exists(es, index_name="liquors"):
     if not es.indices.exists(index=index_name):
         es.indices.create(
@@ -0,0 +1,78 @@
+# 한글 자모 분해 / 로마자 표기 / 편집 거리 유틸리티 (로컬 퍼지 매칭용)
+import unicodedata
+
+HANGUL_BASE = 0xAC00
+HANGUL_END = 0xD7A3
+
+CHOSEONG = ["ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅘ", "ㅙ", "ㅚ", "ㅛ", "ㅜ", "ㅝ", "ㅞ", "ㅟ", "ㅠ", "ㅡ", "ㅢ", "ㅣ"]
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 국어의 로마자 표기법 (음운 변화 규칙은 생략한 글자 단위 변환)
+ROMAN_CHOSEONG = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+ROMAN_JUNGSEONG = ["a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u", "wo", "we", "wi", "yu", "eu", "ui", "i"]
+ROMAN_JONGSEONG = ["", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "p", "t", "t", "p", "l", "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t"]
+
+def _split_syllable(ch: str):
+    code = ord(ch) - HANGUL_BASE
+    return code // (21 * 28), (code % (21 * 28)) // 28, code % 28
+
+def is_hangul_syllable(ch: str) -> bool:
+    return HANGUL_BASE <= ord(ch) <= HANGUL_END
+
+def normalize_name(text: str) -> str:
+    """매칭용 이름 정규화: NFC, 소문자, 공백 제거"""
+    return "".join(unicodedata.normalize("NFC", text or "").lower().split())
+
+def decompose_jamo(text: str) -> str:
+    """'백세주' → 'ㅂㅐㄱㅅㅔㅈㅜ' (한글 이외 문자는 그대로 유지)"""
+    out = []
+    for ch in text:
+        if is_hangul_syllable(ch):
+            cho, jung, jong = _split_syllable(ch)
+            out.append(CHOSEONG[cho])
+            out.append(JUNGSEONG[jung])
+            if jong:
+                out.append(JONGSEONG[jong])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+def romanize(text: str) -> str:
+    """'백세주' → 'baekseju' (한글 이외의 영숫자는 소문자로 유지, 나머지는 제거)"""
+    out = []
+    for ch in text:
+        if is_hangul_syllable(ch):
+            cho, jung, jong = _split_syllable(ch)
+            out.append(ROMAN_CHOSEONG[cho] + ROMAN_JUNGSEONG[jung] + ROMAN_JONGSEONG[jong])
+        elif ch.isascii() and ch.isalnum():
+            out.append(ch.lower())
+    return "".join(out)
+
+def is_latin_query(text: str) -> bool:
+    letters = [ch for ch in text if ch.isalpha()]
+    return bool(letters) and all(ch.isascii() for ch in letters)
+
+def char_ngrams(text: str, n: int = 2) -> set:
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def levenshtein(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def similarity(a: str, b: str) -> float:
+    """편집 거리 기반 유사도 (0.0 ~ 1.0)"""
+    if not a or not b:
+        return 0.0
+    return 1.0 - levenshtein(a, b) / max(len(a), len(b))
@@ -0,0 +1,117 @@
+# BM25 + kNN(dense_vector) 하이브리드 검색
+# - 두 검색을 _msearch 한 번으로 실행하고 순위를 reciprocal rank fusion(RRF)으로 합침
+#   (ES 내장 rank.rrf는 유료 라이선스 기능이므로 클라이언트에서 계산)
+# - 점수 척도가 다른 BM25 / 코사인 유사도를 정규화하지 않고 순위만 사용
+import os
+import time
+
+from app.utils.embeddings import EMBEDDING_FIELD, embeddings_available
+from app.utils.es_client import es_msearch
+
+# auto: 임베딩 모델이 있으면 hybrid, off: 항상 BM25만
+SEARCH_HYBRID = os.getenv("SEARCH_HYBRID", "auto").lower()
+RRF_RANK_CONSTANT = int(os.getenv("RRF_RANK_CONSTANT", 60))
+KNN_NUM_CANDIDATES = int(os.getenv("KNN_NUM_CANDIDATES", 100))
+# 각 검색에서 RRF 후보로 가져올 개수 (최종 size보다 넉넉하게)
+RRF_WINDOW = int(os.getenv("RRF_WINDOW", 20))
+
+class HybridStats:
+    calls: int = 0
+    fallbacks: int = 0
+    lexical_only_hits: int = 0
+    knn_only_hits: int = 0
+    both_hits: int = 0
+    total_seconds: float = 0.0
+
+hybrid_stats = HybridStats()
+
+def hybrid_enabled(mode: str = None) -> bool:
+    """mode: 요청별 지정(lexical | hybrid), 없으면 SEARCH_HYBRID 설정을 따름"""
+    mode = (mode or SEARCH_HYBRID).lower()
+    if mode in ("off", "lexical", "bm25"):
+        return False
+    return embeddings_available()
+
+def build_knn_body(vector: list, k: int, source: list, filter: dict = None, similarity: float = None) -> dict:
+    knn = {
+        "field": EMBEDDING_FIELD,
+        "query_vector": vector,
+        "k": k,
+        "num_candidates": max(KNN_NUM_CANDIDATES, k)
+    }
+    if filter:
+        knn["filter"] = filter
+    if similarity is not None:
+        # 코사인 유사도 하한: 관련 없는 문서가 순위만으로 섞여 들어오지 않도록 함
+        knn["similarity"] = similarity
+    return {"knn": knn, "_source": source, "size": k}
+
+def reciprocal_rank_fusion(hit_lists: list, size: int, rank_constant: int = None) -> list:
+    """
+    여러 검색 결과(hits 목록)를 RRF로 합칩니다. score = Σ 1 / (rank_constant + rank)
+    반환: [(hit, rrf_score, 등장한 검색 인덱스 목록)] 점수 내림차순
+    """
+    rank_constant = rank_constant or RRF_RANK_CONSTANT
+    fused = {}
+    for list_index, hits in enumerate(hit_lists):
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit["_id"])
+            if entry is None:
+                entry = fused[hit["_id"]] = [hit, 0.0, []]
+            entry[1] += 1.0 / (rank_constant + rank)
+            entry[2].append(list_index)
+    ranked = sorted(fused.values(), key=lambda entry: entry[1], reverse=True)
+    return [tuple(entry) for entry in ranked[:size]]
+
+async def hybrid_search(es, index: str, lexical_body: dict, vector: list, size: int, source: list,
+                        filter: dict = None, similarity: float = None):
+    """
+    BM25(lexical_body)와 kNN(vector)을 한 번의 _msearch로 실행해 RRF로 합친 상위 size개의 hit 목록.
+    한쪽 검색이 실패하면 나머지 결과만으로 순위를 매기고, 둘 다 실패하면 None.
+    """
+    start_time = time.perf_counter()
+    hybrid_stats.calls += 1
+    window = max(RRF_WINDOW, size)
+    lexical_body = {**lexical_body, "size": window, "_source": source}
+    knn_body = build_knn_body(vector, window, source, filter, similarity)
+
+    response = await es_msearch(es, index, [lexical_body, knn_body])
+    hit_lists = []
+    for item in response["responses"]:
+        if "error" in item:
+            print(f"⚠️ Hybrid search partial failure: {item['error']}")
+            hit_lists.append([])
+        else:
+            hit_lists.append(item["hits"]["hits"])
+    if not any("error" not in item for item in response["responses"]):
+        hybrid_stats.fallbacks += 1
+        return None
+
+    results = []
+    for hit, score, sources in reciprocal_rank_fusion(hit_lists, size):
+        if len(sources) == 2:
+            hybrid_stats.both_hits += 1
+        elif sources[0] == 0:
+            hybrid_stats.lexical_only_hits += 1
+        else:
+            hybrid_stats.knn_only_hits += 1
+        results.append({**hit, "_score": score})
+
+    hybrid_stats.total_seconds += time.perf_counter() - start_time
+    return results
+
+def hybrid_search_metrics():
+    calls = hybrid_stats.calls
+    return {
+        "mode": SEARCH_HYBRID,
+        "enabled": hybrid_enabled(),
+        "calls": calls,
+        "fallbacks": hybrid_stats.fallbacks,
+        "avg_ms": round(hybrid_stats.total_seconds / calls * 1000, 2) if calls else 0.0,
+        # 최종 결과가 어느 검색에서 왔는지 (kNN이 실제로 새 문서를 찾아오는지 확인용)
+        "results_from": {
+            "both": hybrid_stats.both_hits,
+            "lexical_only": hybrid_stats.lexical_only_hits,
+            "knn_only": hybrid_stats.knn_only_hits
+        }
+    }
@@ -0,0 +1,357 @@
+# LLM 호출 공용 게이트웨이
+# - SDK 설정(genai.configure)과 모델 객체 생성은 프로세스당 한 번
+# - 비동기 API(generate_content_async)로 호출해 이벤트 루프를 막지 않음
+# - provider별 동시 호출 수 제한(semaphore)과 deadline으로 느린 모델이 검색 트래픽을 굶기지 않도록 함
+# - Bedrock(boto3)은 클라이언트를 프로세스당 하나 만들고, 동기 invoke_model은 전용 스레드 풀에서 실행
+# - 스트리밍(invoke_model_with_response_stream)은 스레드가 읽은 chunk를 asyncio.Queue로 넘겨 async generator로 제공
+# - 지연 시간 / 토큰 수 히스토그램을 /health/metrics로 노출
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import boto3
+import google.generativeai as genai
+from botocore.config import Config
+
+LLM_LIMITS = {
+    "gemini": int(os.getenv("LLM_GEMINI_CONCURRENCY", 4)),
+    "bedrock": int(os.getenv("LLM_BEDROCK_CONCURRENCY", 8)),
+}
+LLM_TIMEOUTS = {
+    "gemini": float(os.getenv("LLM_GEMINI_TIMEOUT", 30)),
+    "bedrock": float(os.getenv("LLM_BEDROCK_TIMEOUT", 30)),
+}
+
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34]
+TOKEN_BUCKETS = [64, 128, 256, 512, 1024, 2048, 4096, 8192]
+
+class Histogram:
+    """고정 버킷 히스토그램 (upper bound 기준 누적이 아닌 구간별 count)"""
+
+    def __init__(self, buckets: list):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.sum / self.count, 3) if self.count else 0.0,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class ProviderStats:
+    def __init__(self, provider: str):
+        self.semaphore = asyncio.Semaphore(LLM_LIMITS[provider])
+        self.limit = LLM_LIMITS[provider]
+        self.timeout = LLM_TIMEOUTS[provider]
+        self.inflight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self.first_chunk = Histogram(LATENCY_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.output_tokens = Histogram(TOKEN_BUCKETS)
+
+    def metrics(self):
+        return {
+            "limit": self.limit,
+            "timeout": self.timeout,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency_seconds": self.latency.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "first_chunk_seconds": self.first_chunk.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "output_tokens": self.output_tokens.snapshot()
+        }
+
+_providers = {}
+_gemini_models = {}
+_gemini_api_key = None
+_bedrock_client = None
+_bedrock_executor: ThreadPoolExecutor = None
+
+def _stats(provider: str) -> ProviderStats:
+    stats = _providers.get(provider)
+    if stats is None:
+        stats = _providers[provider] = ProviderStats(provider)
+    return stats
+
+def get_gemini_model(model_name: str):
+    """GEMINI_API_KEY로 SDK를 한 번만 설정하고, 모델 객체를 이름별로 재사용합니다."""
+    global _gemini_api_key
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError("Gemini API Key is missing")
+    if api_key != _gemini_api_key:
+        genai.configure(api_key=api_key)
+        _gemini_api_key = api_key
+        _gemini_models.clear()
+
+    model = _gemini_models.get(model_name)
+    if model is None:
+        model = _gemini_models[model_name] = genai.GenerativeModel(model_name)
+    return model
+
+async def _call_with_limits(stats: ProviderStats, label: str, timeout: float, invoke):
+    """동시 호출 제한(semaphore) 대기 시간을 포함한 deadline 안에서 invoke()를 await합니다."""
+    timeout = timeout or stats.timeout
+    queued_at = time.perf_counter()
+
+    async def call():
+        stats.waiting += 1
+        try:
+            await stats.semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+        stats.queue_wait.observe(time.perf_counter() - queued_at)
+
+        stats.inflight += 1
+        start_time = time.perf_counter()
+        try:
+            return await invoke()
+        finally:
+            stats.inflight -= 1
+            stats.semaphore.release()
+            stats.latency.observe(time.perf_counter() - start_time)
+
+    stats.calls += 1
+    try:
+        response = await asyncio.wait_for(call(), timeout=timeout)
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        raise TimeoutError(f"{label} deadline exceeded ({timeout:g}s)")
+    except Exception:
+        stats.errors += 1
+        raise
+
+    elapsed_time = time.perf_counter() - queued_at
+    print(f"⏱️ {label} Time: {elapsed_time:.2f}s")
+    return response
+
+async def generate_gemini(model_name: str, contents, label: str = "Gemini", timeout: float = None, **kwargs):
+    """
+    Gemini generate_content_async 호출.
+    대기(동시 호출 제한) 시간을 포함해 timeout(기본 LLM_GEMINI_TIMEOUT) 안에 끝나지 않으면 TimeoutError.
+    """
+    model = get_gemini_model(model_name)
+    stats = _stats("gemini")
+    response = await _call_with_limits(
+        stats, label, timeout, lambda: model.generate_content_async(contents, **kwargs)
+    )
+
+    usage = response.usage_metadata
+    if usage:
+        stats.prompt_tokens.observe(usage.prompt_token_count)
+        stats.output_tokens.observe(usage.candidates_token_count)
+        print(f"💰 {label} Token Usage: Input={usage.prompt_token_count}, Output={usage.candidates_token_count}, Total={usage.total_token_count}")
+
+    return response
+
+def get_bedrock_client():
+    """
+    bedrock-runtime 클라이언트를 프로세스당 한 번 생성합니다. (boto3 클라이언트는 스레드 안전)
+    BEDROCK_ENDPOINT_URL을 지정하면 해당 주소로 호출합니다. (stub_bedrock_server.py 등 로컬 테스트용)
+    """
+    global _bedrock_client
+    if _bedrock_client is None:
+        session = boto3.Session(
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+            region_name=os.getenv("AWS_REGION", "us-east-1")
+        )
+        _bedrock_client = session.client(
+            service_name='bedrock-runtime',
+            endpoint_url=os.getenv("BEDROCK_ENDPOINT_URL") or None,
+            config=Config(
+                # 동시 호출 수만큼 커넥션을 유지해 TLS 핸드셰이크를 재사용
+                max_pool_connections=LLM_LIMITS["bedrock"],
+                connect_timeout=5,
+                read_timeout=LLM_TIMEOUTS["bedrock"],
+                retries={"max_attempts": 2, "mode": "standard"}
+            )
+        )
+    return _bedrock_client
+
+def _get_bedrock_executor() -> ThreadPoolExecutor:
+    global _bedrock_executor
+    if _bedrock_executor is None:
+        _bedrock_executor = ThreadPoolExecutor(
+            max_workers=LLM_LIMITS["bedrock"], thread_name_prefix="bedrock"
+        )
+    return _bedrock_executor
+
+def _invoke_bedrock_sync(model_id: str, body: dict, **kwargs):
+    response = get_bedrock_client().invoke_model(modelId=model_id, body=json.dumps(body), **kwargs)
+    # StreamingBody.read()도 블로킹이므로 같은 스레드에서 읽음
+    return json.loads(response['body'].read())
+
+async def invoke_bedrock(model_id: str, body: dict, label: str = "Bedrock", timeout: float = None, **kwargs):
+    """
+    Bedrock invoke_model 호출 (응답 body를 파싱한 dict 반환).
+    공유 클라이언트로 LLM_BEDROCK_CONCURRENCY 크기의 스레드 풀에서 실행하고,
+    대기 시간을 포함해 timeout(기본 LLM_BEDROCK_TIMEOUT) 안에 끝나지 않으면 TimeoutError.
+    """
+    stats = _stats("bedrock")
+    loop = asyncio.get_running_loop()
+    response_body = await _call_with_limits(
+        stats, label, timeout,
+        lambda: loop.run_in_executor(
+            _get_bedrock_executor(), partial(_invoke_bedrock_sync, model_id, body, **kwargs)
+        )
+    )
+
+    usage = response_body.get('usage') or {}
+    if usage:
+        stats.prompt_tokens.observe(usage.get('inputTokens', 0))
+        stats.output_tokens.observe(usage.get('outputTokens', 0))
+        print(f"💰 {label} Token Usage: Input={usage.get('inputTokens', 0)}, Output={usage.get('outputTokens', 0)}, Total={usage.get('totalTokens', 0)}")
+
+    return response_body
+
+class BedrockStreamHandle:
+    """
+    stream_bedrock 소비자(이벤트 루프)와 pump 스레드가 공유하는 취소 상태.
+    cancel()은 취소 표시와 함께 EventStream 본문을 닫아, 다음 이벤트를 기다리며 블로킹된 스레드를 바로 풀어줍니다.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.stream = None
+        self._lock = threading.Lock()
+
+    def attach(self, stream) -> bool:
+        """pump 스레드가 응답 스트림을 등록합니다. 이미 취소됐으면 False (호출자가 바로 닫음)"""
+        with self._lock:
+            if self.cancelled.is_set():
+                return False
+            self.stream = stream
+            return True
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+def _pump_bedrock_stream(model_id: str, body: dict, loop, queue: asyncio.Queue, handle: BedrockStreamHandle, **kwargs):
+    """스레드에서 EventStream을 읽어 이벤트 루프의 queue로 넘김 (끝은 None, 실패는 예외 객체)"""
+    stream = None
+    try:
+        response = get_bedrock_client().invoke_model_with_response_stream(
+            modelId=model_id, body=json.dumps(body), **kwargs
+        )
+        stream = response['body']
+        if not handle.attach(stream):
+            return
+        for event in stream:
+            if handle.cancelled.is_set():
+                return
+            chunk = event.get('chunk')
+            if chunk:
+                loop.call_soon_threadsafe(queue.put_nowait, json.loads(chunk['bytes']))
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+    except Exception as e:
+        # 취소로 본문이 닫혀 읽기가 실패한 경우는 오류가 아님 (소비자는 이미 떠남)
+        if not handle.cancelled.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+    finally:
+        if stream is not None:
+            stream.close()
+
+async def stream_bedrock(model_id: str, body: dict, label: str = "Bedrock", timeout: float = None, **kwargs):
+    """
+    Bedrock invoke_model_with_response_stream 호출. 모델이 보내는 chunk(dict)를 도착하는 대로 yield합니다.
+    스트림이 끝날 때까지 동시 호출 슬롯을 점유하며, 전체 스트림이 timeout 안에 끝나지 않으면 TimeoutError.
+    소비자가 중간에 그만두면(클라이언트 연결 종료 등) finally에서 스트림 본문을 닫아 스레드를 바로 돌려받습니다.
+    (소비자는 async with contextlib.aclosing(...)으로 감싸 종료 시점에 finally가 실행되도록 해야 함)
+    """
+    stats = _stats("bedrock")
+    timeout = timeout or stats.timeout
+    queued_at = time.perf_counter()
+    deadline = queued_at + timeout
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    handle = BedrockStreamHandle()
+
+    stats.calls += 1
+    stats.waiting += 1
+    try:
+        await asyncio.wait_for(stats.semaphore.acquire(), timeout=timeout)
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        raise TimeoutError(f"{label} deadline exceeded ({timeout:g}s)")
+    finally:
+        stats.waiting -= 1
+    stats.queue_wait.observe(time.perf_counter() - queued_at)
+
+    stats.inflight += 1
+    start_time = time.perf_counter()
+    first_chunk_at = None
+    try:
+        loop.run_in_executor(
+            _get_bedrock_executor(),
+            partial(_pump_bedrock_stream, model_id, body, loop, queue, handle, **kwargs)
+        )
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=max(0, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                raise TimeoutError(f"{label} deadline exceeded ({timeout:g}s)")
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                stats.errors += 1
+                raise item
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+                stats.first_chunk.observe(first_chunk_at - queued_at)
+
+            usage = item.get('metadata', {}).get('usage')
+            if usage:
+                stats.prompt_tokens.observe(usage.get('inputTokens', 0))
+                stats.output_tokens.observe(usage.get('outputTokens', 0))
+                print(f"💰 {label} Token Usage: Input={usage.get('inputTokens', 0)}, Output={usage.get('outputTokens', 0)}, Total={usage.get('totalTokens', 0)}")
+            yield item
+    finally:
+        handle.cancel()
+        stats.inflight -= 1
+        stats.semaphore.release()
+        stats.latency.observe(time.perf_counter() - start_time)
+
+    first_chunk_time = (first_chunk_at - queued_at) if first_chunk_at else 0.0
+    print(f"⏱️ {label} Time: {time.perf_counter() - queued_at:.2f}s (first chunk {first_chunk_time:.2f}s)")
+
+def close_bedrock_executor():
+    """종료 시 스레드 풀 정리 (진행 중인 호출은 기다리지 않음)"""
+    global _bedrock_executor
+    if _bedrock_executor is not None:
+        _bedrock_executor.shutdown(wait=False, cancel_futures=True)
+        _bedrock_executor = None
+
+def llm_metrics():
+    return {provider: stats.metrics() for provider, stats in _providers.items()}
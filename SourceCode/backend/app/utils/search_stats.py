@@ -1,50 +1,358 @@
 # 검색어 통계를 저장하는 함수
+import asyncio
+import os
+import time
 from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from app.db.mongodb import get_database
+from app.db.redisdb import get_redis
 
-async def save_search_query(query: str, drink_id: int = None):
-    """검색어를 MongoDB에 저장 (술 이름과 drink_id 함께 저장)"""
+# 요청 경로에서는 메모리 버퍼에 집계만 하고, 백그라운드 작업이 주기적으로 bulk_write로 반영
+# (실시간 인기 검색어 Redis ZINCRBY도 같은 작업에서 파이프라인으로 반영)
+SEARCH_STATS_FLUSH_INTERVAL = float(os.getenv("SEARCH_STATS_FLUSH_INTERVAL", 2))
+SEARCH_STATS_FLUSH_SIZE = int(os.getenv("SEARCH_STATS_FLUSH_SIZE", 500))
+SEARCH_STATS_MAX_PENDING = int(os.getenv("SEARCH_STATS_MAX_PENDING", 10000))
+
+class SearchStatsBuffer:
+    """(query, drink_id, date) 단위로 증가분을 합쳐 두는 집계 버퍼"""
+
+    def __init__(self):
+        self.pending = {}
+        # 실시간 인기 검색어 증가분: (시간 버킷 YYYYMMDDHH, drink_id) → [조회 수, 표시 이름]
+        self.views = {}
+        self.flush_event = asyncio.Event()
+        self.task: asyncio.Task = None
+        # 종료 요청 플래그: 진행 중인 bulk_write를 cancel()로 끊지 않고 루프가 스스로 빠져나오게 함
+        self.stopping = False
+        self.enqueued = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flushed_docs = 0
+        self.failures = 0
+        # 결과를 알 수 없게 끝난 bulk_write(네트워크 오류/타임아웃/취소)에서 버린 키 수
+        self.unacked_dropped = 0
+        self.last_flush_ms = 0.0
+        self.last_error = None
+        self.leaderboard_flushes = 0
+        self.leaderboard_failures = 0
+        self.leaderboard_dropped = 0
+
+    def add(self, key, count: int = 1, created_at: datetime = None):
+        if key in self.pending:
+            self.pending[key]["count"] += count
+            self.coalesced += 1
+        elif len(self.pending) >= SEARCH_STATS_MAX_PENDING:
+            # Mongo가 따라오지 못하는 상황: 메모리를 지키기 위해 새 키는 버림
+            self.dropped += count
+            return
+        else:
+            self.pending[key] = {"count": count, "created_at": created_at or datetime.now()}
+
+        if len(self.pending) >= SEARCH_STATS_FLUSH_SIZE:
+            self.flush_event.set()
+
+    def add_view(self, drink_id: int, name: str, moment: datetime):
+        key = (moment.strftime("%Y%m%d%H"), drink_id)
+        entry = self.views.get(key)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] = name
+        elif len(self.views) >= SEARCH_STATS_MAX_PENDING:
+            self.leaderboard_dropped += 1
+        else:
+            self.views[key] = [1, name]
+
+stats_buffer = SearchStatsBuffer()
+
+def _build_update(key, entry):
+    normalized_query, drink_id, today = key
+
+    # 검색어와 drink_id로 고유 키 생성 (같은 술의 조회는 하나로 집계)
+    filter_query = {
+        "query": normalized_query,
+        "date": today
+    }
+
+    update_data = {
+        "$inc": {"count": entry["count"]},
+        "$setOnInsert": {"created_at": entry["created_at"]}
+    }
+
+    # drink_id가 있으면 필터에 추가하고 저장
+    if drink_id:
+        filter_query["drink_id"] = drink_id
+        update_data["$setOnInsert"]["drink_id"] = drink_id
+
+    return UpdateOne(filter_query, update_data, upsert=True)
+
+def _record_flush_error(error: Exception, failed: int, retried: bool = True):
+    stats_buffer.failures += 1
+    stats_buffer.last_error = str(error)
+    action = "will retry" if retried else "dropped, may be partially applied"
+    print(f"❌ Error flushing search stats ({failed} keys {action}): {error}")
+
+async def flush_search_stats():
+    """
+    버퍼에 쌓인 증가분을 bulk_write 한 번으로 반영합니다. $inc는 멱등이 아니므로 전달은 at-most-once:
+      - bulk_write 전 실패(DB 연결 등): 아무것도 보내지 않았으므로 전부 버퍼로 되돌림
+      - BulkWriteError: writeErrors에 든(반영되지 않은 것이 확실한) 항목만 되돌림
+      - 그 밖의 오류/취소로 bulk_write 결과를 모름: 일부가 이미 반영됐을 수 있어 다시 보내지 않고 버림
+        (중복 집계 대신 유실, 버린 키 수는 unacked_dropped)
+    """
+    if not stats_buffer.pending:
+        return 0
+
+    batch, stats_buffer.pending = stats_buffer.pending, {}
+    items = list(batch.items())
+    # 반영되지 않은 항목: 정상 완료 시 비우고, 그 외에는 finally에서 버퍼로 되돌림
+    unwritten = items
+    sent = False
+    written = 0
+    start_time = time.perf_counter()
     try:
         db = await get_database()
-        collection = db.search_logs
-        
-        # 오늘 날짜의 시작 (00:00:00)
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # 검색어를 정규화 (공백 제거)
-        normalized_query = query.strip()
-        
-        # 검색어와 drink_id로 고유 키 생성 (같은 술의 조회는 하나로 집계)
-        filter_query = {
-            "query": normalized_query,
-            "date": today
-        }
-        
-        # drink_id가 있으면 필터에 추가
-        if drink_id:
-            filter_query["drink_id"] = drink_id
-        
-        update_data = {
-            "$inc": {"count": 1},
-            "$setOnInsert": {"created_at": datetime.now()}
+        operations = [_build_update(key, entry) for key, entry in items]
+        sent = True
+        await db.search_logs.bulk_write(operations, ordered=False)
+        unwritten = []
+        written = len(items)
+    except BulkWriteError as e:
+        # ordered=False: writeErrors에 없는 upsert는 이미 반영됨 → 실패한 항목만 다시 시도
+        unwritten = [items[error["index"]] for error in e.details.get("writeErrors", [])]
+        written = len(items) - len(unwritten)
+        _record_flush_error(e, len(unwritten))
+    except Exception as e:
+        _record_flush_error(e, len(items), retried=not sent)
+    finally:
+        if sent and unwritten is items:
+            # 보낸 뒤 결과를 모름 (네트워크 오류/타임아웃/취소) → 재전송하면 이미 반영된 $inc가 두 번 들어감
+            stats_buffer.unacked_dropped += len(items)
+            unwritten = []
+        for key, entry in unwritten:
+            stats_buffer.add(key, entry["count"], entry["created_at"])
+
+    if written:
+        stats_buffer.flushes += 1
+        stats_buffer.flushed_docs += written
+        stats_buffer.last_flush_ms = round((time.perf_counter() - start_time) * 1000, 2)
+    if written == len(items):
+        stats_buffer.last_error = None
+    return written
+
+async def _search_stats_flush_loop():
+    while not stats_buffer.stopping:
+        try:
+            await asyncio.wait_for(stats_buffer.flush_event.wait(), timeout=SEARCH_STATS_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        stats_buffer.flush_event.clear()
+        if stats_buffer.stopping:
+            break
+        await flush_search_stats()
+        await flush_leaderboard()
+
+async def start_search_stats_writer():
+    if stats_buffer.task is None:
+        stats_buffer.stopping = False
+        stats_buffer.task = asyncio.create_task(_search_stats_flush_loop())
+
+async def stop_search_stats_writer():
+    """백그라운드 작업을 멈추고 남은 증가분을 모두 반영합니다. (lifespan 종료 시)"""
+    if stats_buffer.task:
+        # 진행 중인 flush가 끝날 때까지 기다린 뒤 루프 종료 (cancel 시 꺼낸 배치가 유실될 수 있음)
+        stats_buffer.stopping = True
+        stats_buffer.flush_event.set()
+        await stats_buffer.task
+        stats_buffer.task = None
+    flushed = await flush_search_stats()
+    await flush_leaderboard()
+    if flushed:
+        print(f"✅ Search stats flushed on shutdown: {flushed} keys")
+
+def search_stats_metrics():
+    return {
+        "pending": len(stats_buffer.pending),
+        "max_pending": SEARCH_STATS_MAX_PENDING,
+        "enqueued": stats_buffer.enqueued,
+        "coalesced": stats_buffer.coalesced,
+        "dropped": stats_buffer.dropped,
+        "flushes": stats_buffer.flushes,
+        "flushed_docs": stats_buffer.flushed_docs,
+        "failures": stats_buffer.failures,
+        "unacked_dropped": stats_buffer.unacked_dropped,
+        "last_flush_ms": stats_buffer.last_flush_ms,
+        "last_error": stats_buffer.last_error,
+        "leaderboard": {
+            "pending": len(stats_buffer.views),
+            "flushes": stats_buffer.leaderboard_flushes,
+            "failures": stats_buffer.leaderboard_failures,
+            "dropped": stats_buffer.leaderboard_dropped
         }
-        
-        # drink_id가 있으면 저장
-        if drink_id:
-            update_data["$setOnInsert"]["drink_id"] = drink_id
-        
-        # 오늘 날짜에 해당 검색어가 있으면 count 증가, 없으면 생성
-        await collection.update_one(
-            filter_query,
-            update_data,
-            upsert=True
-        )
-        
-        print(f"✅ Search query saved: {normalized_query} (drink_id: {drink_id})")
+    }
+
+async def save_search_query(query: str, drink_id: int = None):
+    """검색어를 집계 버퍼에 추가 (술 이름과 drink_id 함께 저장, MongoDB/Redis 반영은 flush 시)"""
+    # 검색어를 정규화 (공백 제거)
+    normalized_query = query.strip()
+
+    # 오늘 날짜의 시작 (00:00:00)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    stats_buffer.enqueued += 1
+    stats_buffer.add((normalized_query, drink_id or None, today))
+
+    if drink_id:
+        stats_buffer.add_view(drink_id, normalized_query, datetime.now())
+
+    # 백그라운드 writer가 없는 경우(스크립트 실행 등) 즉시 반영
+    if stats_buffer.task is None:
+        await flush_search_stats()
+        await flush_leaderboard()
+
+# 실시간 인기 검색어: drink_id를 member로 하는 Redis ZSET (시간/일 단위 버킷)
+# MongoDB search_logs는 영구 이력으로 유지하고, 조회는 Redis에서 처리
+LEADERBOARD_HOUR_KEY = "search:top:hour:{bucket}"   # bucket: YYYYMMDDHH
+LEADERBOARD_DAY_KEY = "search:top:day:{bucket}"     # bucket: YYYYMMDD
+LEADERBOARD_NAMES_KEY = "search:top:names"          # drink_id → 표시할 검색어(술 이름)
+LEADERBOARD_HOUR_TTL = 8 * 24 * 3600
+LEADERBOARD_DAY_TTL = 35 * 24 * 3600
+
+LEADERBOARD_WINDOWS = ("today", "1h", "24h", "7d")
+TRENDING_WINDOWS = ("hour", "week")
+
+def _hour_key(moment: datetime) -> str:
+    return LEADERBOARD_HOUR_KEY.format(bucket=moment.strftime("%Y%m%d%H"))
+
+def _day_key(moment: datetime) -> str:
+    return LEADERBOARD_DAY_KEY.format(bucket=moment.strftime("%Y%m%d"))
+
+async def flush_leaderboard():
+    """
+    버퍼에 모인 조회 수를 시간/일 버킷에 ZINCRBY (writer 작업에서 파이프라인 1회 왕복).
+    비트랜잭션 파이프라인은 일부만 반영됐을 수 있으므로 실패해도 다시 보내지 않음 (중복 집계 방지)
+    """
+    if not stats_buffer.views:
+        return 0
+    batch, stats_buffer.views = stats_buffer.views, {}
+    redis = get_redis()
+    if not redis:
+        return 0
+
+    expires = {}
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for (hour_bucket, drink_id), (count, name) in batch.items():
+            hour_key = LEADERBOARD_HOUR_KEY.format(bucket=hour_bucket)
+            day_key = LEADERBOARD_DAY_KEY.format(bucket=hour_bucket[:8])
+            pipe.zincrby(hour_key, count, drink_id)
+            pipe.zincrby(day_key, count, drink_id)
+            pipe.hset(LEADERBOARD_NAMES_KEY, drink_id, name)
+            expires[hour_key] = LEADERBOARD_HOUR_TTL
+            expires[day_key] = LEADERBOARD_DAY_TTL
+        for key, ttl in expires.items():
+            pipe.expire(key, ttl)
+        await pipe.execute()
     except Exception as e:
-        print(f"❌ Error saving search query: {e}")
+        stats_buffer.leaderboard_failures += 1
+        print(f"⚠️ Leaderboard update error ({len(batch)} entries): {e}")
+        return 0
+
+    stats_buffer.leaderboard_flushes += 1
+    return len(batch)
+
+def _window_weights(window: str, now: datetime) -> dict:
+    """윈도우 → {버킷 키: 가중치}. 1h는 직전 시간 버킷을 경과 비율만큼 할인한 sliding window 근사"""
+    if window == "today":
+        return {_day_key(now): 1}
+    if window == "1h":
+        elapsed = (now.minute * 60 + now.second) / 3600
+        return {_hour_key(now): 1, _hour_key(now - timedelta(hours=1)): round(1 - elapsed, 4)}
+    if window == "24h":
+        return {_hour_key(now - timedelta(hours=h)): 1 for h in range(24)}
+    if window == "7d":
+        return {_day_key(now - timedelta(days=d)): 1 for d in range(7)}
+    raise ValueError(f"Unknown window: {window}")
+
+async def _zunion_scores(redis, weights: dict) -> dict:
+    weights = {key: weight for key, weight in weights.items() if weight > 0}
+    if not weights:
+        return {}
+    entries = await redis.zunion(weights, aggregate="SUM", withscores=True)
+    return {member: score for member, score in entries}
+
+async def _attach_names(redis, ranked: list) -> list:
+    if not ranked:
+        return []
+    names = await redis.hmget(LEADERBOARD_NAMES_KEY, [member for member, _ in ranked])
+    return [
+        {"query": name or "", "count": int(round(score)), "drink_id": int(member)}
+        for (member, score), name in zip(ranked, names)
+    ]
+
+async def get_top_searches(limit: int = 10, window: str = "today"):
+    """
+    기간별 가장 많이 조회된 술 Top N 반환 (drink_id 포함)
+    window: today(오늘, 기본) | 1h | 24h | 7d
+    Redis가 없거나 오늘 버킷이 비어 있으면 MongoDB search_logs로 집계합니다. (today만)
+    """
+    redis = get_redis()
+    if redis:
+        try:
+            scores = await _zunion_scores(redis, _window_weights(window, datetime.now()))
+            if scores or window != "today":
+                ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+                return await _attach_names(redis, ranked)
+        except Exception as e:
+            print(f"⚠️ Leaderboard read error: {e}")
+
+    if window != "today":
+        return []
+    return await _get_top_searches_mongo(limit)
+
+async def get_trending_searches(limit: int = 10, window: str = "hour"):
+    """
+    급상승 검색어: 최근 구간의 조회 수를 이전 구간 평균과 비교한 상승 비율 순
+      hour: 최근 1시간 vs 직전 24시간의 시간당 평균
+      week: 오늘 vs 직전 7일의 일 평균
+    """
+    redis = get_redis()
+    if not redis:
+        return []
+
+    now = datetime.now()
+    if window == "hour":
+        recent_weights = _window_weights("1h", now)
+        baseline_weights = {_hour_key(now - timedelta(hours=h)): 1 for h in range(1, 25)}
+        baseline_span = 24
+    elif window == "week":
+        recent_weights = _window_weights("today", now)
+        baseline_weights = {_day_key(now - timedelta(days=d)): 1 for d in range(1, 8)}
+        baseline_span = 7
+    else:
+        raise ValueError(f"Unknown window: {window}")
+
+    try:
+        recent = await _zunion_scores(redis, recent_weights)
+        baseline = await _zunion_scores(redis, baseline_weights)
+        trending = []
+        for member, count in recent.items():
+            average = baseline.get(member, 0.0) / baseline_span
+            # +1 스무딩: 이전 기록이 없는 술이 1~2회 조회만으로 1위가 되지 않도록 함
+            trending.append((member, count, (count + 1) / (average + 1)))
+        trending.sort(key=lambda item: (item[2], item[1]), reverse=True)
+        trending = trending[:limit]
+
+        results = await _attach_names(redis, [(member, count) for member, count, _ in trending])
+        for item, (_, _, ratio) in zip(results, trending):
+            item["trend"] = round(ratio, 2)
+        return results
+    except Exception as e:
+        print(f"⚠️ Trending read error: {e}")
+        return []
 
-async def get_top_searches(limit: int = 10):
+async def _get_top_searches_mongo(limit: int = 10):
     """오늘 하루 동안 가장 많이 검색된 검색어 Top N 반환 (drink_id 포함)"""
     try:
         db = await get_database()
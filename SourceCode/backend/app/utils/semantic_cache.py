@@ -0,0 +1,183 @@
+# 챗봇 답변용 의미(유사 문장) 캐시
+# - 메시지를 정규화(NFC, 소문자, 문장부호/공백 제거)한 뒤 글자 bigram 집합을 서명으로 사용
+# - 정규화 결과가 같으면 exact hit, 아니면 bigram Jaccard 유사도가 threshold 이상인 항목을 similar hit
+# - 단, bigram 유사도만으로는 단어 하나 바뀐 질문("회에 어울리는 술" / "고기에 어울리는 술")과
+#   실제 표현 변형("비 오는 날에" / "비 오는 날")을 가를 threshold가 없으므로,
+#   어절에서 조사를 떼고 불용어를 뺀 내용어 토큰이 완전히 같을 때만 similar hit
+#   (숫자/단위, "말고", "이하" 같은 조건도 내용어로 남아 "10도 이하" ≠ "20도 이하")
+# - bigram → 항목 역색인으로 후보만 비교하므로 항목 수가 늘어도 조회 비용이 거의 일정
+# - 크기 제한(LRU) + 만료 시간(TTL), 절약한 LLM 호출 수/시간을 /health/metrics로 노출
+import os
+import re
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+
+from app.utils.cache import MISSING
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.75))
+# 너무 짧은 메시지("추천", "안녕")는 유사 매칭하지 않고 exact만 사용
+SEMANTIC_CACHE_MIN_GRAMS = int(os.getenv("SEMANTIC_CACHE_MIN_GRAMS", 4))
+
+_PUNCTUATION = re.compile(r"[^\w]+")
+# 어절 끝에서 떼는 조사 (긴 것부터)
+_PARTICLES = ("이랑", "에", "랑", "인", "은", "는", "을", "를")
+# 질문마다 붙는 말이라 내용 비교에서 빼는 어절
+_STOPWORDS = frozenset(["어울리는", "추천", "추천해", "추천해줘", "해줘", "줘", "좀", "술"])
+
+def normalize_message(text: str) -> str:
+    """'비 오는 날 어울리는 막걸리?' → '비오는날어울리는막걸리'"""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return _PUNCTUATION.sub("", text).replace("_", "")
+
+def message_signature(normalized: str) -> frozenset:
+    """글자 bigram 집합 (한 글자짜리는 글자 자체)"""
+    if len(normalized) < 2:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + 2] for i in range(len(normalized) - 1))
+
+def _strip_particle(word: str) -> str:
+    for particle in _PARTICLES:
+        if len(word) > len(particle) and word.endswith(particle):
+            return word[:-len(particle)]
+    return word
+
+def message_content_tokens(text: str) -> tuple:
+    """'10도 이하인 약주 추천해줘' → ('10도', '이하', '약주'). 어순 그대로 (범위의 앞뒤가 바뀌면 다른 질문)"""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    tokens = []
+    for word in _PUNCTUATION.sub(" ", text).replace("_", " ").split():
+        if word in _STOPWORDS:
+            continue
+        word = _strip_particle(word)
+        if word not in _STOPWORDS:
+            tokens.append(word)
+    return tuple(tokens)
+
+class SemanticCache:
+    def __init__(self, namespace: str, maxsize: int = 2048, ttl: float = 6 * 3600, threshold: float = None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold or SEMANTIC_CACHE_THRESHOLD
+        # normalized → (expires_at, signature, content_tokens, value, cost_seconds)
+        self._entries = OrderedDict()
+        self._postings = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+
+    def _remove(self, key: str):
+        _, signature, _, _, _ = self._entries.pop(key)
+        for gram in signature:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def _live(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _hit(self, key: str, entry):
+        self._entries.move_to_end(key)
+        self.saved_seconds += entry[4]
+        return entry[3]
+
+    def _most_similar(self, signature: frozenset, content_tokens: tuple, now: float):
+        """역색인으로 bigram을 공유하는 항목만 세어 내용어 토큰이 같은 항목 중 Jaccard가 가장 높은 항목을 찾음"""
+        shared = Counter()
+        for gram in signature:
+            shared.update(self._postings.get(gram, ()))
+
+        size = len(signature)
+        scored = []
+        for key, common in shared.items():
+            _, entry_signature, entry_tokens, _, _ = self._entries[key]
+            if entry_tokens != content_tokens:
+                continue
+            score = common / (size + len(entry_signature) - common)
+            if score >= self.threshold:
+                scored.append((score, key))
+
+        for _, key in sorted(scored, reverse=True):
+            entry = self._live(key, now)
+            if entry is not None:
+                return key, entry
+        return None, None
+
+    def get(self, text: str):
+        normalized = normalize_message(text)
+        now = time.monotonic()
+
+        entry = self._live(normalized, now)
+        if entry is not None:
+            self.exact_hits += 1
+            return self._hit(normalized, entry)
+
+        signature = message_signature(normalized)
+        content_tokens = message_content_tokens(text)
+        # 내용어가 하나도 없으면("술 추천해줘") 비교할 기준이 없으므로 exact만
+        if len(signature) >= SEMANTIC_CACHE_MIN_GRAMS and content_tokens:
+            key, entry = self._most_similar(signature, content_tokens, now)
+            if entry is not None:
+                self.similar_hits += 1
+                return self._hit(key, entry)
+
+        self.misses += 1
+        return MISSING
+
+    def set(self, text: str, value, cost: float = 0.0):
+        """cost: 이 값을 만드는 데 걸린 시간(초). hit마다 saved_seconds에 더해짐"""
+        normalized = normalize_message(text)
+        if not normalized:
+            return
+        if normalized in self._entries:
+            self._remove(normalized)
+
+        signature = message_signature(normalized)
+        self._entries[normalized] = (
+            time.monotonic() + self.ttl, signature, message_content_tokens(text), value, cost
+        )
+        for gram in signature:
+            self._postings.setdefault(gram, set()).add(normalized)
+
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._postings.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def metrics(self):
+        hits = self.exact_hits + self.similar_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "threshold": self.threshold,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            # hit 한 번 = Bedrock 호출(+ RAG 검색) 한 번 절약
+            "llm_calls_saved": hits,
+            "saved_seconds": round(self.saved_seconds, 2)
+        }
@@ -0,0 +1,152 @@
+# 지역 특산물(local_specialties) + 술-특산물 연결(drink_local_specialty_bridge) 메모리 색인
+# /hansang 조회를 MariaDB 없이 처리하고, 버전 스탬프가 바뀌거나 SPECIALTY_MAX_AGE가 지나면 다시 적재합니다.
+import asyncio
+import os
+import time
+
+from app.db.mariadb import fetch_all, fetch_one
+
+SPECIALTY_REFRESH_INTERVAL = float(os.getenv("SPECIALTY_REFRESH_INTERVAL", 60))
+# 스탬프로 못 잡는 변경(연결 행 교체, 특산물 이름/시군 수정)도 이 시간(초) 안에는 반영되도록 강제 재적재
+SPECIALTY_MAX_AGE = float(os.getenv("SPECIALTY_MAX_AGE", 600))
+
+SPECIALTY_SELECT = """
+    SELECT local_id, province, city_county, contents_name, imgurl, linkurl
+    FROM local_specialties
+    ORDER BY local_id
+"""
+BRIDGE_SELECT = "SELECT drink_id, local_id FROM drink_local_specialty_bridge"
+# 두 테이블의 행 수 + 최대 id (하나라도 바뀌면 다시 적재)
+SPECIALTY_VERSION = """
+    SELECT
+        (SELECT COUNT(*) FROM local_specialties) AS specialty_count,
+        (SELECT MAX(local_id) FROM local_specialties) AS specialty_max_id,
+        (SELECT COUNT(*) FROM drink_local_specialty_bridge) AS bridge_count
+"""
+
+def normalize_city(city: str) -> str:
+    """'여주 시' → '여주시' (공백 제거)"""
+    return "".join((city or "").split())
+
+class SpecialtyIndex:
+    def __init__(self, rows: list, bridges: list, version: tuple):
+        self.version = version
+        self.loaded_at = time.time()
+        self.size = len(rows)
+        self.by_province = {}
+        self.by_city = {}
+        self.by_city_prefix = {}
+        self.by_drink = {}
+
+        by_id = {}
+        for row in rows:
+            by_id[row["local_id"]] = row
+            province = row["province"]
+            city = normalize_city(row["city_county"])
+            self.by_province.setdefault(province, []).append(row)
+            self.by_city.setdefault((province, city), []).append(row)
+            # city_county LIKE '여주%' 와 같은 접두어 조회: 가능한 모든 접두어에 등록
+            for end in range(1, len(city) + 1):
+                self.by_city_prefix.setdefault((province, city[:end]), []).append(row)
+
+        for bridge in bridges:
+            row = by_id.get(bridge["local_id"])
+            if row is not None:
+                self.by_drink.setdefault(bridge["drink_id"], []).append(row)
+
+    def by_region(self, province: str, city: str = None, limit: int = 20, prefix: bool = False):
+        """province(+city) 특산물. prefix=True면 city로 시작하는 시/군도 포함 ('여주' → '여주시')"""
+        if not city:
+            rows = self.by_province.get(province, [])
+        elif prefix:
+            rows = self.by_city_prefix.get((province, normalize_city(city)), [])
+        else:
+            rows = self.by_city.get((province, normalize_city(city)), [])
+        return rows[:limit]
+
+    def for_drink(self, drink_id: int, limit: int = 20):
+        return self.by_drink.get(drink_id, [])[:limit]
+
+class SpecialtyIndexState:
+    index: SpecialtyIndex = None
+    hits: int = 0
+    misses: int = 0
+    reloads: int = 0
+    last_error: str = None
+
+specialty_state = SpecialtyIndexState()
+_refresh_task: asyncio.Task = None
+
+def get_specialty_index():
+    """색인이 로드되어 있으면 반환하고 hit/miss를 집계합니다. (None이면 호출자가 DB 조회)"""
+    index = specialty_state.index
+    if index is None:
+        specialty_state.misses += 1
+    else:
+        specialty_state.hits += 1
+    return index
+
+async def _fetch_version():
+    row = await fetch_one(SPECIALTY_VERSION)
+    return tuple(row.values()) if row else ()
+
+async def load_specialty_index():
+    try:
+        version = await _fetch_version()
+        rows = await fetch_all(SPECIALTY_SELECT)
+        bridges = await fetch_all(BRIDGE_SELECT)
+    except Exception as e:
+        specialty_state.last_error = str(e)
+        print(f"⚠️ Specialty index load failed: {e}")
+        return False
+
+    specialty_state.index = SpecialtyIndex(rows, bridges, version)
+    specialty_state.reloads += 1
+    specialty_state.last_error = None
+    print(f"🥢 Specialty index loaded: {len(rows)} specialties, {len(bridges)} drink links")
+    return True
+
+async def _specialty_refresh_loop():
+    while True:
+        await asyncio.sleep(SPECIALTY_REFRESH_INTERVAL)
+        index = specialty_state.index
+        try:
+            version = await _fetch_version()
+        except Exception as e:
+            specialty_state.last_error = str(e)
+            continue
+        if (
+            index is None
+            or index.version != version
+            or time.time() - index.loaded_at > SPECIALTY_MAX_AGE
+        ):
+            await load_specialty_index()
+
+async def start_specialty_index():
+    global _refresh_task
+    await load_specialty_index()
+    _refresh_task = asyncio.create_task(_specialty_refresh_loop())
+
+async def stop_specialty_index():
+    global _refresh_task
+    if _refresh_task:
+        _refresh_task.cancel()
+        _refresh_task = None
+    specialty_state.index = None
+
+def specialty_index_metrics():
+    index = specialty_state.index
+    lookups = specialty_state.hits + specialty_state.misses
+    return {
+        "size": index.size if index else 0,
+        "provinces": len(index.by_province) if index else 0,
+        "drinks": len(index.by_drink) if index else 0,
+        "version": list(index.version) if index else None,
+        "loaded_at": index.loaded_at if index else None,
+        "max_age": SPECIALTY_MAX_AGE,
+        "hits": specialty_state.hits,
+        "misses": specialty_state.misses,
+        "hit_rate": round(specialty_state.hits / lookups, 4) if lookups else 0.0,
+        "reloads": specialty_state.reloads,
+        "last_error": specialty_state.last_error
+    }
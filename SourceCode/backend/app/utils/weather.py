@@ -1,36 +1,226 @@
-import requests
-import asyncio
 import os
-import urllib3
 import json
-import redis
+import time
+import asyncio
 import logging
+import httpx
 from typing import List, Dict, Any
 from urllib.parse import unquote
 import random
 from datetime import datetime
 
+from app.db.redisdb import get_redis
+from app.utils.cache import MISSING, LRUTTLCache, SingleFlight
+
 # Logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Redis Connection
-try:
-    redis_client = redis.StrictRedis(
-        host=os.getenv("REDIS_HOST", "localhost"),
-        port=int(os.getenv("REDIS_PORT", 6379)),
-        password=os.getenv("REDIS_PASSWORD", None),
-        decode_responses=True,
-        socket_timeout=2
-    )
-    redis_client.ping()
-    logger.info("✅ Connected to Redis")
-except Exception as e:
-    logger.error(f"❌ Redis Connection Failed: {e}")
-    redis_client = None
-
-# SSL Warning Disable
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# stale-while-revalidate
+# - fetched_at 기준 WEATHER_FRESH_TTL 이내: 그대로 반환
+# - WEATHER_MAX_STALE 이내: 저장된 값을 즉시 반환하고 백그라운드에서 OWM 갱신
+# - 그보다 오래됐거나 없음: OWM 응답을 기다림 (prefetcher가 돌고 있으면 기동 직후 외에는 발생하지 않음)
+WEATHER_FRESH_TTL = float(os.getenv("WEATHER_FRESH_TTL", 2400))
+WEATHER_MAX_STALE = float(os.getenv("WEATHER_MAX_STALE", 3 * 3600))
+
+# OWM 분당 호출 한도 (무료 플랜 60회보다 여유 있게). prefetcher, 사용자 miss, 백그라운드 갱신이 모두 공유
+OWM_RATE_LIMIT_PER_MIN = int(os.getenv("OWM_RATE_LIMIT_PER_MIN", 50))
+# 한도 초과 시 사용자 요청(캐시 miss)이 다음 분을 기다리는 최대 시간(초). 넘으면 날씨 없음으로 응답
+OWM_RATE_LIMIT_MAX_WAIT = float(os.getenv("OWM_RATE_LIMIT_MAX_WAIT", 3))
+OWM_RATE_KEY = "weather:owm:rate:{minute}"
+
+class WeatherStats:
+    fresh_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    cache_errors: int = 0
+    owm_calls: int = 0
+    owm_errors: int = 0
+    owm_seconds: float = 0.0
+
+weather_stats = WeatherStats()
+# L1: 프로세스 내 사본 (Redis 왕복 없이 응답), L2: Redis (워커/prefetcher 간 공유)
+_local_weather = LRUTTLCache(maxsize=1024, ttl=WEATHER_MAX_STALE)
+_refresh_flight = SingleFlight()
+_background_tasks = set()
+
+class OWMRateLimiter:
+    """
+    모든 OWM 호출이 지나가는 분당 한도 (고정 1분 윈도우).
+    Redis INCR로 워커/컨테이너 전체가 한 카운터를 공유하고, Redis가 없거나 실패하면 프로세스 안에서만 셉니다.
+    """
+
+    def __init__(self, limit_per_min: int):
+        self.limit_per_min = limit_per_min
+        self.local_minute = None
+        self.local_count = 0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+
+    async def _take(self, minute: int) -> bool:
+        redis = get_redis()
+        if redis:
+            try:
+                key = OWM_RATE_KEY.format(minute=minute)
+                pipe = redis.pipeline(transaction=False)
+                pipe.incr(key)
+                pipe.expire(key, 120)
+                count, _ = await pipe.execute()
+                return count <= self.limit_per_min
+            except Exception as e:
+                weather_stats.cache_errors += 1
+                logger.error(f"OWM rate limit Redis Error (local count): {e}")
+        if self.local_minute != minute:
+            self.local_minute, self.local_count = minute, 0
+        self.local_count += 1
+        return self.local_count <= self.limit_per_min
+
+    async def acquire(self, max_wait: float = None) -> bool:
+        """호출 한 번 몫을 얻을 때까지 대기. max_wait(초) 안에 못 얻으면 False (None이면 계속 대기)"""
+        start = time.monotonic()
+        while True:
+            now = time.time()
+            minute = int(now // 60)
+            if await self._take(minute):
+                self.acquired += 1
+                waited = time.monotonic() - start
+                if waited > 0.001:
+                    self.waits += 1
+                    self.wait_seconds += waited
+                return True
+            # 다음 분 시작까지 (동시에 깨어나 몰리지 않도록 약간의 지터)
+            delay = (minute + 1) * 60 - now + random.uniform(0, 1)
+            if max_wait is not None and time.monotonic() - start + delay > max_wait:
+                self.rejected += 1
+                return False
+            await asyncio.sleep(delay)
+
+    def metrics(self):
+        return {
+            "limit_per_min": self.limit_per_min,
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 2),
+            # 사용자 요청이 한도 때문에 OWM을 부르지 못한 횟수
+            "rejected": self.rejected
+        }
+
+owm_limiter = OWMRateLimiter(OWM_RATE_LIMIT_PER_MIN)
+
+class WeatherHTTP:
+    client: httpx.AsyncClient = None
+
+weather_http = WeatherHTTP()
+
+def get_weather_http_client() -> httpx.AsyncClient:
+    """OWM 호출용 공유 AsyncClient (keep-alive 커넥션 재사용)"""
+    if weather_http.client is None:
+        weather_http.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("OWM_MAX_CONNECTIONS", 20)),
+                max_keepalive_connections=int(os.getenv("OWM_MAX_KEEPALIVE", 10)),
+                keepalive_expiry=60
+            )
+        )
+    return weather_http.client
+
+async def start_weather_client():
+    get_weather_http_client()
+
+async def close_weather_client():
+    for task in list(_background_tasks):
+        task.cancel()
+    if weather_http.client is not None:
+        await weather_http.client.aclose()
+        weather_http.client = None
+
+def weather_cache_key(adm_cd: str, city_name: str = None) -> str:
+    """시/군 날씨: weather:v2:{adm_cd}:{city}, 시/도 대표 날씨: weather:v2:{adm_cd}"""
+    return f"weather:v2:{adm_cd}:{city_name}" if city_name else f"weather:v2:{adm_cd}"
+
+def weather_selection_key(adm_cd: str, city_name: str) -> str:
+    """드롭다운에서 고른 이름의 캐시 키 (시/군 목록에 없는 시/도 대표 도시 이름이면 시/도 대표 날씨 키)"""
+    if city_name == PROVINCE_REP_CITY_KR.get(adm_cd) and city_name not in PROVINCE_CITY_LIST.get(adm_cd, []):
+        return weather_cache_key(adm_cd)
+    return weather_cache_key(adm_cd, city_name)
+
+async def read_weather_entry(key: str):
+    """{"data": ..., "fetched_at": epoch} 또는 None. L1이 fresh가 아니면 Redis의 더 최신 값을 확인"""
+    entry = _local_weather.get(key)
+    if entry is not MISSING and time.time() - entry["fetched_at"] <= WEATHER_FRESH_TTL:
+        return entry
+    entry = None if entry is MISSING else entry
+
+    redis = get_redis()
+    if redis:
+        try:
+            cached = await redis.get(key)
+        except Exception as e:
+            weather_stats.cache_errors += 1
+            logger.error(f"Redis Read Error: {e}")
+            cached = None
+        if cached:
+            remote = json.loads(cached)
+            if entry is None or remote["fetched_at"] > entry["fetched_at"]:
+                entry = remote
+                _local_weather.set(key, entry)
+    return entry
+
+async def store_weather_entry(key: str, data):
+    entry = {"data": data, "fetched_at": time.time()}
+    _local_weather.set(key, entry)
+    redis = get_redis()
+    if redis:
+        try:
+            # 키 만료 = 최대 허용 staleness (그 이후 값은 어차피 쓰지 않음)
+            await redis.setex(key, int(WEATHER_MAX_STALE), json.dumps(entry))
+        except Exception as e:
+            weather_stats.cache_errors += 1
+            logger.error(f"Redis Write Error: {e}")
+    return entry
+
+async def refresh_weather(key: str, query: str, display_name: str, max_wait: float = None):
+    """
+    OWM에서 받아 저장 (같은 키 동시 갱신은 한 번만). 실패하면 None
+    max_wait: 분당 한도에 걸렸을 때 기다릴 최대 시간(초). None이면 자리가 날 때까지 대기 (prefetch/백그라운드 갱신)
+    """
+    async def fetch():
+        owm_data = await fetch_owm_data(query, max_wait)
+        if not owm_data:
+            return None
+        result = map_owm_to_internal(owm_data, display_name)
+        await store_weather_entry(key, result)
+        return result
+
+    return await _refresh_flight.do(key, fetch)
+
+def _revalidate_in_background(key: str, query: str, display_name: str):
+    weather_stats.revalidations += 1
+    task = asyncio.ensure_future(refresh_weather(key, query, display_name))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def get_cached_weather(key: str, query: str, display_name: str):
+    """stale-while-revalidate 조회 (값이 없으면 None)"""
+    entry = await read_weather_entry(key)
+    if entry is not None:
+        age = time.time() - entry["fetched_at"]
+        if age <= WEATHER_FRESH_TTL:
+            weather_stats.fresh_hits += 1
+            return entry["data"]
+        if age <= WEATHER_MAX_STALE:
+            weather_stats.stale_hits += 1
+            if key not in _refresh_flight:
+                _revalidate_in_background(key, query, display_name)
+            return entry["data"]
+
+    weather_stats.misses += 1
+    # 사용자가 기다리는 경로이므로 한도에 걸리면 짧게만 대기
+    return await refresh_weather(key, query, display_name, max_wait=OWM_RATE_LIMIT_MAX_WAIT)
 
 # Mock Data for Fallback (Compatibility)
 MOCK_WEATHER_DATA = {
@@ -42,7 +232,8 @@ MOCK_WEATHER_DATA = {
 
 # OpenWeatherMap Settings
 OWM_API_KEY = os.getenv("OWM_API_KEY") # OWM Key
-OWM_BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+# 로컬 스텁(stub_owm_server.py)으로 바꿔 벤치마크할 수 있도록 환경 변수로 지정 가능
+OWM_BASE_URL = os.getenv("OWM_BASE_URL", "http://api.openweathermap.org/data/2.5/weather")
 
 # Province Code to Representative City Mapping (English for OWM API)
 PROVINCE_MAP = {
@@ -86,16 +277,11 @@ PROVINCE_REP_CITY_KR = {
     "50": "제주시"
 }
 
-def fetch_weather_sync(url: str, params: dict):
-    """Sync wrapper for requests"""
-    try:
-        return requests.get(url, params=params, verify=False, timeout=10)
-    except Exception as e:
-        print(f"Requests Error: {e}")
+async def fetch_owm_data(city_name: str, max_wait: float = None):
+    """Fetch weather data from OpenWeatherMap (owm_limiter 분당 한도를 거침, 한도에 걸려 못 부르면 None)"""
+    if not await owm_limiter.acquire(max_wait):
+        logger.warning(f"OWM rate limit reached, skipped {city_name}")
         return None
-
-async def fetch_owm_data(city_name: str):
-    """Fetch weather data from OpenWeatherMap"""
     try:
         params = {
             "q": f"{city_name},KR",
@@ -104,15 +290,21 @@ async def fetch_owm_data(city_name: str):
             "lang": "kr"
         }
         
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, fetch_weather_sync, OWM_BASE_URL, params)
+        weather_stats.owm_calls += 1
+        start_time = time.perf_counter()
+        try:
+            response = await get_weather_http_client().get(OWM_BASE_URL, params=params)
+        finally:
+            weather_stats.owm_seconds += time.perf_counter() - start_time
         
-        if response and response.status_code == 200:
+        if response.status_code == 200:
             return response.json()
         else:
-            logger.error(f"OWM API Error for {city_name}: {response.status_code if response else 'None'}")
+            weather_stats.owm_errors += 1
+            logger.error(f"OWM API Error for {city_name}: {response.status_code}")
             return None
     except Exception as e:
+        weather_stats.owm_errors += 1
         logger.error(f"OWM Exception for {city_name}: {e}")
         return None
 
@@ -176,42 +368,14 @@ async def get_weather_by_city(adm_cd: str, city_name: str) -> Dict[str, Any]:
         adm_cd: Province code (ignored for OWM query, used for cache key)
         city_name: Korean city name (e.g. "수원시", "가평군")
     """
-    # 1. Check Cache
-    if redis_client:
-        try:
-            cache_key = f"weather:owm:{adm_cd}:{city_name}"
-            cached = redis_client.get(cache_key)
-            if cached:
-                # Extend current TTL by 10 minutes on cache hit (sliding window)
-                current_ttl = redis_client.ttl(cache_key)
-                if current_ttl > 0:
-                    redis_client.expire(cache_key, current_ttl + 600)
-                return json.loads(cached)
-        except Exception as e:
-            logger.error(f"Redis Read Error: {e}")
-
-    # 2. Fetch from OWM
+    # Cache (stale-while-revalidate) → 없거나 너무 오래됐으면 OWM에서 조회
     # Need to translate KR city name to Romanized for better OWM accuracy?
     # OWM supports local names but "Suwon-si" is safer than "수원시" sometimes.
     # However, user snippet used "Bucheon,KR".
     # Let's try to remove "시" or "군" for English query if needed, OR use google translate?
     # Actually OWM supports Korean query `q=수원시,KR`. Let's use that.
-    
-    owm_data = await fetch_owm_data(city_name)
-    
-    if owm_data:
-        result = map_owm_to_internal(owm_data, city_name)
-        
-        # Cache
-        if redis_client:
-             try:
-                cache_key = f"weather:owm:{adm_cd}:{city_name}"
-                redis_client.setex(cache_key, 7200, json.dumps(result)) # 2 hour cache
-             except Exception as e:
-                logger.error(f"Redis Write Error: {e}")
-        return result
-    
-    return {}
+    result = await get_cached_weather(weather_cache_key(adm_cd, city_name), city_name, city_name)
+    return result or {}
 
 # Static list of cities per province for dropdown
 PROVINCE_CITY_LIST = {
@@ -234,32 +398,28 @@ PROVINCE_CITY_LIST = {
     "50": ["제주시", "서귀포시"]
 }
 
+# 시/군 선택 목록은 정적 데이터이므로 기동 시 한 번만 계산 (시/도 대표 도시 이름 포함)
+AVAILABLE_CITIES = {
+    adm_cd: sorted(set(cities + [PROVINCE_REP_CITY_KR[adm_cd]]))
+    for adm_cd, cities in PROVINCE_CITY_LIST.items()
+}
+
 async def get_weather_by_adm_cd(adm_cd: str) -> List[Dict[str, Any]]:
     """
     Fetches representative weather for province using OWM map.
     Returns a list containing ONE representative item with weather, 
     PLUS dummy items for other cities to populate the dropdown.
     """
-    if redis_client:
-        try:
-            cache_key = f"weather:owm:{adm_cd}"
-            cached = redis_client.get(cache_key)
-            if cached:
-                return json.loads(cached)
-        except Exception as e:
-            logger.error(f"Redis Read Error: {e}")
-
     # Get representative city
     city_en = PROVINCE_MAP.get(adm_cd, "Seoul")
+    # Use Korean name for display
+    rep_city_kr = PROVINCE_REP_CITY_KR.get(adm_cd, city_en)
     
-    owm_data = await fetch_owm_data(city_en)
+    rep_item = await get_cached_weather(weather_cache_key(adm_cd), city_en, rep_city_kr)
     
     items = []
-    if owm_data:
+    if rep_item:
         # 1. Representative Item (with weather data)
-        # Use Korean name for display
-        rep_city_kr = PROVINCE_REP_CITY_KR.get(adm_cd, city_en)
-        rep_item = map_owm_to_internal(owm_data, rep_city_kr)
         items.append(rep_item)
         
         # 2. Add Dummy items for city list
@@ -277,9 +437,6 @@ async def get_weather_by_adm_cd(adm_cd: str) -> List[Dict[str, Any]]:
                 "SGG_NM": city_ko,
                 # No weather info
             })
-        
-        if redis_client:
-            redis_client.setex(f"weather:owm:{adm_cd}", 7200, json.dumps(items))
             
     return items
 
@@ -292,3 +449,48 @@ def is_city_level_name(name: str) -> bool:
     if not isinstance(name, str): return False
     return True # simplified
 
+def weather_condition(data: dict) -> str:
+    """
+    날씨 데이터 → 추천 조건 (rain | sleet | snow | hot | cold | cloudy | clear, WEATHER_WEIGHTS 키)
+    강수 형태: 0(없음), 1(비), 2(비/눈), 3(눈), 4(소나기), 5(빗방울), 6(빗방울눈날림), 7(눈날림)
+    """
+    try:
+        temp = float(data.get("NOW_AIRTP", 0))    # 기온
+        sky_code = data.get("SKY_STTS", "1")      # 하늘 상태 (1:맑음, 3:구름많음, 4:흐림)
+        rain_type = data.get("PCPTTN_SHP", "0")   # 강수 형태
+    except (TypeError, ValueError):
+        temp, sky_code, rain_type = 20, "1", "0"
+
+    if rain_type in ["1", "4", "5"]:
+        return "rain"
+    if rain_type in ["2", "6"]:
+        return "sleet"
+    if rain_type in ["3", "7"]:
+        return "snow"
+    # 비/눈이 안 올 때 기온 기준
+    if temp >= 28:
+        return "hot"
+    if temp <= 5:
+        return "cold"
+    if sky_code in ["3", "4"]:
+        return "cloudy"
+    return "clear"
+
+def weather_metrics():
+    lookups = weather_stats.fresh_hits + weather_stats.stale_hits + weather_stats.misses
+    return {
+        "fresh_ttl": WEATHER_FRESH_TTL,
+        "max_stale": WEATHER_MAX_STALE,
+        "fresh_hits": weather_stats.fresh_hits,
+        "stale_hits": weather_stats.stale_hits,
+        # OWM 응답을 기다린 요청 수 (0에 가까워야 함)
+        "misses": weather_stats.misses,
+        "hit_rate": round((lookups - weather_stats.misses) / lookups, 4) if lookups else 0.0,
+        "revalidations": weather_stats.revalidations,
+        "cache_errors": weather_stats.cache_errors,
+        "local_entries": len(_local_weather),
+        "owm_calls": weather_stats.owm_calls,
+        "owm_errors": weather_stats.owm_errors,
+        "owm_avg_ms": round(weather_stats.owm_seconds / weather_stats.owm_calls * 1000, 1) if weather_stats.owm_calls else 0.0,
+        "owm_rate_limit": owm_limiter.metrics()
+    }
@@ -0,0 +1,182 @@
+# 날씨 × 지역 추천 행렬 (날씨 갱신 주기마다 Redis에 미리 계산)
+# - /weather/recommend: (시/군, 현재 날씨 조건) → 추천 술 5개
+# - /search/region?weather_sort=true: (도, 날씨 조건) → 날씨 가중치로 정렬한 도 전체 목록
+# - 두 행렬 모두 WEATHER_WEIGHTS 점수를 그대로 사용하고 키에 인덱스 세대를 넣어 ETL 재적재 시 무효화
+# - 다시 계산하는 것은 날씨 조건(또는 날짜)이 바뀐 시/군, 새로 쓰이기 시작한 날씨 조건의 도 목록뿐
+# - 행렬에 없는 요청은 엔드포인트가 한 번 계산해 채움 (read-through)
+import os
+import time
+from datetime import date
+
+from app.api.search import (
+    INDEX_NAME, REGION_REQUEST_CACHE, WEATHER_WEIGHTS,
+    build_region_weather_list, region_matrix_cache, region_matrix_key
+)
+from app.utils.cache import MISSING, TieredCache, get_index_generation
+from app.utils.es_client import es_msearch, es_search, get_async_es_client
+from app.utils.weather import AVAILABLE_CITIES, read_weather_entry, weather_condition, weather_selection_key
+
+RECOMMEND_SIZE = 5
+RECOMMEND_SOURCE = ["drink_id", "name", "image_url", "type"]
+# 행렬 재계산 시 _msearch 한 번에 묶는 시/군 수
+MATRIX_MSEARCH_BATCH = int(os.getenv("WEATHER_MATRIX_MSEARCH_BATCH", 50))
+
+recommend_matrix = TieredCache(
+    "weather:recommend",
+    maxsize=int(os.getenv("WEATHER_MATRIX_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("WEATHER_MATRIX_TTL", 6 * 3600))
+)
+
+class WeatherMatrixState:
+    rebuilds: int = 0
+    hits: int = 0
+    misses: int = 0
+    last_duration: float = None
+    last_active_conditions: list = []
+    last_recommend_updated: int = 0
+    last_recommend_failed: int = 0
+    last_region_built: int = 0
+    last_error: str = None
+
+matrix_state = WeatherMatrixState()
+
+def build_recommend_query(condition: str, seed: str):
+    """
+    날씨 조건별 주종 가중치(WEATHER_WEIGHTS)로 liquor_integrated를 한 번에 점수화합니다.
+      score = 주종 가중치 + 가격 있음(0.5) + 날짜/도시별 고정 난수(0~0.4, 같은 점수끼리 순서 섞기)
+    """
+    weights = WEATHER_WEIGHTS.get(condition, {})
+    functions = [
+        {"filter": {"term": {"type": type_name}}, "weight": weight}
+        for type_name, weight in weights.items()
+    ]
+    functions += [
+        {"filter": {"term": {"has_price": True}}, "weight": 0.5},
+        {"random_score": {"seed": seed, "field": "_seq_no"}, "weight": 0.4}
+    ]
+    query = {"terms": {"type": list(weights)}} if weights else {"match_all": {}}
+    return {
+        "query": {
+            "function_score": {
+                "query": {"bool": {"filter": [query]}},
+                "functions": functions,
+                "score_mode": "sum",
+                "boost_mode": "replace"
+            }
+        },
+        "_source": RECOMMEND_SOURCE,
+        "size": RECOMMEND_SIZE
+    }
+
+def recommend_matrix_key(generation: str, adm_cd: str, city: str) -> str:
+    return f"{generation}:{adm_cd}:{city}"
+
+def _format_recommend_hit(hit: dict):
+    src = hit['_source']
+    return {
+        "id": src.get('drink_id'),
+        "name": src.get('name'),
+        "image_url": src.get('image_url'),
+        "type": src.get('type') or "전통주",
+        "score": hit['_score']
+    }
+
+def _matrix_entry(condition: str, today: str, hits: list):
+    return {"condition": condition, "date": today, "liquors": [_format_recommend_hit(hit) for hit in hits]}
+
+async def get_recommendations(es, adm_cd: str, city: str, condition: str):
+    """(시/군, 날씨 조건) 추천 목록. 행렬 항목이 현재 조건/오늘 날짜와 맞으면 키 조회 한 번으로 응답"""
+    today = date.today().isoformat()
+    key = recommend_matrix_key(await get_index_generation(INDEX_NAME), adm_cd, city)
+    entry = await recommend_matrix.get(key)
+    if entry is not MISSING and entry["condition"] == condition and entry["date"] == today:
+        matrix_state.hits += 1
+        return entry["liquors"]
+
+    matrix_state.misses += 1
+    res = await es_search(es, INDEX_NAME, build_recommend_query(condition, f"{adm_cd}:{city}:{today}"))
+    entry = _matrix_entry(condition, today, res['hits']['hits'])
+    await recommend_matrix.set(key, entry)
+    return entry["liquors"]
+
+async def _region_provinces(es):
+    """지역 검색에 쓰이는 도 이름 목록 (인덱스의 region.province 값)"""
+    res = await es_search(es, INDEX_NAME, {
+        "size": 0,
+        "aggs": {"provinces": {"terms": {"field": "region.province", "size": 100}}}
+    }, request_cache=REGION_REQUEST_CACHE)
+    return [bucket["key"] for bucket in res["aggregations"]["provinces"]["buckets"]]
+
+async def rebuild_weather_matrix():
+    """캐시된 날씨로 시/군별 조건을 다시 계산하고, 바뀐 항목만 행렬에 반영합니다. (날씨 prefetch 주기 끝에 실행)"""
+    es = get_async_es_client()
+    if not es:
+        return
+
+    start_time = time.perf_counter()
+    today = date.today().isoformat()
+    generation = await get_index_generation(INDEX_NAME)
+    stale, active = [], set()
+
+    for adm_cd, cities in AVAILABLE_CITIES.items():
+        for city in cities:
+            entry = await read_weather_entry(weather_selection_key(adm_cd, city))
+            if entry is None:
+                continue
+            condition = weather_condition(entry["data"])
+            active.add(condition)
+            cached = await recommend_matrix.get(recommend_matrix_key(generation, adm_cd, city))
+            if cached is MISSING or cached["condition"] != condition or cached["date"] != today:
+                stale.append((adm_cd, city, condition))
+
+    updated, failed = 0, 0
+    for offset in range(0, len(stale), MATRIX_MSEARCH_BATCH):
+        batch = stale[offset:offset + MATRIX_MSEARCH_BATCH]
+        response = await es_msearch(es, INDEX_NAME, [
+            build_recommend_query(condition, f"{adm_cd}:{city}:{today}") for adm_cd, city, condition in batch
+        ])
+        for (adm_cd, city, condition), item in zip(batch, response["responses"]):
+            if "error" in item:
+                failed += 1
+                continue
+            await recommend_matrix.set(
+                recommend_matrix_key(generation, adm_cd, city),
+                _matrix_entry(condition, today, item["hits"]["hits"])
+            )
+            updated += 1
+
+    # 지역 목록은 도시 날씨와 무관하게 (도, 조건)으로 정해지므로 현재 쓰이는 조건만 채움
+    region_built = 0
+    if active:
+        for province in await _region_provinces(es):
+            for condition in sorted(active):
+                key = region_matrix_key(generation, province, condition)
+                if await region_matrix_cache.get(key) is MISSING:
+                    await region_matrix_cache.set(key, await build_region_weather_list(es, province, condition))
+                    region_built += 1
+
+    matrix_state.rebuilds += 1
+    matrix_state.last_duration = time.perf_counter() - start_time
+    matrix_state.last_active_conditions = sorted(active)
+    matrix_state.last_recommend_updated = updated
+    matrix_state.last_recommend_failed = failed
+    matrix_state.last_region_built = region_built
+    print(f"🗺️ Weather matrix: recommend updated={updated}, failed={failed}, region built={region_built} "
+          f"({matrix_state.last_duration:.2f}s)")
+
+def weather_matrix_metrics():
+    lookups = matrix_state.hits + matrix_state.misses
+    return {
+        "rebuilds": matrix_state.rebuilds,
+        "last_duration": round(matrix_state.last_duration, 2) if matrix_state.last_duration is not None else None,
+        "last_active_conditions": matrix_state.last_active_conditions,
+        "last_recommend_updated": matrix_state.last_recommend_updated,
+        "last_recommend_failed": matrix_state.last_recommend_failed,
+        "last_region_built": matrix_state.last_region_built,
+        "last_error": matrix_state.last_error,
+        "recommend_hits": matrix_state.hits,
+        "recommend_misses": matrix_state.misses,
+        "recommend_hit_rate": round(matrix_state.hits / lookups, 4) if lookups else 0.0,
+        "recommend_cache": recommend_matrix.metrics(),
+        "region_cache": region_matrix_cache.metrics()
+    }
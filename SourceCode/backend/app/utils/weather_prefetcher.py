@@ -0,0 +1,160 @@
+# PROVINCE_CITY_LIST 전체 시/군(+ 시/도 대표 도시) 날씨를 주기적으로 미리 받아두는 백그라운드 작업
+# - OWM 호출은 모두 weather.owm_limiter(분당 OWM_RATE_LIMIT_PER_MIN회, Redis로 전 프로세스 공유)를 거침
+#   → 사용자 miss/백그라운드 갱신과 합쳐도 한도를 넘지 않고, 한도가 차면 다음 분까지 대기
+# - OWM_PREFETCH_CONCURRENCY개씩 동시 호출
+# - 여러 워커/컨테이너가 떠 있어도 Redis 락으로 한 주기에 한 프로세스만 실행
+#   (락을 잡지 못하면 - Redis 없음/오류 포함 - 그 주기는 건너뜀)
+# - 최근에 사용자 요청으로 갱신된 항목(주기의 절반 이내)은 건너뜀
+# - 주기가 끝나면 날씨 × 지역 추천 행렬(weather_matrix)을 바뀐 항목만 다시 계산
+import asyncio
+import os
+import time
+
+from app.db.redisdb import get_redis
+from app.utils.weather import (
+    OWM_API_KEY, OWM_BASE_URL, OWM_RATE_LIMIT_PER_MIN, PROVINCE_CITY_LIST, PROVINCE_MAP, PROVINCE_REP_CITY_KR,
+    read_weather_entry, refresh_weather, weather_cache_key
+)
+from app.utils.weather_matrix import matrix_state, rebuild_weather_matrix
+
+WEATHER_PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH", "true").lower() == "true"
+WEATHER_PREFETCH_INTERVAL = float(os.getenv("WEATHER_PREFETCH_INTERVAL", 1800))
+OWM_PREFETCH_CONCURRENCY = int(os.getenv("OWM_PREFETCH_CONCURRENCY", 5))
+PREFETCH_LOCK_KEY = "weather:prefetch:lock"
+
+def prefetch_targets():
+    """(캐시 키, OWM 질의, 표시 이름) 목록: 시/도 대표 도시 + 모든 시/군"""
+    targets = []
+    for adm_cd, city_en in PROVINCE_MAP.items():
+        targets.append((weather_cache_key(adm_cd), city_en, PROVINCE_REP_CITY_KR.get(adm_cd, city_en)))
+    for adm_cd, cities in PROVINCE_CITY_LIST.items():
+        for city in cities:
+            targets.append((weather_cache_key(adm_cd, city), city, city))
+    return targets
+
+class WeatherPrefetchState:
+    cycles: int = 0
+    skipped_cycles: int = 0
+    running: bool = False
+    last_started_at: float = None
+    last_duration: float = None
+    last_fetched: int = 0
+    last_fresh: int = 0
+    last_failed: int = 0
+    last_error: str = None
+
+prefetch_state = WeatherPrefetchState()
+_prefetch_task: asyncio.Task = None
+
+async def _acquire_cycle_lock() -> bool:
+    """
+    주기 락. Redis가 없거나 오류면 다른 워커가 이미 실행 중인지 알 수 없으므로 False (그 주기는 건너뜀).
+    사용자 요청 경로의 stale-while-revalidate 갱신은 계속 동작함
+    """
+    redis = get_redis()
+    if not redis:
+        prefetch_state.last_error = "redis unavailable: cycle lock not acquired"
+        return False
+    try:
+        # 다음 주기 직전까지 유지 (주기 중 프로세스가 죽어도 다음 주기에는 다른 프로세스가 실행)
+        return bool(await redis.set(PREFETCH_LOCK_KEY, str(os.getpid()), nx=True, ex=max(60, int(WEATHER_PREFETCH_INTERVAL * 0.9))))
+    except Exception as e:
+        prefetch_state.last_error = f"cycle lock error: {e}"
+        print(f"⚠️ Weather prefetch lock error (skipping cycle): {e}")
+        return False
+
+async def run_prefetch_cycle(use_lock: bool = True):
+    """use_lock=False는 단일 프로세스 벤치마크용 (앱의 prefetch 루프는 항상 락을 잡음)"""
+    if use_lock and not await _acquire_cycle_lock():
+        prefetch_state.skipped_cycles += 1
+        return False
+
+    prefetch_state.running = True
+    prefetch_state.last_started_at = time.time()
+    start_time = time.perf_counter()
+    fetched, fresh, failed = 0, 0, 0
+
+    try:
+        pending = []
+        for key, query, display_name in prefetch_targets():
+            entry = await read_weather_entry(key)
+            if entry and time.time() - entry["fetched_at"] < WEATHER_PREFETCH_INTERVAL / 2:
+                fresh += 1
+            else:
+                pending.append((key, query, display_name))
+
+        semaphore = asyncio.Semaphore(OWM_PREFETCH_CONCURRENCY)
+
+        async def refresh(target):
+            async with semaphore:
+                return await refresh_weather(*target)
+
+        # 분당 한도는 fetch_owm_data의 owm_limiter가 지킴 (한도가 차면 다음 분까지 대기)
+        results = await asyncio.gather(*(refresh(target) for target in pending), return_exceptions=True)
+        for result in results:
+            if result and not isinstance(result, Exception):
+                fetched += 1
+            else:
+                failed += 1
+    finally:
+        prefetch_state.running = False
+        prefetch_state.cycles += 1
+        prefetch_state.last_duration = time.perf_counter() - start_time
+        prefetch_state.last_fetched = fetched
+        prefetch_state.last_fresh = fresh
+        prefetch_state.last_failed = failed
+
+    print(f"🌦️ Weather prefetch: fetched={fetched}, fresh={fresh}, failed={failed} ({prefetch_state.last_duration:.1f}s)")
+    prefetch_state.last_error = None
+
+    try:
+        await rebuild_weather_matrix()
+        matrix_state.last_error = None
+    except Exception as e:
+        matrix_state.last_error = str(e)
+        print(f"⚠️ Weather matrix rebuild failed: {e}")
+    return True
+
+async def _prefetch_loop():
+    while True:
+        try:
+            await run_prefetch_cycle()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            prefetch_state.last_error = str(e)
+            print(f"⚠️ Weather prefetch failed: {e}")
+        await asyncio.sleep(WEATHER_PREFETCH_INTERVAL)
+
+async def start_weather_prefetcher():
+    global _prefetch_task
+    if not WEATHER_PREFETCH_ENABLED:
+        return
+    if not OWM_API_KEY and "openweathermap.org" in OWM_BASE_URL:
+        print("ℹ️ OWM_API_KEY not set: weather prefetcher disabled")
+        return
+    # 첫 주기는 기동을 막지 않도록 백그라운드에서 바로 시작
+    _prefetch_task = asyncio.create_task(_prefetch_loop())
+
+async def stop_weather_prefetcher():
+    global _prefetch_task
+    if _prefetch_task:
+        _prefetch_task.cancel()
+        _prefetch_task = None
+
+def weather_prefetch_metrics():
+    return {
+        "enabled": _prefetch_task is not None,
+        "interval": WEATHER_PREFETCH_INTERVAL,
+        "rate_limit_per_min": OWM_RATE_LIMIT_PER_MIN,
+        "targets": len(prefetch_targets()),
+        "cycles": prefetch_state.cycles,
+        "skipped_cycles": prefetch_state.skipped_cycles,
+        "running": prefetch_state.running,
+        "last_started_at": prefetch_state.last_started_at,
+        "last_duration": round(prefetch_state.last_duration, 2) if prefetch_state.last_duration is not None else None,
+        "last_fetched": prefetch_state.last_fetched,
+        "last_fresh": prefetch_state.last_fresh,
+        "last_failed": prefetch_state.last_failed,
+        "last_error": prefetch_state.last_error
+    }
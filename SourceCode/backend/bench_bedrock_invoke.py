@@ -0,0 +1,96 @@
+"""
+Bedrock 호출 방식 벤치마크 (stub_bedrock_server.py 대상)
+
+  - per_call: 기존 invoke_nova 방식. 호출마다 boto3.Session + bedrock-runtime 클라이언트를 만들고
+              이벤트 루프 안에서 동기 invoke_model 실행 (다른 요청이 모두 막힘)
+  - gateway:  app/utils/llm_gateway.invoke_bedrock. 공유 클라이언트 + 제한된 스레드 풀
+
+동시 요청 수(--concurrency)만큼 채팅 요청을 보냈을 때의 처리량과 지연 분포를 비교합니다.
+
+사용법:
+    python stub_bedrock_server.py --latency 0.5 &
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8787 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub \\
+        python bench_bedrock_invoke.py --requests 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import boto3
+
+from app.utils.llm_gateway import LLM_LIMITS, close_bedrock_executor, invoke_bedrock, llm_metrics
+
+MODEL_ID = "amazon.nova-lite-v1:0"
+
+
+def make_body(i):
+    return {
+        "system": [{"text": "당신은 전통주 소믈리에입니다."}],
+        "messages": [{"role": "user", "content": [{"text": f"여름에 어울리는 막걸리 추천해줘 #{i}"}]}],
+        "inferenceConfig": {"maxTokens": 1000, "temperature": 0.7, "topP": 0.9}
+    }
+
+
+async def per_call(i):
+    session = boto3.Session(
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION", "us-east-1")
+    )
+    bedrock = session.client(service_name='bedrock-runtime', endpoint_url=os.getenv("BEDROCK_ENDPOINT_URL"))
+    response = bedrock.invoke_model(modelId=MODEL_ID, body=json.dumps(make_body(i)))
+    return json.loads(response['body'].read())
+
+
+async def gateway(i):
+    return await invoke_bedrock(MODEL_ID, make_body(i), label="bench")
+
+
+async def run(fn, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1]
+    }
+
+
+async def main(requests, concurrency):
+    if not os.getenv("BEDROCK_ENDPOINT_URL"):
+        print("❌ BEDROCK_ENDPOINT_URL이 없습니다. stub_bedrock_server.py 주소를 지정하세요.")
+        return
+
+    print(f"🚀 requests={requests}, concurrency={concurrency}, bedrock pool={LLM_LIMITS['bedrock']}")
+    print(f"{'mode':>10} {'elapsed(s)':>11} {'req/s':>8} {'p50(s)':>8} {'p95(s)':>8}")
+    results = {}
+    for name, fn in (("per_call", per_call), ("gateway", gateway)):
+        results[name] = r = await run(fn, requests, concurrency)
+        print(f"{name:>10} {r['elapsed']:>11.2f} {r['rps']:>8.1f} {r['p50']:>8.3f} {r['p95']:>8.3f}")
+
+    print(f"📈 throughput x{results['gateway']['rps'] / results['per_call']['rps']:.1f}")
+    print(f"📊 gateway metrics: {json.dumps(llm_metrics()['bedrock']['latency_seconds'])}")
+    close_bedrock_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
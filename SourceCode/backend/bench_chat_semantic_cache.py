@@ -0,0 +1,71 @@
+"""
+챗봇 유사 질문 캐시 벤치마크
+
+캐시 항목 수를 늘려가며 SemanticCache.get의 조회 비용(µs)을 측정하고,
+같은 뜻의 질문 변형(띄어쓰기/조사/문장부호)이 hit, 다른 술을 묻는 질문이 miss 되는지 확인합니다.
+
+사용법:
+    python bench_chat_semantic_cache.py --sizes 100 1000 10000 --threshold 0.75
+"""
+import argparse
+import random
+import time
+
+from app.utils.cache import MISSING
+from app.utils.semantic_cache import SemanticCache
+
+TOPICS = ["막걸리", "소주", "약주", "청주", "과실주", "증류주", "탁주", "복분자주"]
+SITUATIONS = ["비 오는 날", "캠핑 가서", "집들이 선물로", "회식 자리에서", "더운 여름에", "추운 겨울밤에", "생일 파티에", "혼술할 때"]
+FOODS = ["파전", "삼겹살", "회", "치킨", "보쌈", "떡볶이", "과일", "전"]
+
+# (캐시에 저장된 질문, 조회 질문, 기대 결과)
+PARAPHRASES = [
+    ("비 오는 날 어울리는 막걸리?", "비오는 날 어울리는 막걸리", True),
+    ("비 오는 날 어울리는 막걸리?", "비 오는 날에 어울리는 막걸리!", True),
+    ("고기랑 먹을 만한 증류주 추천해줘", "고기랑 먹을만한 증류주 추천해 줘", True),
+    ("비 오는 날 어울리는 막걸리?", "비 오는 날 어울리는 소주?", False),
+    ("고기랑 먹을 만한 증류주 추천해줘", "고기랑 먹을 만한 막걸리 추천해줘", False),
+]
+
+
+def make_questions(n):
+    rng = random.Random(42)
+    return [
+        f"{rng.choice(SITUATIONS)} {rng.choice(FOODS)}랑 먹을 {rng.choice(TOPICS)} 추천해줘 {i}"
+        for i in range(n)
+    ]
+
+
+def main(sizes, threshold, iterations):
+    print(f"{'entries':>8} {'hit get (µs)':>13} {'miss get (µs)':>14}")
+    for n in sizes:
+        cache = SemanticCache("bench", maxsize=n, threshold=threshold)
+        questions = make_questions(n)
+        for q in questions:
+            cache.set(q, {"answer": q, "drinks": []})
+        start = time.perf_counter()
+        for i in range(iterations):
+            cache.get(questions[i % n] + "?")
+        hit_us = (time.perf_counter() - start) / iterations * 1_000_000
+        start = time.perf_counter()
+        for i in range(iterations):
+            cache.get(f"전혀 상관없는 질문 {i}")
+        miss_us = (time.perf_counter() - start) / iterations * 1_000_000
+        print(f"{n:>8} {hit_us:>13.1f} {miss_us:>14.1f}")
+
+    print("-" * 40)
+    for stored, query, expected in PARAPHRASES:
+        cache = SemanticCache("bench", threshold=threshold)
+        cache.set(stored, {"answer": stored, "drinks": []})
+        hit = cache.get(query) is not MISSING
+        mark = "✅" if hit == expected else "❌"
+        print(f"{mark} {'hit ' if hit else 'miss'} {stored!r} ← {query!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.sizes, args.threshold, args.iterations)
@@ -0,0 +1,60 @@
+"""
+챗봇 스트리밍 첫 바이트 시간 벤치마크 (stub_bedrock_server.py 대상)
+
+  - invoke: invoke_nova. 답변 전체가 생성된 뒤에야 응답 가능
+  - stream: stream_nova(SSE). drinks 이벤트 → 첫 delta(모델 첫 토큰) → done
+각 방식의 첫 답변 텍스트까지 걸린 시간과 전체 완료 시간을 비교합니다.
+(ES 검색은 제외하고 drinks는 빈 목록으로 호출)
+
+사용법:
+    python stub_bedrock_server.py --latency 0.3 --tokens 60 --token-interval 0.03 &
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8787 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub \\
+        python bench_chat_stream.py --requests 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from app.api.chatbot import build_chat_prompt, invoke_nova, stream_nova
+from app.utils.llm_gateway import close_bedrock_executor
+
+MESSAGE = "비 오는 날 파전이랑 먹을 막걸리 추천해줘"
+
+
+async def measure_invoke():
+    start = time.perf_counter()
+    await invoke_nova(build_chat_prompt([]), MESSAGE)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def measure_stream():
+    start = time.perf_counter()
+    first_text = None
+    async for event in stream_nova(build_chat_prompt([]), MESSAGE, []):
+        if first_text is None and event.startswith("event: delta"):
+            first_text = time.perf_counter() - start
+    return first_text, time.perf_counter() - start
+
+
+async def main(requests):
+    if not os.getenv("BEDROCK_ENDPOINT_URL"):
+        print("❌ BEDROCK_ENDPOINT_URL이 없습니다. stub_bedrock_server.py 주소를 지정하세요.")
+        return
+
+    print(f"{'mode':>8} {'first text p50(s)':>18} {'total p50(s)':>13}")
+    for name, fn in (("invoke", measure_invoke), ("stream", measure_stream)):
+        results = [await fn() for _ in range(requests)]
+        first = statistics.median(r[0] for r in results)
+        total = statistics.median(r[1] for r in results)
+        print(f"{name:>8} {first:>18.3f} {total:>13.3f}")
+    close_bedrock_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,125 @@
+"""
+랜덤 칵테일 샘플링 벤치마크
+
+cocktail_info 행 수를 늘려가며(현재 55건 → 수만 건 import 예정) 1회 호출 비용을 비교합니다.
+  - sampler:     메모리 배열 + 부분 Fisher–Yates (app/utils/cocktail_sampler.py)
+  - python sort: 전체 행에 난수를 붙여 정렬 후 LIMIT (프로세스 안에서 흉내낸 정렬 비용만,
+                 DB 스캔/네트워크 왕복은 포함하지 않으므로 실제 개선 폭의 하한)
+  - SQL RAND():  --mariadb 지정 시, 교체 전 엔드포인트가 실행하던 쿼리
+                 "SELECT ... FROM cocktail_info ORDER BY RAND() LIMIT %s"를 MariaDB에서 그대로 실행
+                 (같은 컬럼의 임시 테이블(TEMPORARY TABLE)에 행을 채워 측정하므로 운영 데이터는 건드리지 않음,
+                  실제 cocktail_info 현재 크기에 대한 측정도 함께 출력)
+sampler는 행 수와 무관하게 일정해야 합니다.
+
+사용법:
+    python bench_cocktail_sampling.py --sizes 55 1000 10000 50000 --limit 10
+    python bench_cocktail_sampling.py --mariadb --sql-iterations 20
+"""
+import argparse
+import random
+import time
+
+from app.utils.cocktail_sampler import CocktailSampler
+
+# 교체 전 /cocktail/random이 실행하던 쿼리 (app/api/cocktail.py의 fallback과 동일)
+ORDER_BY_RAND_SQL = (
+    "SELECT cocktail_id, cocktail_title, cocktail_image_url, cocktail_homepage_url "
+    "FROM {table} ORDER BY RAND() LIMIT %s"
+)
+BENCH_TABLE = "bench_cocktail_info"
+
+
+def make_rows(n):
+    return [
+        {
+            "cocktail_id": i,
+            "cocktail_title": f"cocktail-{i}",
+            "cocktail_image_url": f"https://example.com/{i}.jpg",
+            "cocktail_homepage_url": None
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def python_sort(rows, limit):
+    return sorted(rows, key=lambda _: random.random())[:limit]
+
+
+def measure(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def fill_bench_table(cursor, rows):
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {BENCH_TABLE}")
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE {BENCH_TABLE} (
+            cocktail_id INT PRIMARY KEY,
+            cocktail_title VARCHAR(255),
+            cocktail_image_url VARCHAR(512),
+            cocktail_homepage_url VARCHAR(512)
+        )
+    """)
+    cursor.executemany(
+        f"INSERT INTO {BENCH_TABLE} VALUES (%s, %s, %s, %s)",
+        [(r["cocktail_id"], r["cocktail_title"], r["cocktail_image_url"], r["cocktail_homepage_url"]) for r in rows]
+    )
+
+
+def sql_order_by_rand_us(cursor, table, limit, iterations):
+    sql = ORDER_BY_RAND_SQL.format(table=table)
+    return measure(lambda: (cursor.execute(sql, (limit,)), cursor.fetchall()), iterations)
+
+
+def main(sizes, limit, iterations, use_mariadb, sql_iterations):
+    conn = None
+    if use_mariadb:
+        from app.db.mariadb import get_mariadb_conn
+        conn = get_mariadb_conn()
+        if conn is None:
+            print("❌ MariaDB 연결 실패: SQL RAND() 열은 생략합니다.")
+
+    header = f"{'rows':>8} {'sampler (µs)':>14} {'python sort (µs)':>17}"
+    if conn:
+        header += f" {'SQL RAND() (µs)':>16} {'vs SQL':>8}"
+    print(f"{header}  (limit={limit})")
+
+    for n in sizes:
+        rows = make_rows(n)
+        sampler = CocktailSampler(rows, (n, n))
+        sample_us = measure(lambda: sampler.sample(limit), iterations)
+        sort_us = measure(lambda: python_sort(rows, limit), max(1, iterations // 100))
+        line = f"{n:>8} {sample_us:>14.2f} {sort_us:>17.1f}"
+        if conn:
+            with conn.cursor() as cursor:
+                fill_bench_table(cursor, rows)
+                sql_us = sql_order_by_rand_us(cursor, BENCH_TABLE, limit, sql_iterations)
+            line += f" {sql_us:>16.1f} {sql_us / sample_us:>7.0f}x"
+        print(line)
+
+    if conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS n FROM cocktail_info")
+            count = cursor.fetchone()["n"]
+            sql_us = sql_order_by_rand_us(cursor, "cocktail_info", limit, sql_iterations)
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {BENCH_TABLE}")
+        print(f"실제 cocktail_info ({count}건) ORDER BY RAND(): {sql_us:.1f} µs/호출")
+        conn.close()
+
+    # seed 재현성 확인
+    sampler = CocktailSampler(make_rows(1000), (1000, 1000))
+    assert sampler.sample(limit, seed=42) == sampler.sample(limit, seed=42)
+    print("✅ seed 지정 시 동일한 결과 재현")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[55, 1000, 10000, 50000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--mariadb", action="store_true", help="교체 전 ORDER BY RAND() 쿼리를 MariaDB에서 실행해 비교")
+    parser.add_argument("--sql-iterations", type=int, default=20)
+    args = parser.parse_args()
+    main(args.sizes, args.limit, args.iterations, args.mariadb, args.sql_iterations)
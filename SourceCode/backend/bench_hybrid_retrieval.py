@@ -0,0 +1,168 @@
+"""
+BM25 vs BM25 + kNN(RRF) 하이브리드 검색 재현율 / 지연 시간 벤치마크
+
+1) 챗봇 RAG (search_liquor_for_rag 쿼리)
+   상황/분위기 질문마다 정답 조건(안주·설명·종류에 특정 단어 포함)을 두고,
+   상위 5개 중 조건을 만족하는 문서 비율(precision@5)과
+   pooled recall@5 (두 방식이 찾은 관련 문서 합집합 대비 비율)을 비교
+2) 비슷한 술 (/search/similar)
+   카탈로그에서 뽑은 기준 술마다 상위 6개 중 같은 종류(type)의 비율을 비교
+   (BM25는 이름 철자만 보므로 '비슷한 철자'가 아닌 '비슷한 술'을 얼마나 찾는지 확인)
+
+임베딩 모델(sentence-transformers)과 ETL로 색인된 embedding 필드가 필요합니다.
+
+사용법:
+    python bench_hybrid_retrieval.py --seeds 50 --repeat 3
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv('/app/backend.env')
+
+from app.api.chatbot import RAG_MIN_SIMILARITY, RAG_SIZE, RAG_SOURCE, build_rag_query
+from app.api.search import (
+    INDEX_NAME, SIMILAR_MIN_SIMILARITY, SIMILAR_SIZE, SIMILAR_SOURCE, _build_similar_query
+)
+from app.utils.catalog import get_catalog, load_catalog_snapshot
+from app.utils.embeddings import (
+    document_embedding_text, embed_query, embeddings_available, get_embedding_model
+)
+from app.utils.es_client import close_es_connection, connect_to_es, es_search, get_async_es_client
+from app.utils.hybrid_search import hybrid_search
+
+# (질문, 정답 판정 단어) — 안주/소개/설명/종류 중 하나에 단어가 있으면 관련 문서
+RAG_QUESTIONS = [
+    ("비 오는 날 부침개랑 마실 술", ["파전", "전", "막걸리"]),
+    ("기름진 고기 요리에 곁들일 깔끔한 술", ["고기", "삼겹살", "육류", "갈비", "증류주"]),
+    ("회나 해산물이랑 어울리는 술", ["회", "해산물", "생선", "청주"]),
+    ("달콤하고 과일향이 나는 술", ["과실", "과일", "달콤", "단맛"]),
+    ("선물용으로 좋은 고급스러운 술", ["선물", "명인", "숙성", "증류주"]),
+    ("톡 쏘는 탄산이 있는 시원한 술", ["탄산", "스파클링", "청량"]),
+    ("도수가 높고 묵직한 술", ["증류주", "고도수", "묵직"]),
+    ("디저트랑 먹기 좋은 술", ["디저트", "케이크", "과일", "달콤"]),
+    ("매운 음식이랑 먹을 술", ["매운", "떡볶이", "찌개", "막걸리"]),
+    ("꽃향기가 나는 전통주", ["꽃", "국화", "진달래", "향"]),
+]
+
+
+def is_relevant(source, words):
+    haystack = " ".join([
+        source.get("type") or "", source.get("intro") or "", source.get("description") or "",
+        " ".join(source.get("foods") or [])
+    ])
+    return any(word in haystack for word in words)
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def rag_lexical(es, question):
+    response = await es_search(es, INDEX_NAME, build_rag_query(question))
+    return response["hits"]["hits"]
+
+
+async def rag_hybrid(es, question):
+    vector = await embed_query(question)
+    return await hybrid_search(
+        es, INDEX_NAME, build_rag_query(question), vector, RAG_SIZE, RAG_SOURCE, similarity=RAG_MIN_SIMILARITY
+    )
+
+
+async def similar_lexical(es, seed):
+    body = {**_build_similar_query(seed["name"], seed["drink_id"]), "_source": SIMILAR_SOURCE + ["type"]}
+    response = await es_search(es, INDEX_NAME, body)
+    return response["hits"]["hits"]
+
+
+async def similar_hybrid(es, seed):
+    vector = await embed_query(document_embedding_text(seed), passage=True)
+    knn_filter = {"bool": {"must_not": [{"term": {"drink_id": seed["drink_id"]}}]}}
+    return await hybrid_search(
+        es, INDEX_NAME, _build_similar_query(seed["name"], seed["drink_id"]), vector, SIMILAR_SIZE,
+        SIMILAR_SOURCE + ["type"], filter=knn_filter, similarity=SIMILAR_MIN_SIMILARITY
+    )
+
+
+def report(title, rows):
+    print(f"\n{title}")
+    print(f"{'mode':>8} {'same-type':>10} {'results':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, quality, counts, latencies in rows:
+        latencies = sorted(latencies)
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        print(f"{mode:>8} {statistics.mean(quality):>10.3f} {statistics.mean(counts):>8.2f} "
+              f"{statistics.median(latencies):>8.1f} {p95:>8.1f}")
+
+
+async def main(seeds, repeat):
+    if not embeddings_available():
+        print("❌ sentence-transformers가 설치되어 있지 않습니다. (pip install sentence-transformers)")
+        return
+    get_embedding_model()
+
+    await connect_to_es()
+    try:
+        es = get_async_es_client()
+        if not es:
+            print("❌ Elasticsearch 연결 실패")
+            return
+        await load_catalog_snapshot()
+        catalog = get_catalog()
+
+        # 1) RAG
+        results = {"bm25": {}, "hybrid": {}}
+        latencies = {"bm25": [], "hybrid": []}
+        for mode, fn in (("bm25", rag_lexical), ("hybrid", rag_hybrid)):
+            for question, words in RAG_QUESTIONS:
+                for _ in range(repeat):
+                    hits, ms = await timed(fn(es, question))
+                    latencies[mode].append(ms)
+                results[mode][question] = {hit["_id"] for hit in hits if is_relevant(hit["_source"], words)}, len(hits)
+
+        print(f"\n🍶 Chatbot RAG (k={RAG_SIZE})")
+        print(f"{'mode':>8} {'precision':>10} {'recall':>8} {'results':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for mode in ("bm25", "hybrid"):
+            precision, recall, counts = [], [], []
+            for question, _ in RAG_QUESTIONS:
+                relevant, count = results[mode][question]
+                pool = results["bm25"][question][0] | results["hybrid"][question][0]
+                precision.append(len(relevant) / RAG_SIZE)
+                recall.append(len(relevant) / len(pool) if pool else 0.0)
+                counts.append(count)
+            ms = sorted(latencies[mode])
+            print(f"{mode:>8} {statistics.mean(precision):>10.3f} {statistics.mean(recall):>8.3f} "
+                  f"{statistics.mean(counts):>8.2f} {statistics.median(ms):>8.1f} {ms[max(0, int(len(ms) * 0.95) - 1)]:>8.1f}")
+
+        # 2) similar: 같은 종류 비율
+        if catalog:
+            rng = random.Random(7)
+            seed_docs = rng.sample(catalog.sources, min(seeds, len(catalog.sources)))
+            rows = []
+            for mode, fn in (("bm25", similar_lexical), ("hybrid", similar_hybrid)):
+                quality, counts, latencies = [], [], []
+                for seed in seed_docs:
+                    for _ in range(repeat):
+                        hits, ms = await timed(fn(es, seed))
+                        latencies.append(ms)
+                    same = sum(hit["_source"].get("type") == seed.get("type") for hit in hits)
+                    quality.append(same / SIMILAR_SIZE)
+                    counts.append(len(hits))
+                rows.append((mode, quality, counts, latencies))
+            report(f"🔁 Similar drinks — same-type@{SIMILAR_SIZE}", rows)
+    finally:
+        await close_es_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seeds", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.seeds, args.repeat))
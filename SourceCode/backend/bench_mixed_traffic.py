@@ -0,0 +1,150 @@
+"""
+혼합 트래픽 부하 벤치마크 (검색 + 노트/게시판)
+
+무거운 /search/region?size=1000 요청과 가벼운 /notes, /board 요청을 동시에 보내
+엔드포인트별 p50/p95/p99 지연시간을 측정합니다.
+이벤트 루프가 ES 호출로 블로킹되면 가벼운 요청의 p99가 크게 튀는 것을 확인할 수 있습니다.
+
+사용법:
+    # 변경 전 서버 측정
+    python bench_mixed_traffic.py --base-url http://localhost:8000 --label before --output before.json
+    # 변경 후 서버 측정
+    python bench_mixed_traffic.py --base-url http://localhost:8000 --label after --output after.json
+    # 비교
+    python bench_mixed_traffic.py --compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+# (이름, 경로, 가중치)
+TRAFFIC_MIX = [
+    ("region", "/search/region?province=경기도&size=1000", 2),
+    ("region_weather", "/search/region?province=강원도&weather_sort=true&weather_condition=rain&size=1000", 1),
+    ("region_stream", "/search/region/stream?province=경기도", 1),
+    ("fuzzy", None, 2),
+    ("notes", "/notes/user/bench-user", 3),
+    ("board", "/board/", 3),
+]
+
+FUZZY_QUERIES = ["백세주", "안동소주", "감홍로", "막걸리", "문배주", "이화주"]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(values) - 1)
+    return values[f] + (values[c] - values[f]) * (k - f)
+
+
+async def worker(client, deadline, latencies, errors):
+    names = [name for name, _, _ in TRAFFIC_MIX]
+    weights = [w for _, _, w in TRAFFIC_MIX]
+    paths = {name: path for name, path, _ in TRAFFIC_MIX}
+
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights=weights)[0]
+        start = time.perf_counter()
+        try:
+            if name == "fuzzy":
+                response = await client.post("/search", json={"query": random.choice(FUZZY_QUERIES)})
+            else:
+                response = await client.get(paths[name])
+            if response.status_code >= 500:
+                errors[name] = errors.get(name, 0) + 1
+        except httpx.HTTPError:
+            errors[name] = errors.get(name, 0) + 1
+        latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+
+async def run(base_url, concurrency, duration):
+    latencies, errors = {}, {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, deadline, latencies, errors) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def summarize(latencies, errors):
+    summary = {}
+    all_values = []
+    for name, values in latencies.items():
+        all_values.extend(values)
+        summary[name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "p50": round(percentile(values, 50), 1),
+            "p95": round(percentile(values, 95), 1),
+            "p99": round(percentile(values, 99), 1),
+        }
+    summary["all"] = {
+        "count": len(all_values),
+        "errors": sum(errors.values()),
+        "p50": round(percentile(all_values, 50), 1),
+        "p95": round(percentile(all_values, 95), 1),
+        "p99": round(percentile(all_values, 99), 1),
+    }
+    return summary
+
+
+def print_summary(label, summary):
+    print("=" * 60)
+    print(f"📊 {label}")
+    print(f"{'endpoint':<16}{'count':>8}{'err':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for name, s in summary.items():
+        print(f"{name:<16}{s['count']:>8}{s['errors']:>6}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}")
+    print("=" * 60)
+
+
+def compare(before_path, after_path):
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)["summary"]
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)["summary"]
+
+    print("=" * 60)
+    print("📈 p99 비교 (before → after)")
+    for name in before:
+        if name not in after:
+            continue
+        b, a = before[name]["p99"], after[name]["p99"]
+        change = ((a - b) / b * 100) if b else 0.0
+        print(f"  {name:<16}{b:>10} → {a:<10} ({change:+.1f}%)")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed traffic load benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    print(f"🚀 {args.base_url} 에 {args.concurrency}개 동시 요청으로 {args.duration:.0f}초간 부하 테스트")
+    latencies, errors = asyncio.run(run(args.base_url, args.concurrency, args.duration))
+    summary = summarize(latencies, errors)
+    print_summary(args.label, summary)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"label": args.label, "summary": summary}, f, ensure_ascii=False, indent=2)
+        print(f"💾 Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
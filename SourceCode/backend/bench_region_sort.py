@@ -0,0 +1,89 @@
+"""
+지역 검색 정렬 벤치마크: Painless 스크립트 정렬 vs 색인 필드(price_tier) 정렬
+
+같은 지역 쿼리를 두 가지 정렬로 반복 실행해 ES 내부 처리 시간(took)과
+클라이언트 왕복 시간의 p50/p95/p99를 비교합니다. (etl_integrated.py 재적재 후 실행)
+
+사용법:
+    python bench_region_sort.py --province 경기도 --iterations 200
+"""
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv('/app/backend.env')
+
+from app.api.search import INDEX_NAME, _build_region_query
+from app.utils.es_client import close_es_connection, connect_to_es, get_async_es_client
+
+# 변경 전 /search/region 정렬 (문서마다 스크립트 실행)
+SCRIPT_SORT = [
+    {"_script": {
+        "type": "number",
+        "script": {
+            "source": "doc['lowest_price'].size() > 0 ? 0 : (doc['encyclopedia_price_text.keyword'].size() > 0 ? 1 : 2)",
+            "lang": "painless"
+        },
+        "order": "asc"
+    }},
+    {"lowest_price": {"order": "asc", "missing": "_last"}}
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(values) - 1)
+    return values[f] + (values[c] - values[f]) * (k - f)
+
+
+async def run(es, body, iterations):
+    took, wall = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        # 요청 캐시가 결과를 재사용하지 않도록 비활성화
+        response = await es.search(index=INDEX_NAME, body=body, request_cache=False)
+        wall.append((time.perf_counter() - start) * 1000)
+        took.append(response["took"])
+    return took, wall
+
+
+async def main(province, iterations, size):
+    await connect_to_es()
+    try:
+        es = get_async_es_client()
+        if not es:
+            print("❌ Elasticsearch 연결 실패")
+            return
+
+        field_body = _build_region_query(province)
+        field_body["size"] = size
+        script_body = {"query": field_body["query"], "sort": SCRIPT_SORT, "size": size}
+
+        # warm-up
+        await run(es, script_body, 5)
+        await run(es, field_body, 5)
+
+        print(f"{'sort':<8} {'took p50':>9} {'took p95':>9} {'wall p50':>9} {'wall p95':>9} {'wall p99':>9}  (ms, {iterations} runs, size={size})")
+        for label, body in (("script", script_body), ("field", field_body)):
+            took, wall = await run(es, body, iterations)
+            print(
+                f"{label:<8} {percentile(took, 50):>9.1f} {percentile(took, 95):>9.1f} "
+                f"{percentile(wall, 50):>9.1f} {percentile(wall, 95):>9.1f} {percentile(wall, 99):>9.1f}"
+            )
+    finally:
+        await close_es_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--province", default="경기도")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.province, args.iterations, args.size))
@@ -0,0 +1,140 @@
+"""
+날씨 조회 경로 벤치마크 (stub_owm_server.py 대상)
+
+1) OWM 호출 (캐시 miss 경로)
+   - executor: 기존 방식. requests.get(매번 새 커넥션)을 기본 스레드 풀에서 실행
+   - httpx:    app/utils/weather.fetch_owm_data. 공유 httpx.AsyncClient (keep-alive)
+2) get_weather_by_city 전체 시/군 조회: prefetch 전(cold, 매번 OWM 대기) vs
+   run_prefetch_cycle 이후(stale-while-revalidate 캐시에서 즉시 응답)
+3) Redis 캐시 hit 경로 (REDIS_HOST에 연결 가능할 때만)
+   - sync:  기존 방식. 동기 redis 클라이언트로 GET, TTL, EXPIRE 3회 왕복 (이벤트 루프 차단)
+   - async: 현재 방식. L1에 없을 때 redis.asyncio GET 1회
+
+사용법:
+    python stub_owm_server.py --latency 0.05 &
+    OWM_BASE_URL=http://127.0.0.1:8788/data/2.5/weather OWM_RATE_LIMIT_PER_MIN=1000 \\
+        python bench_weather_fetch.py --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import redis
+import requests
+
+from app.db.redisdb import close_redis_connection, connect_to_redis, get_redis
+from app.utils.weather import (
+    OWM_BASE_URL, PROVINCE_CITY_LIST, _local_weather, close_weather_client, fetch_owm_data, get_weather_by_city,
+    weather_cache_key, weather_stats
+)
+from app.utils.weather_prefetcher import run_prefetch_cycle
+
+CITIES = [city for cities in PROVINCE_CITY_LIST.values() for city in cities]
+CITY_PAIRS = [(adm_cd, city) for adm_cd, cities in PROVINCE_CITY_LIST.items() for city in cities]
+
+
+async def owm_executor(city):
+    params = {"q": f"{city},KR", "appid": "stub", "units": "metric", "lang": "kr"}
+    loop = asyncio.get_event_loop()
+    response = await loop.run_in_executor(None, lambda: requests.get(OWM_BASE_URL, params=params, timeout=10))
+    return response.json()
+
+
+async def owm_httpx(city):
+    return await fetch_owm_data(city)
+
+
+async def city_weather(pair):
+    return await get_weather_by_city(*pair)
+
+
+def make_sync_get(client):
+    async def sync_get(key):
+        cached = client.get(key)
+        if cached:
+            current_ttl = client.ttl(key)
+            if current_ttl > 0:
+                client.expire(key, current_ttl + 600)
+            return json.loads(cached)
+    return sync_get
+
+
+async def run(fn, args, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(arg):
+        async with semaphore:
+            start = time.perf_counter()
+            await fn(arg)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(arg) for arg in args))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(args) / elapsed, statistics.median(latencies), latencies[max(0, int(len(latencies) * 0.95) - 1)]
+
+
+def print_row(name, result):
+    rps, p50, p95 = result
+    print(f"{name:>10} {rps:>9.1f} {p50:>9.2f} {p95:>9.2f}")
+
+
+async def main(requests_count, concurrency):
+    print(f"🌦️ OWM: {OWM_BASE_URL} (requests={requests_count}, concurrency={concurrency})")
+    print(f"{'mode':>10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    cities = [CITIES[i % len(CITIES)] for i in range(requests_count)]
+    for name, fn in (("executor", owm_executor), ("httpx", owm_httpx)):
+        print_row(name, await run(fn, cities, concurrency))
+
+    await connect_to_redis()
+    print(f"\n🏙️ get_weather_by_city (cities={len(CITY_PAIRS)}, Redis={'on' if get_redis() else 'off'})")
+    print(f"{'mode':>10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    misses_before = weather_stats.misses
+    print_row("cold", await run(city_weather, CITY_PAIRS, concurrency))
+    cold_misses = weather_stats.misses - misses_before
+    # cold 조회로 채워진 캐시를 비우고 prefetcher만으로 다시 채움
+    _local_weather.clear()
+    if get_redis():
+        await get_redis().delete(*[weather_cache_key(adm_cd, city) for adm_cd, city in CITY_PAIRS])
+    await run_prefetch_cycle(use_lock=False)  # 단일 프로세스 벤치마크 (Redis 없이도 실행)
+    misses_before = weather_stats.misses
+    print_row("prefetched", await run(city_weather, CITY_PAIRS, concurrency))
+    print(f"   OWM을 기다린 요청: cold={cold_misses}, prefetched={weather_stats.misses - misses_before}")
+    await close_weather_client()
+
+    redis_async = get_redis()
+    if not redis_async:
+        print("ℹ️ Redis에 연결할 수 없어 캐시 hit 벤치마크는 건너뜁니다.")
+        return
+    try:
+        keys = [f"bench:weather:{i}" for i in range(100)]
+        for key in keys:
+            await redis_async.setex(key, 7200, json.dumps({"SGG_NM": key, "NOW_AIRTP": "20"}))
+        sync_client = redis.StrictRedis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            password=os.getenv("REDIS_PASSWORD", None),
+            decode_responses=True,
+            socket_timeout=2
+        )
+        lookups = [keys[i % len(keys)] for i in range(requests_count * 5)]
+        print(f"\n🗄️ Redis cache hit (lookups={len(lookups)})")
+        print(f"{'mode':>10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        print_row("sync", await run(make_sync_get(sync_client), lookups, concurrency))
+        print_row("async", await run(redis_async.get, lookups, concurrency))
+        await redis_async.delete(*keys)
+    finally:
+        await close_redis_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
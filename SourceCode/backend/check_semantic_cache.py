@@ -0,0 +1,59 @@
+"""
+챗봇 유사 질문 캐시(SemanticCache) 매칭 확인
+
+bigram 유사도는 높지만 내용어(음식, 조건, 숫자/단위, 부정·제외·범위 표현)가 다른 질문이 서로의 답변을 받지 않는지,
+내용어가 같은 표현 변형(띄어쓰기/조사/문장부호)은 여전히 hit 되는지 확인합니다. 하나라도 틀리면 종료 코드 1.
+
+사용법:
+    python check_semantic_cache.py --threshold 0.75
+"""
+import argparse
+import sys
+
+from app.utils.cache import MISSING
+from app.utils.semantic_cache import SemanticCache, message_content_tokens
+
+# (캐시에 저장된 질문, 조회 질문, 기대 결과)
+PAIRS = [
+    # 내용어가 다르면 miss
+    ("고기에 어울리는 술 추천해줘", "회에 어울리는 술 추천해줘", False),
+    ("단 음식에 어울리는 술 추천해줘", "매운 음식에 어울리는 술 추천해줘", False),
+    ("떡에 어울리는 술 추천해줘", "전에 어울리는 술 추천해줘", False),
+    ("10도 이하 약주 추천해줘", "20도 이하 약주 추천해줘", False),
+    ("10도 이하 약주 추천해줘", "10도 이상 약주 추천해줘", False),
+    ("파전이랑 어울리는 막걸리 추천", "파전이랑 어울리는 막걸리 추천 말고 소주", False),
+    ("파전이랑 어울리는 막걸리 추천 말고 소주", "파전이랑 어울리는 막걸리 추천", False),
+    ("단맛 없는 막걸리 추천해줘", "단맛 있는 막걸리 추천해줘", False),
+    ("3만원 이하 선물용 증류주 추천", "5만원 이하 선물용 증류주 추천", False),
+    ("4명이서 마실 과실주 2병 추천", "4명이서 마실 과실주 3병 추천", False),
+    # 내용어가 같은 표현 변형은 hit
+    ("10도 이하 약주 추천해줘", "10도 이하인 약주 추천해줘", True),
+    ("파전이랑 어울리는 막걸리 추천 말고 소주", "파전이랑 어울리는 막걸리 추천 말고 소주!", True),
+    ("비 오는 날 어울리는 막걸리?", "비 오는 날에 어울리는 막걸리!", True),
+]
+
+
+def main(threshold):
+    failures = 0
+    for stored, query, expected in PAIRS:
+        cache = SemanticCache("check", threshold=threshold)
+        cache.set(stored, {"answer": stored, "drinks": []})
+        hit = cache.get(query) is not MISSING
+        if hit != expected:
+            failures += 1
+        mark = "✅" if hit == expected else "❌"
+        print(f"{mark} {'hit ' if hit else 'miss'} {stored!r} ← {query!r} "
+              f"{message_content_tokens(stored)} / {message_content_tokens(query)}")
+
+    print("-" * 40)
+    if failures:
+        print(f"❌ {failures}/{len(PAIRS)}건 불일치")
+        sys.exit(1)
+    print(f"✅ {len(PAIRS)}건 모두 기대대로 동작")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threshold", type=float, default=0.75)
+    args = parser.parse_args()
+    main(args.threshold)
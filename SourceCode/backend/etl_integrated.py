@@ -1,9 +1,20 @@
 import os
+import sys
+import time
 import pymysql
 import json
 import asyncio
+import redis
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from elasticsearch import helpers
 from pymongo import MongoClient
 from app.utils.es_client import get_es_client
+from app.utils.cache import INDEX_GENERATION_KEY
+from app.utils.embeddings import (
+    EMBEDDING_DIMS, EMBEDDING_FIELD, EMBEDDING_MODEL, document_embedding_text, embed_passages, embeddings_available
+)
 from dotenv import load_dotenv
 
 # Load env
@@ -14,6 +25,20 @@ print(f"📋 Loading .env from: {env_path}")
 # Elasticsearch Index Name
 INDEX_NAME = "liquor_integrated"
 
+# price_source → price_tier (region search sorts priced drinks first)
+PRICE_TIERS = {"lowest_price": 0, "encyclopedia": 1}
+
+# Pipeline tuning
+# - ETL_WORKERS: 문서 생성 프로세스 수 (1이면 프로세스 풀 없이 현재 프로세스에서 생성)
+# - ETL_BULK_CHUNK_SIZE / ETL_BULK_THREADS: parallel_bulk 요청당 문서 수 / 동시 bulk 요청 수
+# - ETL_MAX_FAILED: 허용하는 색인 실패 문서 수. 넘으면 세대를 올리지 않고 종료 코드 1로 실패 처리
+ETL_WORKERS = int(os.getenv("ETL_WORKERS", os.cpu_count() or 1))
+ETL_TRANSFORM_CHUNK_SIZE = int(os.getenv("ETL_TRANSFORM_CHUNK_SIZE", 64))
+ETL_EMBED_BATCH_SIZE = int(os.getenv("ETL_EMBED_BATCH_SIZE", 100))
+ETL_BULK_CHUNK_SIZE = int(os.getenv("ETL_BULK_CHUNK_SIZE", 500))
+ETL_BULK_THREADS = int(os.getenv("ETL_BULK_THREADS", 4))
+ETL_MAX_FAILED = int(os.getenv("ETL_MAX_FAILED", 0))
+
 # Path to Encyclopedia Data
 DATA_FILE_PATH = os.path.join(os.path.dirname(__file__), "../../data/비정형/전통주 지식백과.json")
 
@@ -104,6 +129,8 @@ def setup_index(es):
         es.indices.delete(index=INDEX_NAME)
 
     settings = {
+        # 적재 중에는 refresh를 끄고 run_etl 마지막에 한 번만 refresh
+        "refresh_interval": "-1",
         "analysis": {
             "tokenizer": {
                 "nori_user_tokenizer": {
@@ -177,7 +204,7 @@ def setup_index(es):
             "season": {"type": "keyword"}, # Added Season Field
             "price_source": {"type": "keyword"}, # NEW: lowest_price | encyclopedia | null
             "price_is_reference": {"type": "boolean"}, # NEW: true if from encyclopedia
-            "encyclopedia_price_text": {"type": "text"}, # NEW: Original price text (e.g., "200ml ₩22,000, 500ml ₩49,000")
+            "encyclopedia_price_text": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}}, # NEW: Original price text (e.g., "200ml ₩22,000, 500ml ₩49,000")
             "encyclopedia_url": {"type": "keyword"}, # NEW: Link to encyclopedia source
             "cocktails": {
                 "type": "nested",
@@ -189,6 +216,8 @@ def setup_index(es):
             "foods": {"type": "text", "analyzer": "nori_analyzer"},
             "ingredients": {"type": "text", "analyzer": "nori_analyzer"}, 
             "lowest_price": {"type": "long"},
+            "price_tier": {"type": "byte"}, # 0: lowest_price, 1: encyclopedia, 2: no price (region sort key)
+            "has_price": {"type": "boolean"}, # lowest_price > 0 (list sort key / weather score bonus)
             "selling_shops": {
                 "type": "nested",
                 "properties": {
@@ -210,47 +239,52 @@ def setup_index(es):
                     "contact": {"type": "keyword"},
                     "homepage": {"type": "keyword"}
                 }
+            },
+            # 하이브리드 검색용 문서 벡터 (app/utils/embeddings.py, 모델이 없으면 필드 없이 색인)
+            EMBEDDING_FIELD: {
+                "type": "dense_vector",
+                "dims": EMBEDDING_DIMS,
+                "index": True,
+                "similarity": "cosine"
             }
-        }
+        },
+        # 벡터는 kNN 색인에만 두고 _source에서는 제외 (검색 응답/카탈로그 스냅샷 크기 유지)
+        # 주의: _reindex / update_by_query로는 벡터가 복사되지 않으므로 ETL을 다시 실행해야 함
+        "_source": {"excludes": [EMBEDDING_FIELD]}
     }
     
     es.indices.create(index=INDEX_NAME, body={"settings": settings, "mappings": mapping})
     print(f"✅ Created index: {INDEX_NAME}")
 
-def run_etl():
-    print("🚀 Starting Unified ETL...")
-    
-    # 1. Connect
-    mariadb = get_mariadb_conn()
-    mongo_db = connect_mongo() # Now returns DB object
-    es = get_es_client()
-    encyclopedia = load_encyclopedia()
-    
-    if not mariadb or not es:
-        print("❌ DB/ES Connection Failed")
-        return
-
-    # 2. Setup Index
-    setup_index(es)
+def bump_index_generation():
+    """
+    인덱스 세대 번호를 증가시켜 검색 결과 캐시(app/utils/cache.py)를 한 번에 무효화합니다.
+    Redis에 접근할 수 없으면 캐시는 TTL로 만료됩니다.
+    """
+    try:
+        client = redis.StrictRedis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            password=os.getenv("REDIS_PASSWORD", None),
+            decode_responses=True,
+            socket_timeout=2
+        )
+        generation = client.incr(INDEX_GENERATION_KEY.format(index=INDEX_NAME))
+        print(f"🔄 Index generation bumped: {INDEX_NAME} → {generation}")
+    except Exception as e:
+        print(f"⚠️ Failed to bump index generation (cache will expire by TTL): {e}")
 
-    # Pre-fetch MongoDB Data
-    mongo_products_col = mongo_db["products"] if mongo_db is not None else None
-    mongo_seasons_col = mongo_db["seasons"] if mongo_db is not None else None 
-    
-    season_map = {}
-    if mongo_seasons_col is not None:
-        print("📦 Fetching Season data...")
-        try:
-            for doc in mongo_seasons_col.find():
-                d_name = doc.get("name")
-                d_season = doc.get("season")
-                if d_name and d_season:
-                    season_map[d_name.strip()] = d_season
-            print(f"✅ Loaded {len(season_map)} season entries.")
-        except Exception as e:
-            print(f"⚠️ Failed to fetch seasons: {e}")
+@contextmanager
+def timed(timings, stage):
+    """단계별 소요 시간 누적 (같은 단계를 여러 번 측정하면 합산)"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start_time
 
-    # 3. Fetch Base Data (MariaDB)
+def fetch_base_data(mariadb):
+    """MariaDB: 술 기본 정보(JOIN) + 칵테일/안주/판매처를 drink_id별로 묶은 맵"""
     with mariadb.cursor() as cursor:
         print("📦 Fetching base drinks...")
         # Join with Type and Region
@@ -315,149 +349,318 @@ def run_etl():
                 "contact": row.get('contact', '')
             })
 
-    # 4. Merge & Index
-    actions = []
-    
-    for drink in drinks:
-        d_id = drink['drink_id']
-        name = drink['drink_name']
-        
-        # Parse Alcohol
+    return drinks, cocktail_map, food_map, shop_map
+
+def fetch_seasons(mongo_seasons_col):
+    season_map = {}
+    if mongo_seasons_col is not None:
+        print("📦 Fetching Season data...")
         try:
-            abv = float(str(drink['drink_abv']).replace('%', ''))
-        except:
-            abv = 0.0
-
-        # Mongo Price - Initialize price tracking
-        lprice = 0
-        price_source = None
-        price_is_reference = False
-        
-        if mongo_products_col is not None:
-            # Try specific match first
-            price_doc = mongo_products_col.find_one({"liquor_id": d_id}, sort=[("lprice", 1)])
-            if not price_doc:
-                price_doc = mongo_products_col.find_one({"drink_name": name}, sort=[("lprice", 1)])
-            if price_doc:
-                lprice = int(price_doc.get('lprice', 0))
-                if lprice > 0:
-                    price_source = 'lowest_price'
-
-        # If Mongo has no price, use cheapest from MariaDB shops
-        shops = shop_map.get(d_id, [])
-        if lprice == 0 and shops:
-            min_shop_price = min([s['price'] for s in shops if s['price'] > 0], default=0)
-            if min_shop_price > 0:
-                lprice = min_shop_price
-                price_source = 'lowest_price'
-            
-        # Encyclopedia Data
-        norm_name = name.replace(' ', '').strip()
-        enc_data = encyclopedia.get(norm_name, {})
-        
-        # Helper to safely get nested dict/list
-        naver_data = enc_data.get('naver', {})
-        
-        # 1. Description (Fallback for Intro)
-        description = ""
-        sections = naver_data.get('sections', [])
-        if sections and isinstance(sections, list) and len(sections) > 0:
-            description = sections[0].get('text', '')
-
-        # 2. Ingredients
-        ingredients = naver_data.get('raw_info_table', {}).get('원재료', '')
-        
-        # NEW: 2.5 Encyclopedia Price Fallback (last resort)
-        encyclopedia_price_text = None
-        encyclopedia_url = None
-        
-        if lprice == 0:
-            price_str = naver_data.get('raw_info_table', {}).get('가격', '')
-            encyclopedia_price = parse_encyclopedia_price(price_str)
-            if encyclopedia_price > 0:
-                lprice = encyclopedia_price
-                price_source = 'encyclopedia'
-                price_is_reference = True
-                # Store original price text and URL
-                encyclopedia_price_text = price_str
-                encyclopedia_url = naver_data.get('source_url', '')
-        
-        # 3. Full Encyclopedia Structure for Frontend
-        encyclopedia_list = sections
-
-        # Region Logic
-        prov = drink['province']
-        city = drink['region_city']
-        if not city and drink['drink_city']:
-             city = drink['drink_city']
-             if not prov and ' ' in city:
-                 prov = city.split(' ')[0]
-
-        # Awards processing
-        awards_list = []
-        raw_awards = drink.get('drink_awards', '')
-        if raw_awards:
-            awards_list = [a.strip() for a in str(raw_awards).replace(';', '\n').split('\n') if a.strip()]
-
-        # Season Mapping
-        # Try exact match, then trimmed match
-        s_val = season_map.get(name.strip(), None)
-        
-        if not s_val:
-            # Optional: fuzzy match or try removing spaces?
-            s_val = season_map.get(name.replace(" ", ""), None)
-            
-        # Brewery Data
-        brewery_data = None
-        if drink.get('brewery_name'):
-            brewery_data = {
-                "name": drink.get('brewery_name', ''),
-                "address": drink.get('brewery_address', ''),
-                "contact": drink.get('brewery_contact', ''),
-                "homepage": drink.get('brewery_homepage', '')
-            }
+            for doc in mongo_seasons_col.find():
+                d_name = doc.get("name")
+                d_season = doc.get("season")
+                if d_name and d_season:
+                    season_map[d_name.strip()] = d_season
+            print(f"✅ Loaded {len(season_map)} season entries.")
+        except Exception as e:
+            print(f"⚠️ Failed to fetch seasons: {e}")
+    return season_map
+
+def _min_price_by(mongo_products_col, field):
+    """field 값별 최저가. 결과를 한 문서에 모으지 않고 커서로 받아 16MB BSON 문서 한도에 걸리지 않음"""
+    pipeline = [
+        {"$match": {field: {"$ne": None}}},
+        {"$group": {"_id": f"${field}", "lprice": {"$min": "$lprice"}}}
+    ]
+    return {row["_id"]: row["lprice"] for row in mongo_products_col.aggregate(pipeline, allowDiskUse=True)}
+
+def fetch_mongo_prices(mongo_products_col):
+    """
+    products 최저가를 liquor_id별 / drink_name별 aggregate($group) 두 번으로 미리 계산합니다.
+    (술마다 find_one을 최대 두 번 호출하던 N+1 조회 대체, $min은 sort=[("lprice", 1)]과 같은 값)
+    집계가 실패하면 가격 없는 문서로 인덱스를 덮어쓰지 않도록 ETL을 중단합니다. (인덱스를 다시 만들기 전에 실행됨)
+    """
+    prices_by_id, prices_by_name = {}, {}
+    if mongo_products_col is None:
+        return prices_by_id, prices_by_name
+
+    print("📦 Aggregating Mongo prices...")
+    try:
+        prices_by_id = _min_price_by(mongo_products_col, "liquor_id")
+        prices_by_name = _min_price_by(mongo_products_col, "drink_name")
+    except Exception as e:
+        print(f"❌ Failed to aggregate prices (aborting ETL): {e}")
+        raise
+    print(f"✅ Aggregated prices: {len(prices_by_id)} by liquor_id, {len(prices_by_name)} by drink_name.")
+    return prices_by_id, prices_by_name
+
+# build_document가 참조하는 조회용 맵 (프로세스 풀에서는 워커마다 initializer로 한 번 전달)
+_etl_context = None
+
+def _init_transform_worker(context):
+    global _etl_context
+    _etl_context = context
+
+def build_document(drink):
+    """MariaDB 술 한 건 + 미리 읽어둔 맵(_etl_context) → ES 문서"""
+    ctx = _etl_context
+    d_id = drink['drink_id']
+    name = drink['drink_name']
+    
+    # Parse Alcohol
+    try:
+        abv = float(str(drink['drink_abv']).replace('%', ''))
+    except:
+        abv = 0.0
+
+    # Mongo Price - Initialize price tracking
+    lprice = 0
+    price_source = None
+    price_is_reference = False
+    
+    # Try specific match first
+    if d_id in ctx["prices_by_id"]:
+        lprice = int(ctx["prices_by_id"][d_id] or 0)
+    elif name in ctx["prices_by_name"]:
+        lprice = int(ctx["prices_by_name"][name] or 0)
+    if lprice > 0:
+        price_source = 'lowest_price'
+
+    # If Mongo has no price, use cheapest from MariaDB shops
+    shops = ctx["shop_map"].get(d_id, [])
+    if lprice == 0 and shops:
+        min_shop_price = min([s['price'] for s in shops if s['price'] > 0], default=0)
+        if min_shop_price > 0:
+            lprice = min_shop_price
+            price_source = 'lowest_price'
         
-        doc = {
-            "drink_id": d_id,
-            "name": name,
-            "type": drink['type_name'] or "기타",
-            "alcohol": abv,
-            "volume": drink['drink_volume'],
-            "intro": drink['drink_intro'],
-            "description": description,
-            "image_url": drink['drink_image_url'],
-            "awards": awards_list,
-            "season": s_val, # Populated Field
-            "cocktails": cocktail_map.get(d_id, []),
-            "foods": food_map.get(d_id, []),
-            "ingredients": ingredients,
-            "lowest_price": lprice,
-            "price_source": price_source,  # NEW
-            "price_is_reference": price_is_reference,  # NEW
-            "encyclopedia_price_text": encyclopedia_price_text,  # NEW: Original price text
-            "encyclopedia_url": encyclopedia_url,  # NEW: Encyclopedia source link
-            "selling_shops": shops,
-            "encyclopedia": encyclopedia_list, 
-            "region": {
-                "province": prov,
-                "city": city
-            },
-            "brewery": brewery_data  # NEW: Brewery information
-        }
+    # Encyclopedia Data
+    norm_name = name.replace(' ', '').strip()
+    enc_data = ctx["encyclopedia"].get(norm_name, {})
+    
+    # Helper to safely get nested dict/list
+    naver_data = enc_data.get('naver', {})
+    
+    # 1. Description (Fallback for Intro)
+    description = ""
+    sections = naver_data.get('sections', [])
+    if sections and isinstance(sections, list) and len(sections) > 0:
+        description = sections[0].get('text', '')
+
+    # 2. Ingredients
+    ingredients = naver_data.get('raw_info_table', {}).get('원재료', '')
+    
+    # NEW: 2.5 Encyclopedia Price Fallback (last resort)
+    encyclopedia_price_text = None
+    encyclopedia_url = None
+    
+    if lprice == 0:
+        price_str = naver_data.get('raw_info_table', {}).get('가격', '')
+        encyclopedia_price = parse_encyclopedia_price(price_str)
+        if encyclopedia_price > 0:
+            lprice = encyclopedia_price
+            price_source = 'encyclopedia'
+            price_is_reference = True
+            # Store original price text and URL
+            encyclopedia_price_text = price_str
+            encyclopedia_url = naver_data.get('source_url', '')
+    
+    # Region search sort key (replaces per-document Painless script sort)
+    price_tier = PRICE_TIERS.get(price_source, 2)
+    has_price = lprice > 0
+
+    # 3. Full Encyclopedia Structure for Frontend
+    encyclopedia_list = sections
+
+    # Region Logic
+    prov = drink['province']
+    city = drink['region_city']
+    if not city and drink['drink_city']:
+         city = drink['drink_city']
+         if not prov and ' ' in city:
+             prov = city.split(' ')[0]
+
+    # Awards processing
+    awards_list = []
+    raw_awards = drink.get('drink_awards', '')
+    if raw_awards:
+        awards_list = [a.strip() for a in str(raw_awards).replace(';', '\n').split('\n') if a.strip()]
+
+    # Season Mapping
+    # Try exact match, then trimmed match
+    s_val = ctx["season_map"].get(name.strip(), None)
+    
+    if not s_val:
+        # Optional: fuzzy match or try removing spaces?
+        s_val = ctx["season_map"].get(name.replace(" ", ""), None)
         
-        action = {
-            "index": { "_index": INDEX_NAME, "_id": str(d_id) }
+    # Brewery Data
+    brewery_data = None
+    if drink.get('brewery_name'):
+        brewery_data = {
+            "name": drink.get('brewery_name', ''),
+            "address": drink.get('brewery_address', ''),
+            "contact": drink.get('brewery_contact', ''),
+            "homepage": drink.get('brewery_homepage', '')
         }
-        actions.append(json.dumps(action))
-        actions.append(json.dumps(doc))
-        
-        if len(actions) >= 200: # Bulk size 100 docs
-            es.bulk(body="\n".join(actions))
-            actions = []
-            
-    if actions:
-        es.bulk(body="\n".join(actions))
-        
+    
+    return {
+        "drink_id": d_id,
+        "name": name,
+        "type": drink['type_name'] or "기타",
+        "alcohol": abv,
+        "volume": drink['drink_volume'],
+        "intro": drink['drink_intro'],
+        "description": description,
+        "image_url": drink['drink_image_url'],
+        "awards": awards_list,
+        "season": s_val, # Populated Field
+        "cocktails": ctx["cocktail_map"].get(d_id, []),
+        "foods": ctx["food_map"].get(d_id, []),
+        "ingredients": ingredients,
+        "lowest_price": lprice,
+        "price_source": price_source,  # NEW
+        "price_tier": price_tier,
+        "has_price": has_price,
+        "price_is_reference": price_is_reference,  # NEW
+        "encyclopedia_price_text": encyclopedia_price_text,  # NEW: Original price text
+        "encyclopedia_url": encyclopedia_url,  # NEW: Encyclopedia source link
+        "selling_shops": shops,
+        "encyclopedia": encyclopedia_list, 
+        "region": {
+            "province": prov,
+            "city": city
+        },
+        "brewery": brewery_data  # NEW: Brewery information
+    }
+
+def transform_documents(drinks, context):
+    """
+    문서 생성 단계. ETL_WORKERS > 1이면 프로세스 풀에서 병렬로 만들고 입력 순서대로 하나씩 내보냅니다.
+    (결과를 모두 모으지 않으므로 앞쪽 문서는 색인 단계로 바로 넘어감)
+    """
+    if ETL_WORKERS <= 1 or len(drinks) < ETL_TRANSFORM_CHUNK_SIZE * 2:
+        _init_transform_worker(context)
+        yield from map(build_document, drinks)
+        return
+
+    with ProcessPoolExecutor(max_workers=ETL_WORKERS, initializer=_init_transform_worker, initargs=(context,)) as pool:
+        yield from pool.map(build_document, drinks, chunksize=ETL_TRANSFORM_CHUNK_SIZE)
+
+def generate_actions(docs, timings):
+    """문서 → bulk action. 임베딩은 ETL_EMBED_BATCH_SIZE건씩 모아 한 번에 생성"""
+    use_embeddings = embeddings_available()
+    if use_embeddings:
+        print(f"🧠 Embedding documents with {EMBEDDING_MODEL}")
+    else:
+        print("ℹ️ sentence-transformers not installed: indexing without embeddings (BM25 only)")
+
+    docs = iter(docs)
+    while True:
+        with timed(timings, "transform"):
+            batch = list(islice(docs, ETL_EMBED_BATCH_SIZE))
+        if not batch:
+            return
+
+        if use_embeddings:
+            with timed(timings, "embed"):
+                vectors = embed_passages([document_embedding_text(doc) for doc in batch])
+            if vectors is None:
+                use_embeddings = False
+            else:
+                for doc, vector in zip(batch, vectors):
+                    doc[EMBEDDING_FIELD] = vector
+
+        for doc in batch:
+            yield {"_index": INDEX_NAME, "_id": str(doc["drink_id"]), "_source": doc}
+
+def load_documents(es, actions):
+    """parallel_bulk로 색인하고 (성공, 실패) 건수를 반환"""
+    indexed, failed = 0, 0
+    for ok, info in helpers.parallel_bulk(
+        es, actions,
+        thread_count=ETL_BULK_THREADS,
+        chunk_size=ETL_BULK_CHUNK_SIZE,
+        raise_on_error=False,
+        raise_on_exception=False
+    ):
+        if ok:
+            indexed += 1
+        else:
+            failed += 1
+            if failed <= 5:
+                print(f"⚠️ Bulk index failed: {info}")
+    return indexed, failed
+
+def print_timings(timings, total):
+    print("⏱️ ETL stage timings:")
+    for stage, seconds in timings.items():
+        print(f"   {stage:<22} {seconds:8.2f}s")
+    # transform/embed는 load와 겹쳐서 실행되므로 합이 total보다 클 수 있음
+    print(f"   {'total':<22} {total:8.2f}s")
+
+def run_etl():
+    print("🚀 Starting Unified ETL...")
+    start_time = time.perf_counter()
+    timings = {}
+    
+    # 1. Connect
+    mariadb = get_mariadb_conn()
+    mongo_db = connect_mongo() # Now returns DB object
+    es = get_es_client()
+    
+    if not mariadb or not es:
+        print("❌ DB/ES Connection Failed")
+        return
+
+    # 2. Extract: 원본을 모두 읽은 뒤에 인덱스를 다시 만들어 빈 인덱스로 서비스되는 시간을 줄임
+    with timed(timings, "extract.encyclopedia"):
+        encyclopedia = load_encyclopedia()
+
+    mongo_products_col = mongo_db["products"] if mongo_db is not None else None
+    mongo_seasons_col = mongo_db["seasons"] if mongo_db is not None else None 
+    with timed(timings, "extract.mongo"):
+        season_map = fetch_seasons(mongo_seasons_col)
+        prices_by_id, prices_by_name = fetch_mongo_prices(mongo_products_col)
+
+    with timed(timings, "extract.mariadb"):
+        drinks, cocktail_map, food_map, shop_map = fetch_base_data(mariadb)
+
+    context = {
+        "encyclopedia": encyclopedia,
+        "season_map": season_map,
+        "prices_by_id": prices_by_id,
+        "prices_by_name": prices_by_name,
+        "cocktail_map": cocktail_map,
+        "food_map": food_map,
+        "shop_map": shop_map
+    }
+
+    # 3. Setup Index (refresh 끈 상태로 생성)
+    with timed(timings, "setup_index"):
+        setup_index(es)
+
+    # 4. Transform → Embed → Load (문서 생성과 색인이 겹쳐서 진행)
+    try:
+        with timed(timings, "load"):
+            indexed, failed = load_documents(es, generate_actions(transform_documents(drinks, context), timings))
+        print(f"{'✅' if not failed else '⚠️'} Indexed {indexed} documents ({failed} failed).")
+    finally:
+        # 5. refresh 설정을 기본값으로 되돌리고 한 번 refresh
+        with timed(timings, "refresh"):
+            es.indices.put_settings(index=INDEX_NAME, body={"index": {"refresh_interval": None}})
+            es.indices.refresh(index=INDEX_NAME)
+
+    print_timings(timings, time.perf_counter() - start_time)
+
+    # 색인 실패가 허용치를 넘으면 성공한 재적재로 보지 않음
+    # (세대를 올리면 API 캐시/카탈로그 스냅샷이 불완전한 인덱스로 다시 적재됨)
+    if failed > ETL_MAX_FAILED:
+        print(f"❌ ETL Failed: {failed}/{indexed + failed} documents were not indexed "
+              f"(ETL_MAX_FAILED={ETL_MAX_FAILED}). Index generation not bumped.")
+        sys.exit(1)
+
+    bump_index_generation()
     print("✅ ETL Complete!")
 
 if __name__ == "__main__":
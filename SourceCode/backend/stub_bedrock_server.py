@@ -0,0 +1,112 @@
+"""
+로컬 Bedrock 스텁 서버 (오프라인 테스트 / 벤치마크용)
+
+bedrock-runtime의 InvokeModel(POST /model/{modelId}/invoke)과
+InvokeModelWithResponseStream(POST /model/{modelId}/invoke-with-response-stream)만 흉내 냅니다.
+  - invoke: --latency 초 지연 후 Nova 형식 응답 전체를 반환
+  - stream: --latency 초 후 첫 토큰, 이후 --tokens 개 조각을 --token-interval 간격으로
+            AWS event stream(application/vnd.amazon.eventstream) 형식으로 전송
+invoke도 스트림과 같은 생성 시간(latency + tokens × token-interval)을 기다린 뒤 응답합니다.
+서명(SigV4)은 검증하지 않습니다.
+
+사용법:
+    python stub_bedrock_server.py --port 8787 --latency 0.5 --tokens 40 --token-interval 0.02
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8787 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub \\
+        python bench_bedrock_invoke.py
+"""
+import argparse
+import asyncio
+import base64
+import json
+import struct
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI()
+app.state.latency = 0.5
+app.state.tokens = 0
+app.state.token_interval = 0.02
+app.state.calls = 0
+
+
+def _user_text(body: dict) -> str:
+    messages = body.get("messages") or [{}]
+    return (messages[-1].get("content") or [{}])[0].get("text", "")
+
+
+def _usage(input_text: str, output_text: str) -> dict:
+    input_tokens = max(1, len(input_text) // 2)
+    output_tokens = max(1, len(output_text) // 2)
+    return {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens}
+
+
+def _output_pieces(model_id: str, user_text: str) -> list:
+    pieces = [f"[stub:{model_id}] ", user_text[:50]]
+    pieces += [f" 토큰{i}" for i in range(app.state.tokens)]
+    return pieces
+
+
+def _event_message(payload: dict) -> bytes:
+    """AWS event stream 메시지 1개 (prelude + headers + payload + CRC32)"""
+    headers = b""
+    for name, value in ((":event-type", "chunk"), (":content-type", "application/json"), (":message-type", "event")):
+        name_bytes, value_bytes = name.encode(), value.encode()
+        headers += struct.pack(">B", len(name_bytes)) + name_bytes + struct.pack(">BH", 7, len(value_bytes)) + value_bytes
+    body = json.dumps({"bytes": base64.b64encode(json.dumps(payload).encode()).decode()}).encode()
+    prelude = struct.pack(">II", 12 + len(headers) + len(body) + 4, len(headers))
+    prelude += struct.pack(">I", zlib.crc32(prelude))
+    message = prelude + headers + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+@app.post("/model/{model_id}/invoke")
+async def invoke(model_id: str, request: Request):
+    body = json.loads(await request.body() or b"{}")
+    app.state.calls += 1
+    await asyncio.sleep(app.state.latency + app.state.tokens * app.state.token_interval)
+
+    user_text = _user_text(body)
+    output_text = "".join(_output_pieces(model_id, user_text))
+    return {
+        "output": {"message": {"role": "assistant", "content": [{"text": output_text}]}},
+        "stopReason": "end_turn",
+        "usage": _usage(user_text, output_text)
+    }
+
+
+@app.post("/model/{model_id}/invoke-with-response-stream")
+async def invoke_stream(model_id: str, request: Request):
+    body = json.loads(await request.body() or b"{}")
+    app.state.calls += 1
+    user_text = _user_text(body)
+    pieces = _output_pieces(model_id, user_text)
+
+    async def generate():
+        yield _event_message({"messageStart": {"role": "assistant"}})
+        await asyncio.sleep(app.state.latency)
+        for i, piece in enumerate(pieces):
+            if i > 1:
+                await asyncio.sleep(app.state.token_interval)
+            yield _event_message({"contentBlockDelta": {"delta": {"text": piece}, "contentBlockIndex": 0}})
+        yield _event_message({"contentBlockStop": {"contentBlockIndex": 0}})
+        yield _event_message({"messageStop": {"stopReason": "end_turn"}})
+        yield _event_message({"metadata": {"usage": _usage(user_text, "".join(pieces))}})
+
+    return StreamingResponse(generate(), media_type="application/vnd.amazon.eventstream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--tokens", type=int, default=0)
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    app.state.tokens = args.tokens
+    app.state.token_interval = args.token_interval
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
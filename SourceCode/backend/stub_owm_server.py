@@ -0,0 +1,45 @@
+"""
+로컬 OpenWeatherMap 스텁 서버 (오프라인 벤치마크용)
+
+GET /data/2.5/weather?q=<city>,KR 에 --latency 초 지연 후 OWM 형식 응답을 돌려줍니다.
+도시 이름으로 날씨 id(맑음/구름/비/눈)와 기온을 결정하므로 같은 도시는 항상 같은 결과입니다.
+
+사용법:
+    python stub_owm_server.py --port 8788 --latency 0.05
+    OWM_BASE_URL=http://127.0.0.1:8788/data/2.5/weather python bench_weather_fetch.py
+"""
+import argparse
+import asyncio
+import zlib
+
+import uvicorn
+from fastapi import FastAPI, Query
+
+app = FastAPI()
+app.state.latency = 0.05
+app.state.calls = 0
+
+WEATHER_IDS = [800, 801, 803, 500, 600, 611]
+
+
+@app.get("/data/2.5/weather")
+async def weather(q: str = Query(...), appid: str = None, units: str = "metric", lang: str = "kr"):
+    app.state.calls += 1
+    await asyncio.sleep(app.state.latency)
+    city = q.split(",")[0]
+    seed = zlib.crc32(city.encode())
+    return {
+        "name": city,
+        "weather": [{"id": WEATHER_IDS[seed % len(WEATHER_IDS)], "main": "stub", "description": "stub"}],
+        "main": {"temp": round(-5 + seed % 350 / 10, 1), "humidity": seed % 100}
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
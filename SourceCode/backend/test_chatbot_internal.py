@@ -1,16 +1,25 @@
 import sys
 import os
+import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv('/app/backend.env')
 
 from app.api.chatbot import search_liquor_for_rag, invoke_nova
+from app.utils.es_client import connect_to_es, close_es_connection
+
+async def run_search(query):
+    await connect_to_es()
+    try:
+        return await search_liquor_for_rag(query)
+    finally:
+        await close_es_connection()
 
 def test_es_search():
     print("\n🔍 Testing Elasticsearch Search (Internal)...")
     query = "여름에 먹기 좋은 술"
-    results = search_liquor_for_rag(query)
+    results = asyncio.run(run_search(query))
     
     if results:
         print(f"✅ Found {len(results)} drinks for query '{query}'")
@@ -1,16 +1,25 @@
 import sys
 import os
+import asyncio
 
 # Add /app to sys.path to allow imports from app
 sys.path.append('/app')
 
 from app.api.search import search_liquor_fuzzy
+from app.utils.es_client import connect_to_es, close_es_connection
+
+async def run_search(query):
+    await connect_to_es()
+    try:
+        return await search_liquor_fuzzy(query)
+    finally:
+        await close_es_connection()
 
 def test_search():
     query = "감홍로"
     print(f"🔍 Testing search for: {query}")
     
-    result = search_liquor_fuzzy(query)
+    result = asyncio.run(run_search(query))
     
     if result:
         print("✅ Result found:")
@@ -0,0 +1,97 @@
+"""
+메모리 카탈로그 로컬 매처 vs Elasticsearch 스코어링 parity 검증
+
+골든 쿼리 세트에 대해
+  - 로컬 매처가 직접 응답하는 쿼리(best_match 성공)의 1순위가 ES 1순위와 같은지
+  - 스냅샷 문서가 ES 문서와 동일한지 (detail)
+를 비교합니다. 로컬 응답 일치율이 기준 미만이면 exit code 1로 종료하므로
+배포 전 게이트로 사용합니다. (실패 시 CATALOG_LOCAL_SEARCH=false로 비활성화)
+
+사용법:
+    python verify_catalog_parity.py [--min-agreement 0.95]
+"""
+import argparse
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv('/app/backend.env')
+
+from app.api.search import _search_liquor_fuzzy_es
+from app.utils.catalog import catalog_state, load_catalog_snapshot
+from app.utils.es_client import close_es_connection, connect_to_es, get_async_es_client
+
+# 정확한 이름, 오탈자, 띄어쓰기 차이, 로마자, 부분 이름, 일반 명사를 섞은 골든 쿼리
+GOLDEN_QUERIES = [
+    "감홍로", "감홍노", "백세주", "백세쥬", "이화주", "문배술", "문배주 용상",
+    "화요 25", "화요25", "화요", "명인 안동소주", "명인안동소주", "안동소주",
+    "평창 감자 막걸리", "평창감자막걸리", "진맥소주", "진맥 소주", "죽력고", "죽력꼬",
+    "오메기술", "성읍민속마을 오메기술", "남한산성소주", "남한산성 소주", "백제소주",
+    "복순도가 슈퍼드라이", "진도홍주38", "청명주", "천년담주", "밀담40", "농태기",
+    "Baekseju", "Munbaesul", "Hwayo", "Gamhongro", "geisha", "Jukryeokgo",
+    "막걸리", "약주", "증류주", "복분자", "유자 막걸리",
+]
+
+
+async def main(min_agreement: float):
+    await connect_to_es()
+    try:
+        es = get_async_es_client()
+        if not es or not await load_catalog_snapshot():
+            print("❌ Elasticsearch 연결 또는 스냅샷 로드 실패")
+            return 1
+
+        catalog = catalog_state.snapshot
+        local_answered = 0
+        agreed = 0
+
+        print("=" * 60)
+        print(f"🧪 Golden query parity ({len(GOLDEN_QUERIES)} queries, {len(catalog)} drinks)")
+        print("=" * 60)
+
+        for query in GOLDEN_QUERIES:
+            es_result = await _search_liquor_fuzzy_es(es, query)
+            es_top = es_result.get("id") if es_result else None
+
+            matches = catalog.best_match(query)
+            if not matches:
+                print(f"  ↪️  {query:<20} local=FALLBACK     es={es_result['name'] if es_result else None}")
+                continue
+
+            local_answered += 1
+            local_top = catalog.sources[matches[0][0]].get("drink_id")
+            ok = local_top == es_top
+            agreed += ok
+            local_name = catalog.sources[matches[0][0]].get("name")
+            print(f"  {'✅' if ok else '❌'} {query:<20} local={local_name}  es={es_result['name'] if es_result else None}")
+
+        # detail parity: 스냅샷 문서 == ES 문서
+        detail_mismatch = 0
+        for drink_id in list(catalog.id_to_row)[:50]:
+            response = await es.search(index="liquor_integrated", query={"term": {"drink_id": drink_id}}, size=1)
+            hits = response["hits"]["hits"]
+            if not hits or hits[0]["_source"] != catalog.get(drink_id):
+                detail_mismatch += 1
+
+        agreement = agreed / local_answered if local_answered else 1.0
+        print("=" * 60)
+        print(f"📊 Local coverage: {local_answered}/{len(GOLDEN_QUERIES)}")
+        print(f"📊 Top-1 agreement (local answers): {agreed}/{local_answered} = {agreement:.1%}")
+        print(f"📊 Detail mismatches (first 50 ids): {detail_mismatch}")
+        print("=" * 60)
+
+        if agreement < min_agreement or detail_mismatch:
+            print(f"❌ Parity gate FAILED (required {min_agreement:.0%})")
+            return 1
+        print("✅ Parity gate passed")
+        return 0
+    finally:
+        await close_es_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.min_agreement)))
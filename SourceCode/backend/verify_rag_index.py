@@ -0,0 +1,131 @@
+"""
+챗봇 RAG 검색: drink_info(구 인덱스) vs liquor_integrated(통합 인덱스) 비교
+
+drink_info 삭제 전 확인용입니다.
+  - 대표 질문들에 대해 구 쿼리(drink_info)와 새 쿼리(search_liquor_for_rag)의 결과 이름/겹침
+  - 두 인덱스의 문서 수, 저장 크기, 세그먼트 메모리
+를 출력합니다. 결과를 확인한 뒤 --delete-legacy로 drink_info를 삭제할 수 있습니다.
+단, 아직 drink_info 인덱스를 읽거나 쓰는 스크립트(import/sync/check 등)가 남아 있으면
+삭제하지 않고 해당 파일:줄 목록만 출력합니다. (쓰는 스크립트가 돌면 es.index가 인덱스를 다시 만듦)
+
+사용법:
+    python verify_rag_index.py [--delete-legacy]
+"""
+import argparse
+import asyncio
+import os
+import re
+
+from dotenv import load_dotenv
+
+load_dotenv('/app/backend.env')
+
+from app.api.chatbot import search_liquor_for_rag
+from app.api.search import INDEX_NAME
+from app.utils.es_client import close_es_connection, connect_to_es, es_search, get_async_es_client
+
+LEGACY_INDEX = "drink_info"
+# es.search(index="drink_info"), index_name = "drink_info" 처럼 인덱스 이름으로 쓰는 곳 (MariaDB 테이블 drink_info는 제외)
+LEGACY_INDEX_USE = re.compile(r"""\bindex(?:_name)?\s*=\s*['"]%s['"]""" % LEGACY_INDEX)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+QUESTIONS = [
+    "여름에 먹기 좋은 술", "비 오는 날 파전이랑 어울리는 막걸리", "삼겹살에 어울리는 소주",
+    "회랑 먹을 깔끔한 청주", "선물하기 좋은 고급 증류주", "달달한 과실주 추천",
+    "도수 낮은 막걸리", "전통 약주", "복분자주", "유자향 나는 술",
+]
+
+
+def legacy_query(text):
+    # 변경 전 search_liquor_for_rag 쿼리
+    return {
+        "query": {
+            "bool": {
+                "should": [
+                    {"match": {"drink_name": {"query": text, "boost": 3.0}}},
+                    {"match": {"drink_intro": {"query": text, "boost": 1.5}}},
+                    {"match": {"drink_desc": {"query": text, "boost": 1.0}}},
+                    {"match": {"pairing_foods": {"query": text, "boost": 2.0}}},
+                    {"match": {"drink_tag": {"query": text, "boost": 1.5}}}
+                ],
+                "minimum_should_match": 1
+            }
+        },
+        "min_score": 5.0,
+        "size": 5
+    }
+
+
+def legacy_index_users():
+    """backend 아래에서 drink_info 인덱스를 아직 사용하는 (파일, 줄 번호, 코드) 목록"""
+    users = []
+    for root, dirs, files in os.walk(BACKEND_DIR):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if not name.endswith(".py") or path == os.path.abspath(__file__):
+                continue
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                for lineno, line in enumerate(f, 1):
+                    if LEGACY_INDEX_USE.search(line):
+                        users.append((os.path.relpath(path, BACKEND_DIR), lineno, line.strip()))
+    return sorted(users)
+
+
+async def index_stats(es, index):
+    stats = await es.indices.stats(index=index, metric=["docs", "store", "segments"])
+    total = stats["_all"]["primaries"]
+    return {
+        "docs": total["docs"]["count"],
+        "store_mb": round(total["store"]["size_in_bytes"] / 1024 / 1024, 2),
+        "segments": total["segments"]["count"],
+        "segments_memory_kb": round(total["segments"].get("memory_in_bytes", 0) / 1024, 1)
+    }
+
+
+async def main(delete_legacy: bool):
+    await connect_to_es()
+    try:
+        es = get_async_es_client()
+        if not es:
+            print("❌ Elasticsearch 연결 실패")
+            return
+
+        legacy_exists = await es.indices.exists(index=LEGACY_INDEX)
+        for question in QUESTIONS:
+            new_names = [d["name"] for d in await search_liquor_for_rag(question)]
+            old_names = []
+            if legacy_exists:
+                response = await es_search(es, LEGACY_INDEX, legacy_query(question))
+                old_names = [hit["_source"].get("drink_name") for hit in response["hits"]["hits"]]
+            overlap = len(set(new_names) & set(old_names))
+            print(f"🔍 {question}")
+            print(f"   new ({INDEX_NAME}): {new_names}")
+            print(f"   old ({LEGACY_INDEX}): {old_names}  overlap={overlap}")
+
+        print("=" * 60)
+        for index in (INDEX_NAME, LEGACY_INDEX):
+            if await es.indices.exists(index=index):
+                print(f"📦 {index}: {await index_stats(es, index)}")
+            else:
+                print(f"📦 {index}: (없음)")
+
+        if delete_legacy and legacy_exists:
+            users = legacy_index_users()
+            if users:
+                print(f"⛔ {LEGACY_INDEX}를 아직 사용하는 코드가 {len(users)}곳 있어 삭제하지 않습니다. "
+                      f"{INDEX_NAME}로 옮긴 뒤 다시 실행하세요:")
+                for path, lineno, code in users:
+                    print(f"   {path}:{lineno}  {code}")
+            else:
+                await es.indices.delete(index=LEGACY_INDEX)
+                print(f"🗑️ Deleted legacy index: {LEGACY_INDEX}")
+    finally:
+        await close_es_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delete-legacy", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.delete_legacy))
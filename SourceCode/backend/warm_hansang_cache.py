@@ -0,0 +1,114 @@
+"""
+한상차림 추천 캐시 워밍 작업
+
+search_logs에서 최근 가장 많이 조회된 술을 골라 /hansang/recommend와 같은 입력
+(술 이름, 지역, 설명)으로 추천을 미리 생성해 LLM 캐시(Redis)에 저장합니다.
+이미 캐시된 항목은 Gemini를 호출하지 않고 건너뜁니다.
+
+사용법:
+    python warm_hansang_cache.py --top 50 --days 7 --concurrency 2
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv('/app/backend.env')
+
+from app.api.hansang import HansangRequest, generate_hansang_recommendations, hansang_cache
+from app.db.mariadb import close_mariadb_connection, connect_to_mariadb
+from app.db.mongodb import close_mongo_connection, connect_to_mongo, get_database
+from app.db.redisdb import close_redis_connection, connect_to_redis
+from app.utils.es_client import close_es_connection, connect_to_es, es_search, get_async_es_client
+from app.utils.specialty_index import load_specialty_index
+
+
+async def get_most_viewed_drinks(top: int, days: int):
+    """최근 days일 동안 조회 수 합계 기준 상위 drink_id 목록"""
+    db = await get_database()
+    since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    pipeline = [
+        {"$match": {"date": {"$gte": since}, "drink_id": {"$exists": True}}},
+        {"$group": {"_id": "$drink_id", "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1}},
+        {"$limit": top}
+    ]
+    return [doc["_id"] async for doc in db.search_logs.aggregate(pipeline)]
+
+
+async def build_request(es, drink_id: int):
+    response = await es_search(es, "liquor_integrated", {"query": {"term": {"drink_id": drink_id}}, "size": 1})
+    hits = response["hits"]["hits"]
+    if not hits:
+        return None
+    source = hits[0]["_source"]
+    region = source.get("region") or {}
+    if not region.get("province"):
+        return None
+    # 프론트엔드(/drink/[id], /ocr)가 보내는 값과 같게 구성해야 캐시 키가 일치함
+    return HansangRequest(
+        drink_name=source.get("name") or "",
+        province=region.get("province"),
+        city=region.get("city"),
+        drink_description=source.get("description") or source.get("intro") or ""
+    )
+
+
+async def main(top: int, days: int, concurrency: int):
+    await connect_to_mongo()
+    await connect_to_es()
+    await connect_to_redis()
+    await connect_to_mariadb()
+    await load_specialty_index()
+
+    try:
+        es = get_async_es_client()
+        if not es:
+            print("❌ Elasticsearch 연결 실패")
+            return
+
+        drink_ids = await get_most_viewed_drinks(top, days)
+        print(f"🔥 Warming hansang cache for {len(drink_ids)} drinks (last {days} days)")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        calls_before = hansang_cache.flight.calls
+        warmed, failed = 0, 0
+
+        async def warm(drink_id):
+            nonlocal warmed, failed
+            async with semaphore:
+                request = await build_request(es, drink_id)
+                if request is None:
+                    print(f"  ⏭️  drink_id={drink_id}: 지역 정보 없음")
+                    return
+                try:
+                    await generate_hansang_recommendations(request)
+                    warmed += 1
+                    print(f"  ✅ {request.drink_name} ({request.province} {request.city or ''})")
+                except Exception as e:
+                    failed += 1
+                    print(f"  ❌ {request.drink_name}: {e}")
+
+        start_time = time.time()
+        await asyncio.gather(*(warm(drink_id) for drink_id in drink_ids))
+
+        generated = hansang_cache.flight.calls - calls_before
+        print("=" * 60)
+        print(f"📊 warmed={warmed}, generated={generated}, already cached={warmed - generated}, failed={failed}")
+        print(f"⏱️ {time.time() - start_time:.1f}s")
+    finally:
+        await close_mariadb_connection()
+        await close_redis_connection()
+        await close_es_connection()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--concurrency", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.top, args.days, args.concurrency))